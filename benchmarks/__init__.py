@@ -0,0 +1,16 @@
+"""
+Benchmark suite with JSON baselines.
+
+Usage
+-----
+    python -m benchmarks run                      # compare against the baseline
+    python -m benchmarks run --save-baseline      # record a new baseline
+    python -m benchmarks run --filter run_analysis --repeat 3
+    python -m benchmarks past-outputs             # drift report vs assets/past_outputs
+    python -m benchmarks preview-errors           # analytic preview vs Monte Carlo
+    python -m benchmarks cold-start               # startup to ready, fresh interpreters
+
+`run` exits with status 1 when a case is slower than the baseline by more
+than `--threshold`, or when a numerical output differs from the baseline.
+Baselines are machine-specific; record one per machine.
+"""
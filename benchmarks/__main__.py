@@ -0,0 +1,174 @@
+import argparse
+import logging
+import os
+import statistics
+import sys
+
+import core.portfolio
+from config import COLD_START_BUDGET_SECONDS, XIRR_INDEX_DIR
+from benchmarks.cases import BENCHMARK_SEED, all_cases
+from benchmarks.cold_start import measure_cold_start
+from benchmarks.harness import calibrate, compare_to_baseline, load_baseline, save_baseline
+from benchmarks.past_outputs import check_past_outputs
+from benchmarks.preview_validation import VALIDATION_ENGINES, VALIDATION_PATHS, validate_preview
+from utils.logger import get_logger
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'baseline.json')
+
+
+def _run(args) -> int:
+    cases = [c for c in all_cases() if not args.filter or any(f in c.name for f in args.filter)]
+    results = {}
+    calibration = calibrate()
+    for case in cases:
+        results[case.name] = case.run(repeat=args.repeat)
+        print(f"{case.name:<70} {results[case.name]['min_s'] * 1e3:10.2f} ms")
+    # Re-measure at the end too, so a slowdown during the run is accounted for
+    calibration = (calibration + calibrate()) / 2
+
+    xirr_index = os.path.isdir(XIRR_INDEX_DIR) and bool(os.listdir(XIRR_INDEX_DIR))
+    if args.save_baseline:
+        baseline = load_baseline(args.baseline) or {}
+        if baseline.get('cases') and baseline.get('calibration_s'):
+            # Merging: express the new timings on the existing baseline's machine scale
+            scale = baseline['calibration_s'] / calibration
+            for result in results.values():
+                result['min_s'] *= scale
+                result['median_s'] *= scale
+            calibration = baseline['calibration_s']
+        merged = {**baseline.get('cases', {}), **results}
+        save_baseline(args.baseline, merged, {
+            'seed': BENCHMARK_SEED, 'xirr_index': xirr_index, 'calibration_s': calibration
+        })
+        print(f"\nBaseline written to {args.baseline} ({len(results)} cases updated).")
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline first.")
+        return 0
+    if baseline.get('xirr_index') != xirr_index:
+        print(f"\nNote: rolling-XIRR index present={xirr_index}, baseline recorded with {baseline.get('xirr_index')}.")
+
+    report = compare_to_baseline(
+        results, baseline,
+        threshold=args.threshold,
+        min_delta_s=args.min_delta_ms / 1e3,
+        output_rtol=args.output_rtol,
+        calibration=None if args.no_calibration else calibration
+    )
+    for title, key in (('Not in baseline', 'new'), ('Regressions', 'regressions'), ('Output mismatches', 'mismatches')):
+        if report[key]:
+            print(f"\n{title}:")
+            for line in report[key]:
+                print(f"  {line}")
+
+    failed = bool(report['regressions'] or report['mismatches'])
+    print(f"\nCalibration: {calibration * 1e3:.2f} ms (baseline {baseline.get('calibration_s', 0) * 1e3:.2f} ms).")
+    print(f"{len(results)} cases, {len(report['regressions'])} regressions, "
+          f"{len(report['mismatches'])} output mismatches (threshold {args.threshold:.0%}).")
+    return 1 if failed else 0
+
+
+def _past_outputs(args) -> int:
+    results = check_past_outputs(args.sip_rtol, args.prob_atol, args.return_atol)
+    counts = {}
+    for name, result in results.items():
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+        print(f"{result['status']:<8} {name}: {result['note']}")
+        for field, (past, current) in result.get('values', {}).items():
+            print(f"           {field:<28} past={past:<14} current={current}")
+    print('\n' + ', '.join(f"{n} {status}" for status, n in sorted(counts.items())))
+    return 1 if args.strict_past_outputs and counts.get('drift') else 0
+
+
+def _preview_errors(args) -> int:
+    results = validate_preview(args.paths)
+    header = f"{'case':<18} {'preview':>8} {'sip':>12}"
+    for engine in VALIDATION_ENGINES:
+        header += f" | {engine:>9} {'err pp':>7} {'sip err':>8}"
+    print(header)
+
+    worst = {engine: 0.0 for engine in VALIDATION_ENGINES}
+    for name, row in results.items():
+        line = f"{name:<18} {row['probability']:7.2f}% {row['suggested_sip']:12,.0f}"
+        for engine in VALIDATION_ENGINES:
+            ref = row[engine]
+            sip_error = f"{ref['sip_error_pct']:7.1f}%" if ref['sip_error_pct'] is not None else f"{'-':>8}"
+            line += f" | {ref['probability']:8.2f}% {ref['probability_error_pp']:+7.2f} {sip_error}"
+            worst[engine] = max(worst[engine], abs(ref['probability_error_pp']))
+        print(line)
+
+    print('\nMax |probability error|: ' + ', '.join(f"{e} {v:.2f} pp" for e, v in worst.items()))
+    return 1 if args.max_error_pp is not None and worst['gaussian'] > args.max_error_pp else 0
+
+
+def _cold_start(args) -> int:
+    runs = [measure_cold_start() for _ in range(args.runs)]
+    names = list(runs[0])
+    print(f"{'run':<6}" + ''.join(f"{name:>16}" for name in names))
+    for i, run in enumerate(runs, 1):
+        print(f"{i:<6}" + ''.join(f"{run[name] * 1e3:13.1f} ms" for name in names))
+    median = {name: statistics.median(run[name] for run in runs) for name in names}
+    print(f"{'median':<6}" + ''.join(f"{median[name] * 1e3:13.1f} ms" for name in names))
+
+    over = median['ready'] > args.budget
+    print(f"\nReady after {median['ready']:.3f} s (median of {len(runs)}); budget {args.budget} s"
+          f"{' EXCEEDED' if over else ''}.")
+    return 1 if over else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Run the benchmark suite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Time every case and compare against the baseline.")
+    run.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file.")
+    run.add_argument("--save-baseline", action="store_true", help="Record this run as the baseline.")
+    run.add_argument("--filter", action="append", help="Only run cases whose name contains this (repeatable).")
+    run.add_argument("--repeat", type=int, default=5, help="Timed runs per case (default: 5).")
+    run.add_argument("--threshold", type=float, default=0.30,
+                     help="Allowed slowdown before a case counts as a regression (default: 0.30 = 30%%).")
+    run.add_argument("--min-delta-ms", type=float, default=1.0,
+                     help="Ignore slowdowns smaller than this many milliseconds (default: 1).")
+    run.add_argument("--no-calibration", action="store_true",
+                     help="Compare raw times instead of scaling them by the machine calibration.")
+    run.add_argument("--output-rtol", type=float, default=1e-6,
+                     help="Allowed relative difference of numerical outputs (default: 1e-6).")
+
+    past = sub.add_parser("past-outputs", help="Compare results with the reports in assets/past_outputs.")
+    past.add_argument("--sip-rtol", type=float, default=0.05, help="Relative tolerance of the monthly SIP.")
+    past.add_argument("--prob-atol", type=float, default=5.0, help="Tolerance of the goal probability (%% points).")
+    past.add_argument("--return-atol", type=float, default=1.0, help="Tolerance of expected returns (%% points).")
+    past.add_argument("--strict-past-outputs", action="store_true", help="Exit with status 1 on any drift.")
+
+    preview = sub.add_parser("preview-errors", help="Compare the analytic preview with the Monte Carlo engines.")
+    preview.add_argument("--paths", type=int, default=VALIDATION_PATHS,
+                         help=f"Monte Carlo paths per reference run (default: {VALIDATION_PATHS:,}).")
+    preview.add_argument("--max-error-pp", type=float, default=None,
+                         help="Exit with status 1 if the error against the Gaussian engine exceeds this (points).")
+
+    cold = sub.add_parser("cold-start", help="Measure server startup to ready in fresh interpreters.")
+    cold.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs (default: 3).")
+    cold.add_argument("--budget", type=float, default=COLD_START_BUDGET_SECONDS,
+                      help=f"Exit with status 1 if the median time to ready exceeds this (default: {COLD_START_BUDGET_SECONDS} s).")
+
+    args = parser.parse_args(argv)
+
+    # Quiet the pipeline's INFO logs and make the simulations reproducible
+    # (get_logger resets the logger's own level on every call, so quiet the handlers)
+    for handler in get_logger().handlers:
+        handler.setLevel(logging.WARNING)
+    core.portfolio.SIMULATION_SEED = BENCHMARK_SEED
+
+    if args.command == "run":
+        return _run(args)
+    if args.command == "preview-errors":
+        return _preview_errors(args)
+    if args.command == "cold-start":
+        return _cold_start(args)
+    return _past_outputs(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""
+Benchmark cases.
+
+Micro benchmarks cover the hot spots of the analysis pipeline
+(rolling XIRR, composite NAV alignment, INR conversion of single and
+batched misaligned NAV series, goal probability, SIP suggestion,
+analytic preview, response serialization by series mode, visualization
+page rendering, streaming Monte Carlo in float64 and float32, variance
+reduction by engine and sampling mode, parallel simulation by worker count,
+Gaussian against block-bootstrap engine latency);
+macro benchmarks run `run_analysis` end to end. Every case runs across the
+configured risk profiles and horizons, from `SIMULATION_TIME_HORIZONS` up to
+30 years, with a fixed seed so numerical outputs are reproducible.
+"""
+
+import numpy as np
+import pandas as pd
+
+from config import ASSET_NAV_DATA_PATH, NUM_SIMULATIONS, SIMULATION_TIME_HORIZONS, TARGET_PROB_OF_SUCCESS
+from core.currency_converter import CurrencyConverter
+from core.dataset_store import get_dataset_store
+from core.goal_engine import _build_portfolio, run_analysis
+from core.monte_carlo import simulate_path_factors
+from core.sip_plotter import generate_returns_html
+from core.xirr_calculator import XirrCalculator
+from models.goal_request import AssetAllocation
+from utils.series import shape_series
+from benchmarks.harness import BenchmarkCase
+
+BENCHMARK_SEED = 20240101
+GOAL_AMOUNT = 10_000_000.0
+LUMPSUM_AMOUNT = 500_000.0
+HORIZONS = sorted(set(SIMULATION_TIME_HORIZONS) | {20, 30})
+PROFILES = {
+    'conservative': AssetAllocation(),
+    'balanced': AssetAllocation(),
+    'aggressive': AssetAllocation(),
+    'custom': AssetAllocation(largecap=0.5, sp_500=0.25, gold=0.25),
+}
+
+
+def _portfolio(profile: str, horizon: int, with_returns: bool = True):
+    portfolio = _build_portfolio(GOAL_AMOUNT, horizon, LUMPSUM_AMOUNT, profile, PROFILES[profile])
+    if with_returns:
+        portfolio.compute_asset_xirr(mode='median')
+        portfolio.compute_per_asset_sips()
+        portfolio.prepare_composite_nav()
+    portfolio.rng = np.random.default_rng(BENCHMARK_SEED)
+    return portfolio
+
+
+def xirr_cases() -> list[BenchmarkCase]:
+    store = get_dataset_store()
+    cases = []
+    for asset, path in ASSET_NAV_DATA_PATH.items():
+        for horizon in HORIZONS:
+            def fn(_, path=path, horizon=horizon):
+                rate, xirrs, _ = XirrCalculator().compute_rolling_xirr(
+                    horizon, df=store.get_inr_nav(path), mode='median'
+                )
+                return {'median_xirr': rate, 'windows': len(xirrs)}
+            cases.append(BenchmarkCase(f"xirr.compute_rolling_xirr[{asset},{horizon}y]", fn))
+    return cases
+
+
+def composite_nav_cases() -> list[BenchmarkCase]:
+    cases = []
+    for profile in PROFILES:
+        def fn(portfolio):
+            portfolio.prepare_composite_nav()
+            nav = portfolio._composite_nav_df
+            return {'rows': len(nav), 'last_row_sum': float(nav.iloc[-1].sum())}
+        cases.append(BenchmarkCase(
+            f"portfolio.prepare_composite_nav[{profile}]", fn,
+            setup=lambda profile=profile: _portfolio(profile, 10, with_returns=False)
+        ))
+    return cases
+
+
+def probability_cases() -> list[BenchmarkCase]:
+    cases = []
+    for profile in PROFILES:
+        for horizon in HORIZONS:
+            def probability(portfolio):
+                prob = portfolio.probability_of_reaching_goal(
+                    monthly_sip=portfolio.total_monthly_sip,
+                    lumpsum=portfolio.lumpsum_amount,
+                    num_simulations=NUM_SIMULATIONS
+                )
+                return {'probability': prob}
+
+            def warm_portfolio(profile=profile, horizon=horizon):
+                portfolio = _portfolio(profile, horizon)
+                probability(portfolio)   # simulate the paths outside the timed call
+                return portfolio
+
+            def suggest(portfolio):
+                sip = portfolio.suggest_sip_for_probability(
+                    target_prob=TARGET_PROB_OF_SUCCESS,
+                    lumpsum=portfolio.lumpsum_amount,
+                    num_simulations=NUM_SIMULATIONS
+                )
+                return {'suggested_sip': sip}
+
+            cases.append(BenchmarkCase(
+                f"portfolio.probability_of_reaching_goal[{profile},{horizon}y]", probability,
+                setup=lambda profile=profile, horizon=horizon: _portfolio(profile, horizon)
+            ))
+            cases.append(BenchmarkCase(
+                f"portfolio.suggest_sip_for_probability[{profile},{horizon}y]", suggest,
+                setup=warm_portfolio
+            ))
+    return cases
+
+
+def end_to_end_cases() -> list[BenchmarkCase]:
+    cases = []
+    for profile, allocation in PROFILES.items():
+        for horizon in HORIZONS:
+            def fn(_, profile=profile, allocation=allocation, horizon=horizon):
+                summary = run_analysis(GOAL_AMOUNT, horizon, LUMPSUM_AMOUNT, profile, allocation)
+                return {
+                    'total_monthly_sip': summary.total_monthly_sip,
+                    'rolling_xirr': summary.rolling_xirr,
+                    'goal_achievement_probability': summary.goal_achievement_probability,
+                    'suggested_sip': summary.suggested_sip,
+                }
+            cases.append(BenchmarkCase(f"goal_engine.run_analysis[{profile},{horizon}y]", fn))
+    return cases
+
+
+STREAMING_PATHS = 50_000
+STREAMING_CHUNK_PATHS = 10_000
+
+
+def streaming_cases() -> list[BenchmarkCase]:
+    cases = []
+    for dtype in ('float64', 'float32'):
+        def fn(portfolio, dtype=dtype):
+            estimate = portfolio.stream_goal_estimate(
+                STREAMING_PATHS, chunk_paths=STREAMING_CHUNK_PATHS, dtype=dtype
+            )
+            return {
+                'probability': estimate.probability,
+                'suggested_sip': estimate.sip_for_probability(TARGET_PROB_OF_SUCCESS),
+            }
+        cases.append(BenchmarkCase(
+            f"monte_carlo.stream_goal_estimate[balanced,10y,{STREAMING_PATHS},{dtype}]", fn,
+            setup=lambda: _portfolio('balanced', 10)
+        ))
+    return cases
+
+
+VARIANCE_PATHS = 2_000
+VARIANCE_REPLICATES = 20
+VARIANCE_MODES = [
+    ('gaussian', 'pseudo', False), ('gaussian', 'pseudo', True), ('gaussian', 'antithetic', False),
+    ('gaussian', 'antithetic', True), ('gaussian', 'sobol', False),
+    ('bootstrap', 'pseudo', False), ('bootstrap', 'pseudo', True),
+]
+
+
+def variance_reduction_cases() -> list[BenchmarkCase]:
+    """
+    Spread of the goal probability over independently seeded replicates, per
+    engine and sampling mode. 'effective_paths' is the number of plain Monte Carlo paths
+    with the same variance, p(1 - p) / var; 'path_savings' divides it by the
+    paths actually simulated.
+    """
+    cases = []
+    for engine, sampler, control_variate in VARIANCE_MODES:
+        def fn(_, engine=engine, sampler=sampler, control_variate=control_variate):
+            estimates = []
+            for replicate in range(VARIANCE_REPLICATES):
+                portfolio = _portfolio('balanced', 10)
+                portfolio.rng = np.random.default_rng([BENCHMARK_SEED, replicate])
+                portfolio.engine = engine
+                portfolio.sampler = sampler
+                portfolio.control_variate = control_variate
+                estimates.append(portfolio.probability_of_reaching_goal(
+                    monthly_sip=portfolio.total_monthly_sip,
+                    lumpsum=portfolio.lumpsum_amount,
+                    num_simulations=VARIANCE_PATHS
+                ))
+            mean, var = float(np.mean(estimates)), float(np.var(estimates, ddof=1))
+            effective = mean * (1 - mean) / var
+            return {
+                'mean_probability': mean,
+                'std_probability': var ** 0.5,
+                'effective_paths': effective,
+                'path_savings': effective / VARIANCE_PATHS,
+            }
+        mode = (sampler if engine == 'gaussian' else engine) + ('+control' if control_variate else '')
+        cases.append(BenchmarkCase(
+            f"monte_carlo.variance[balanced,10y,{VARIANCE_PATHS}x{VARIANCE_REPLICATES},{mode}]", fn
+        ))
+    return cases
+
+
+PARALLEL_PATHS = 20_000
+PARALLEL_WORKERS = [1, 2, 4]
+
+
+def parallel_cases() -> list[BenchmarkCase]:
+    """
+    Simulation throughput by worker count; compare the times across worker
+    counts on the same machine to see the parallel scaling.
+    """
+    cases = []
+    for workers in PARALLEL_WORKERS:
+        def fn(portfolio, workers=workers):
+            mu, chol = portfolio.estimate_return_model()
+            lumpsum_growth, sip_growth = simulate_path_factors(
+                mu, chol, portfolio.total_months, PARALLEL_PATHS, rng=portfolio.rng, workers=workers
+            )
+            return {'mean_sip_growth': float(sip_growth.mean())}
+        cases.append(BenchmarkCase(
+            f"monte_carlo.simulate_path_factors[balanced,10y,{PARALLEL_PATHS},workers={workers}]", fn,
+            setup=lambda: _portfolio('balanced', 10)
+        ))
+    return cases
+
+
+ENGINE_PATHS = [5_000, 50_000, 500_000]
+
+
+def engine_cases() -> list[BenchmarkCase]:
+    """
+    Simulation latency of the Gaussian and block-bootstrap engines by path
+    count, with the mean weighted growth factors as outputs.
+    """
+    cases = []
+    for paths in ENGINE_PATHS:
+        for engine in ('gaussian', 'bootstrap'):
+            def fn(portfolio, paths=paths):
+                lumpsum_growth, sip_growth = portfolio.simulate_factors_at(
+                    [portfolio.total_months], paths
+                )[portfolio.total_months]
+                weights = np.array([a.weight for a in portfolio.assets])
+                return {
+                    'mean_lumpsum_growth': float((lumpsum_growth @ weights).mean()),
+                    'mean_sip_growth': float((sip_growth @ weights).mean()),
+                }
+
+            def setup(engine=engine):
+                portfolio = _portfolio('balanced', 10)
+                portfolio.engine = engine
+                return portfolio
+            cases.append(BenchmarkCase(f"monte_carlo.engine[balanced,10y,{paths},{engine}]", fn, setup=setup))
+    return cases
+
+
+def preview_cases() -> list[BenchmarkCase]:
+    """
+    Analytic preview of the goal probability and suggested SIP, with the
+    model's preview nodes already built (as for repeated slider requests).
+    See `benchmarks.preview_validation` for its error against Monte Carlo.
+    """
+    cases = []
+    for profile in PROFILES:
+        for horizon in HORIZONS:
+            def fn(portfolio):
+                prob = portfolio.preview_probability_of_reaching_goal(
+                    portfolio.total_monthly_sip, portfolio.lumpsum_amount
+                )
+                sip = portfolio.preview_sip_for_probability(TARGET_PROB_OF_SUCCESS, portfolio.lumpsum_amount)
+                return {'probability': prob, 'suggested_sip': sip}
+
+            def setup(profile=profile, horizon=horizon):
+                portfolio = _portfolio(profile, horizon)
+                portfolio.get_model().preview_factors(portfolio.total_months)
+                return portfolio
+            cases.append(BenchmarkCase(f"analytic_preview.goal[{profile},{horizon}y]", fn, setup=setup))
+    return cases
+
+
+# (name, series_points, series_encoding) of the response modes compared
+SERIES_MODES = (
+    ('full', None, 'list'),
+    ('points60', 60, 'list'),
+    ('compact', None, 'compact'),
+    ('points60_compact', 60, 'compact'),
+)
+
+
+def response_cases() -> list[BenchmarkCase]:
+    """
+    Shaping and JSON serialization of a goal summary in each series mode;
+    outputs record the response size.
+    """
+    cases = []
+    for name, points, encoding in SERIES_MODES:
+        for horizon in HORIZONS:
+            def fn(summary, points=points, encoding=encoding):
+                payload = shape_series(summary, points, encoding=encoding).model_dump_json()
+                return {'bytes': len(payload)}
+
+            def setup(horizon=horizon):
+                return run_analysis(GOAL_AMOUNT, horizon, LUMPSUM_AMOUNT, 'balanced', PROFILES['balanced'], preview=True)
+            cases.append(BenchmarkCase(f"response.serialize[{name},{horizon}y]", fn, setup=setup))
+    return cases
+
+
+def visualization_cases() -> list[BenchmarkCase]:
+    """
+    Rendering the returns visualization page from the prebuilt template
+    (static assets already built); outputs record the page size.
+    """
+    cases = []
+    for horizon in HORIZONS:
+        def fn(series):
+            return {'bytes': len(generate_returns_html(*series))}
+
+        def setup(horizon=horizon):
+            xirrs, dates = _portfolio('balanced', horizon).compute_portfolio_rolling_xirr(mode='median')
+            series = (xirrs, [d.strftime('%Y-%m-%d') for d in dates])
+            generate_returns_html(*series)
+            return series
+        cases.append(BenchmarkCase(f"visualization.render[balanced,{horizon}y]", fn, setup=setup))
+    return cases
+
+
+def currency_cases() -> list[BenchmarkCase]:
+    """
+    INR conversion of foreign-currency NAVs: one asset, and 50 copies with
+    dates shifted by 1-4 days (misaligned with the forex dates) converted one
+    by one and in one pass.
+    """
+    def summarize(converted):
+        return {'rows': sum(len(df) for df in converted), 'last_sum': float(sum(df['NAV_INR'].iloc[-1] for df in converted))}
+
+    def setup():
+        nav = get_dataset_store().get_nav(ASSET_NAV_DATA_PATH['sp_500'])
+        return {f"sp_500+{i}d": nav.assign(Date=nav['Date'] + pd.Timedelta(days=1 + i % 4)) for i in range(50)}
+
+    return [
+        BenchmarkCase(
+            "currency.convert[sp_500]",
+            lambda nav: summarize([CurrencyConverter().convert_to_inr(nav_data=nav)]),
+            setup=lambda: get_dataset_store().get_nav(ASSET_NAV_DATA_PATH['sp_500'])
+        ),
+        BenchmarkCase(
+            "currency.convert[50 misaligned,each]",
+            lambda navs: summarize([CurrencyConverter().convert_to_inr(nav_data=df) for df in navs.values()]),
+            setup=setup
+        ),
+        BenchmarkCase(
+            "currency.convert[50 misaligned,batch]",
+            lambda navs: summarize(CurrencyConverter().convert_many_to_inr(navs).values()),
+            setup=setup
+        ),
+    ]
+
+
+def all_cases() -> list[BenchmarkCase]:
+    return (
+        xirr_cases() + composite_nav_cases() + currency_cases() + probability_cases() + preview_cases() + response_cases()
+        + visualization_cases() + streaming_cases() + variance_reduction_cases() + parallel_cases() + engine_cases() + end_to_end_cases()
+    )
@@ -0,0 +1,79 @@
+"""
+Cold-start measurement of the API server.
+
+Each run starts a fresh interpreter (`python -m benchmarks.cold_start`) that
+imports the app, runs its startup (lifespan) until `/ready` would succeed,
+then times a first and a second `/calculate-goal` call (result cache
+disabled). Reported per run, in seconds:
+
+  - import: importing `main`
+  - ready: from importing `main` to warm (what `/ready` reports)
+  - first_request / second_request: the two goal calculations
+
+Run through `python -m benchmarks cold-start`, which fails when the median
+time to ready exceeds `COLD_START_BUDGET_SECONDS`.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+_MARKER = 'COLD_START '
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_REQUEST = {
+    'goal_amount': 10_000_000.0, 'time_horizon': 10, 'lumpsum_amount': 500_000.0,
+    'risk_profile': 'balanced', 'asset_allocation': {},
+}
+
+
+def measure_cold_start(timeout_s: float = 120.0) -> dict[str, float]:
+    """
+    Runs one cold start in a fresh interpreter and returns its timings.
+
+    :raises RuntimeError: If the child process fails or reports nothing.
+    """
+    proc = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.cold_start'],
+        cwd=_REPO_ROOT, capture_output=True, text=True, timeout=timeout_s
+    )
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith(_MARKER):
+            return json.loads(line[len(_MARKER):])
+    raise RuntimeError(f"Cold-start run failed (exit {proc.returncode}): {proc.stderr.strip()[-2000:]}")
+
+
+def _child(ready_timeout_s: float = 60.0) -> dict[str, float]:
+    start = time.perf_counter()
+    import main
+    from fastapi import Response
+    from models.goal_request import GoalRequest
+    from utils.logger import get_logger
+    imported = time.perf_counter() - start
+
+    for handler in get_logger().handlers:
+        handler.setLevel(logging.WARNING)
+    main.RESULT_CACHE_ENABLED = False
+
+    async def scenario() -> dict[str, float]:
+        async with main.lifespan(main.app):
+            deadline = time.perf_counter() + ready_timeout_s
+            while main.ready_after is None:
+                if time.perf_counter() > deadline:
+                    raise TimeoutError(f"Not ready after {ready_timeout_s} s.")
+                await asyncio.sleep(0.005)
+            timings = {'import': imported, 'ready': main.ready_after}
+            for name in ('first_request', 'second_request'):
+                t = time.perf_counter()
+                await main.calculate_goal(GoalRequest(**_REQUEST), Response())
+                timings[name] = time.perf_counter() - t
+            return timings
+
+    return asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    print(_MARKER + json.dumps(_child()))
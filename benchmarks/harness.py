@@ -0,0 +1,158 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import time as tm
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+
+
+class BenchmarkCase:
+    """
+    One benchmark: an untimed `setup()` producing a state, and a timed
+    `fn(state)` returning a dict of numerical outputs to check against the
+    baseline.
+    """
+
+    def __init__(self, name: str, fn: Callable[[object], dict], setup: Callable[[], object] | None = None):
+        self.name = name
+        self.fn = fn
+        self.setup = setup if setup is not None else (lambda: None)
+
+    def run(self, repeat: int, warmup: int = 1, min_time: float = 0.5, max_repeat: int = 100) -> dict:
+        """
+        Runs the case with a fresh state each time: `warmup` untimed runs,
+        then at least `repeat` timed runs, continuing (up to `max_repeat`)
+        until the timed runs add up to `min_time` seconds. As in `timeit`,
+        garbage collection is disabled while timing.
+
+        :return: Dict with 'min_s', 'median_s', 'repeat' (timed runs) and the
+                 'outputs' of the last run.
+        """
+        times = []
+        outputs = {}
+        for _ in range(warmup):
+            self.fn(self.setup())
+        while len(times) < repeat or (sum(times) < min_time and len(times) < max_repeat):
+            state = self.setup()
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                start = tm.perf_counter()
+                outputs = self.fn(state)
+                times.append(tm.perf_counter() - start)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+        return {
+            'min_s': min(times),
+            'median_s': statistics.median(times),
+            'repeat': len(times),
+            # Non-numeric outputs (e.g. "SIP not required" messages) are not compared
+            'outputs': {k: float(v) for k, v in outputs.items() if isinstance(v, (int, float, np.number))},
+        }
+
+
+def calibrate(repeat: int = 20) -> float:
+    """
+    Best time of a fixed reference workload (random draws, `exp`, a small
+    matrix product and a Python loop). Comparing it between a run and its
+    baseline factors out machine-wide speed changes, e.g. on shared hosts.
+    """
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((64, 64))
+    best = float('inf')
+    for _ in range(repeat):
+        start = tm.perf_counter()
+        draws = rng.standard_normal((2_000, 64))
+        np.exp(draws @ matrix * 0.01).sum()
+        total = 0.0
+        for i in range(20_000):
+            total += i * 0.5
+        best = min(best, tm.perf_counter() - start)
+    return best
+
+
+def machine_info() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save_baseline(path: str, results: dict[str, dict], meta: dict) -> None:
+    """
+    Writes `results` (case name -> result of BenchmarkCase.run) as a JSON baseline.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    baseline = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': machine_info(),
+        **meta,
+        'cases': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_baseline(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(
+    results: dict[str, dict],
+    baseline: dict,
+    threshold: float,
+    min_delta_s: float,
+    output_rtol: float,
+    calibration: float | None = None
+) -> dict[str, list[str]]:
+    """
+    Compares a run against a baseline.
+
+    A case regresses when its best time, scaled by the ratio of the
+    baseline's calibration time to this run's (`calibration`), exceeds the
+    baseline's by more than `threshold` (relative) and by more than
+    `min_delta_s` (absolute, to ignore timer noise on very fast cases). An output mismatches when it differs
+    from the baseline by more than `output_rtol` (relative).
+
+    :return: Dict with 'regressions', 'mismatches' and 'new' (cases missing
+             from the baseline), each a list of messages.
+    """
+    report = {'regressions': [], 'mismatches': [], 'new': []}
+    cases = baseline.get('cases', {})
+    scale = 1.0
+    if calibration and baseline.get('calibration_s'):
+        scale = baseline['calibration_s'] / calibration
+
+    for name, result in results.items():
+        base = cases.get(name)
+        if base is None:
+            report['new'].append(name)
+            continue
+
+        adjusted = result['min_s'] * scale
+        ratio = adjusted / base['min_s'] if base['min_s'] > 0 else float('inf')
+        if ratio > 1 + threshold and adjusted - base['min_s'] > min_delta_s:
+            report['regressions'].append(
+                f"{name}: {result['min_s'] * 1e3:.2f} ms ({adjusted * 1e3:.2f} ms calibrated) "
+                f"vs baseline {base['min_s'] * 1e3:.2f} ms ({ratio:.2f}x)"
+            )
+
+        for key, value in result['outputs'].items():
+            expected = base.get('outputs', {}).get(key)
+            if expected is None:
+                continue
+            if abs(value - expected) > output_rtol * max(abs(expected), 1e-12):
+                report['mismatches'].append(f"{name}: {key} = {value!r}, baseline {expected!r}")
+    return report
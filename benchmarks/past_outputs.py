@@ -0,0 +1,138 @@
+"""
+Checks current results against the text reports in `assets/past_outputs/`.
+
+Each report records one goal analysis (goal, horizon, lumpsum, profile, the
+allocation with per-asset expected returns, the monthly SIP and the goal
+probability). A report is re-run as a 'custom' allocation when every asset
+in it still exists; reports over assets that are no longer in the dataset
+(e.g. smallcap, midcap, debt) are skipped with a note.
+
+The NAV history has been extended (and the models revised) since the reports
+were written, so values are compared with tolerances and differences are
+reported as drift; they only fail a run with `--strict-past-outputs`.
+"""
+
+import glob
+import os
+import re
+
+from config import ASSET_NAV_DATA_PATH, ASSET_RETURN_RATES
+from core.goal_engine import run_analysis
+from models.goal_request import AssetAllocation
+
+PAST_OUTPUTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'past_outputs')
+
+_NUMBER = r'([\d,]+(?:\.\d+)?)'
+_PATTERNS = {
+    'goal_amount': re.compile(rf'Goal Amount\s*:\s*₹{_NUMBER}'),
+    'time_horizon': re.compile(r'Time Horizon\s*:\s*(\d+) years'),
+    'lumpsum_amount': re.compile(rf'Lumpsum Amount\s*:\s*₹{_NUMBER}'),
+    'total_monthly_sip': re.compile(rf'Total Monthly SIP\s*:\s*₹{_NUMBER}'),
+    'risk_profile': re.compile(r'Risk Profile\s*:\s*(\w+)'),
+    'probability': re.compile(rf'Probability of reaching .*?:\s*{_NUMBER}%'),
+}
+_ALLOCATION = re.compile(rf'•\s*(\S+)\s+weight=([\d.]+), exp_return=([-\d.]+)%, SIP=₹{_NUMBER}')
+
+
+def _number(text: str) -> float:
+    return float(text.replace(',', ''))
+
+
+def parse_report(path: str) -> dict | None:
+    """
+    Parses one past-output report.
+
+    :return: Dict with goal_amount, time_horizon, lumpsum_amount,
+             total_monthly_sip, risk_profile, probability (%, None if not
+             reported) and allocation {asset: (weight, expected_return %)},
+             or None if the file is not a portfolio summary.
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+
+    report = {}
+    for field, pattern in _PATTERNS.items():
+        match = pattern.search(text)
+        report[field] = match.group(1) if match else None
+    if None in (report['goal_amount'], report['time_horizon'], report['lumpsum_amount'], report['risk_profile']):
+        return None
+
+    report['risk_profile'] = report['risk_profile'].lower()
+    report['time_horizon'] = int(report['time_horizon'])
+    for field in ('goal_amount', 'lumpsum_amount', 'total_monthly_sip', 'probability'):
+        if report[field] is not None:
+            report[field] = _number(report[field])
+    if report['total_monthly_sip'] is None and 'SIP not required' in text:
+        report['total_monthly_sip'] = 0.0
+    report['allocation'] = {
+        name.lower().replace('s&p_500', 'sp_500'): (float(weight), float(exp_return))
+        for name, weight, exp_return, _ in _ALLOCATION.findall(text)
+    }
+    return report
+
+
+def compare_report(report: dict, sip_rtol: float, prob_atol: float, return_atol: float) -> dict:
+    """
+    Re-runs the analysis of `report` and compares the results.
+
+    :param sip_rtol: Allowed relative difference of the total monthly SIP.
+    :param prob_atol: Allowed difference of the goal probability (% points).
+    :param return_atol: Allowed difference of each expected return (% points).
+    :return: Dict with 'status' ('ok', 'drift' or 'skipped'), a 'note' and,
+             unless skipped, the compared 'values' {field: (past, current)}.
+    """
+    known = set(ASSET_NAV_DATA_PATH) | set(ASSET_RETURN_RATES)
+    unknown = sorted(set(report['allocation']) - known)
+    if unknown:
+        return {'status': 'skipped', 'note': f"assets not in current dataset: {', '.join(unknown)}"}
+
+    allocation = AssetAllocation(**{name: weight for name, (weight, _) in report['allocation'].items()})
+    summary = run_analysis(
+        goal_amount=report['goal_amount'],
+        time_horizon=report['time_horizon'],
+        lumpsum=report['lumpsum_amount'],
+        risk_profile='custom',
+        allocation=allocation
+    )
+
+    # The SIP is reported as a message when the lumpsum alone reaches the goal
+    sip = summary.total_monthly_sip if isinstance(summary.total_monthly_sip, float) else 0.0
+    values = {'total_monthly_sip': (report['total_monthly_sip'], sip)}
+    failures = []
+    if abs(sip - report['total_monthly_sip']) > sip_rtol * report['total_monthly_sip']:
+        failures.append('total_monthly_sip')
+    if report['probability'] is not None:
+        values['probability'] = (report['probability'], summary.goal_achievement_probability)
+        if abs(summary.goal_achievement_probability - report['probability']) > prob_atol:
+            failures.append('probability')
+
+    current_returns = {a.name: a.expected_return for a in summary.asset_summaries}
+    for name, (_, past_return) in report['allocation'].items():
+        values[f'expected_return[{name}]'] = (past_return, current_returns.get(name))
+        if current_returns.get(name) is None or abs(current_returns[name] - past_return) > return_atol:
+            failures.append(f'expected_return[{name}]')
+
+    note = f"outside tolerance: {', '.join(failures)}" if failures else "within tolerance"
+    return {'status': 'drift' if failures else 'ok', 'note': note, 'values': values}
+
+
+def check_past_outputs(
+    sip_rtol: float,
+    prob_atol: float,
+    return_atol: float,
+    directory: str = PAST_OUTPUTS_DIR
+) -> dict[str, dict]:
+    """
+    Compares every report under `directory` (recursively).
+
+    :return: Dict mapping the report's relative path to its comparison result.
+    """
+    results = {}
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*.txt'), recursive=True)):
+        name = os.path.relpath(path, directory)
+        report = parse_report(path)
+        if report is None:
+            results[name] = {'status': 'skipped', 'note': 'not a portfolio summary'}
+            continue
+        results[name] = compare_report(report, sip_rtol, prob_atol, return_atol)
+    return results
@@ -20,6 +20,50 @@ USER_RISK_PROFILES : list of str
     asset allocation mixes.
 SIMULATION_TIME_HORIZONS : list of int
     Time horizons (in years) over which simulations are conducted.
+SIMULATION_SEED : int or None
+    Seed for the Monte Carlo random generator (None = fresh entropy per request).
+MC_BLOCK_MONTHS : int
+    Maximum number of months simulated per vectorized block in the Monte Carlo kernel.
+MC_ENGINE : str
+    Default Monte Carlo engine: 'bootstrap' (historical block bootstrap) or 'gaussian'.
+MC_BOOTSTRAP_BLOCK_MONTHS : int
+    Consecutive historical months per block of the block-bootstrap engine.
+MC_SAMPLER : str
+    How the Gaussian engine draws its shocks: 'pseudo', 'antithetic' or 'sobol'.
+MC_CONTROL_VARIATE : bool
+    Whether goal probabilities use the terminal value as a control variate.
+MC_ADAPTIVE : bool
+    Whether the goal probability is estimated with a confidence-interval stopping rule.
+MC_PROBABILITY_TOLERANCE : float
+    Target half-width of the goal-probability confidence interval.
+MC_CONFIDENCE_LEVEL : float
+    Confidence level of that interval.
+MC_SIP_TOLERANCE : float
+    Target half-width of the suggested SIP's confidence interval, relative to the SIP.
+MC_SIP_TOLERANCE_AMOUNT : float
+    Half-width (₹) of that interval below which it is always precise enough.
+MC_MIN_SIMULATIONS : int
+    Paths simulated before the stopping rule is first checked.
+MC_MAX_SIMULATIONS : int
+    Path budget of an adaptive estimate.
+MC_ADAPTIVE_BATCH : int
+    Smallest number of paths added per adaptive step.
+MC_PARALLEL_WORKERS : int
+    Number of independent shards (and pool workers) per Monte Carlo simulation.
+MC_PARALLEL_KIND : str
+    Pool used for parallel Monte Carlo shards: 'thread' or 'process'.
+MC_CHUNK_PATHS : int
+    Paths per chunk in streaming Monte Carlo runs.
+MC_MEMORY_BUDGET_MB : int
+    Working-memory budget of one streaming Monte Carlo chunk.
+MC_DTYPE : str
+    Floating-point type of streaming Monte Carlo runs ('float64' or 'float32').
+MC_SKETCH_SIZE : int
+    Size of the quantile sketches kept by streaming Monte Carlo runs.
+PREVIEW_POINTS : int
+    Quadrature nodes of the analytic preview mode.
+PORTFOLIO_MODEL_CACHE_SIZE : int
+    Number of compiled portfolio models (return statistics per asset set) kept in memory.
 
 Logging Parameters
 ------------------
@@ -27,17 +71,64 @@ LOGGING_DIR : str
     Directory where log files will be stored.
 LOGGING_LIMIT_DAYS : int
     Number of days to retain rotated log files.
+LOGGING_FORMAT : str
+    Log record format: 'text' (colored console, plain file) or 'json' (JSON lines).
+LOGGING_INFO_SAMPLE_RATE : float
+    Fraction of requests whose INFO (and lower) records are logged.
 CREATE_HISTOGRAM : bool
     Whether to generate a histogram of simulated returns.
 HISTOGRAM_PATH : str
     File path to save the histogram image.
 
+Server Parameters
+-----------------
+WORKER_POOL_KIND : str
+    Executor used for CPU-bound request work: 'process' or 'thread'.
+WORKER_POOL_SIZE : int
+    Number of pool workers.
+WORKER_POOL_MAX_QUEUE : int
+    Requests allowed to wait for a worker before new ones are rejected (503).
+WARMUP_ENABLED : bool
+    Whether workers warm the caches of the built-in risk profiles at startup.
+COLD_START_BUDGET_SECONDS : float
+    Time from import to ready (`/ready`) beyond which startup is reported as over budget.
+MAX_BATCH_SIZE : int
+    Maximum number of goals accepted by `/calculate-goals-batch`.
+SERIES_MAX_POINTS : int or None
+    Default point budget of each time series in goal responses (None = full series).
+MEMORY_TRACE_SAMPLE_RATE : float
+    Fraction of analysis calls whose peak memory is traced (0 disables tracing).
+RESULT_CACHE_ENABLED : bool
+    Whether goal results are served from the persistent result cache.
+RESULT_CACHE_PATH : str
+    SQLite database shared by all server processes for cached results.
+RESULT_CACHE_MAX_ENTRIES : int
+    Number of cached results kept before least recently used ones are evicted.
+RESULT_CACHE_TTL_SECONDS : int
+    Age after which a cached result expires.
+VISUALIZATION_CACHE_SIZE : int
+    Number of rendered returns-visualization pages kept in memory.
+PLOTLY_JS_PATH : str or None
+    plotly.js bundle served at `/static/plotly.min.js` (None = the installed plotly package's).
+
 Data Paths
 ----------
 FOREX_RATES_DIR : str
     Directory containing monthly foreign exchange rate data.
+FOREX_ASOF_TOLERANCE_DAYS : int
+    Maximum age of the forex rate matched to a NAV date during INR conversion.
 ASSET_NAV_DATA_PATH : dict
     Maps asset names to their corresponding `.feather` NAV data file paths.
+XIRR_INDEX_DIR : str
+    Directory holding the precomputed rolling-XIRR index (one `.npz` per asset).
+NAV_DATASET_PATH : str
+    Uncompressed Arrow IPC file with every NAV and forex series, memory-mapped and shared by all workers.
+RAW_DATA_DIR : str
+    Directory of the raw daily price CSVs ingested by `python -m core.ingest`.
+RAW_NAV_SOURCES : dict
+    Raw CSVs (and their column/date formats) each monthly NAV file is built from.
+RAW_FOREX_SOURCES : dict
+    Raw CSVs each monthly `<CURRENCY>_to_INR` forex file is built from.
 
 Portfolio Definitions
 ----------------------
@@ -76,6 +167,96 @@ USER_RISK_PROFILES = ['conservative', 'balanced', 'aggressive', 'custom']
 SIMULATION_TIME_HORIZONS = [1, 3, 5, 10]
 """list[int]: Investment time horizons in years to run simulations for."""
 
+SIMULATION_SEED = None
+"""int | None: Seed for the Monte Carlo random generator. None draws fresh entropy per request."""
+
+MC_BLOCK_MONTHS = 12
+"""int: Maximum months simulated per vectorized block in the Monte Carlo kernel.
+   Larger blocks mean fewer Python iterations but larger scratch buffers; the kernel
+   shortens blocks to the horizon and to keep its buffers in cache."""
+
+MC_ENGINE = 'bootstrap'
+"""str: Default Monte Carlo engine, overridable per request. 'bootstrap' resamples blocks of
+   historical monthly return vectors, keeping fat tails, cross-asset dependence and short-term
+   autocorrelation; 'gaussian' draws i.i.d. normal log-returns from the historical drift and
+   covariance."""
+
+MC_BOOTSTRAP_BLOCK_MONTHS = 12
+"""int: Consecutive historical months per block of the block-bootstrap engine. Longer blocks
+   keep longer-range autocorrelation but resample fewer distinct histories."""
+
+MC_SAMPLER = 'antithetic'
+"""str: How the Gaussian engine draws its shocks: 'pseudo' (independent normals), 'antithetic'
+   (pairs of opposite shocks) or 'sobol' (scrambled Sobol points through the inverse normal CDF)."""
+
+MC_CONTROL_VARIATE = False
+"""bool: Whether goal probabilities use the terminal value, whose mean is known in closed
+   form, as a control variate."""
+
+MC_ADAPTIVE = True
+"""bool: Whether the goal probability is estimated adaptively: paths are added in batches
+   until the confidence interval is narrower than `MC_PROBABILITY_TOLERANCE`, between
+   `MC_MIN_SIMULATIONS` and `MC_MAX_SIMULATIONS` paths. If False, `NUM_SIMULATIONS` paths
+   are always simulated."""
+
+MC_PROBABILITY_TOLERANCE = 0.015
+"""float: Target half-width of the goal-probability confidence interval (0.015 = ±1.5 points)."""
+
+MC_CONFIDENCE_LEVEL = 0.95
+"""float: Confidence level of the goal-probability and suggested-SIP intervals."""
+
+MC_SIP_TOLERANCE = 0.02
+"""float: Target half-width of the suggested SIP's confidence interval, as a fraction of the
+   SIP (0.02 = ±2%). The SIP is a quantile of the paths at `TARGET_PROB_OF_SUCCESS`, whose
+   precision the goal-probability interval says nothing about, so with `MC_ADAPTIVE` it has its
+   own stopping rule, within the same path budget."""
+
+MC_SIP_TOLERANCE_AMOUNT = 100.0
+"""float: Half-width (₹) of the suggested SIP's confidence interval that is precise enough
+   whatever the SIP, so that small SIPs, for which ±`MC_SIP_TOLERANCE` is a few rupees, do
+   not run to the path budget."""
+
+MC_MIN_SIMULATIONS = 1000
+"""int: Paths simulated before the adaptive stopping rule is first checked."""
+
+MC_MAX_SIMULATIONS = 20_000
+"""int: Path budget of an adaptive estimate; it stops there even if the tolerance is not met."""
+
+MC_ADAPTIVE_BATCH = 500
+"""int: Smallest number of paths added per adaptive step."""
+
+MC_PARALLEL_WORKERS = 1
+"""int: Shards (and pool workers) a Monte Carlo simulation is split across. 1 simulates
+   in the calling thread. Results are reproducible for a given seed and worker count,
+   but change with the worker count."""
+
+MC_PARALLEL_KIND = 'thread'
+"""str: Pool used for parallel Monte Carlo shards: 'thread' or 'process'. Use 'thread'
+   with the 'process' worker pool, whose daemon workers cannot start child processes."""
+
+MC_CHUNK_PATHS = 100_000
+"""int: Paths per chunk in streaming Monte Carlo runs (`stream_goal_estimate`),
+   further capped so that a chunk fits `MC_MEMORY_BUDGET_MB`."""
+
+MC_MEMORY_BUDGET_MB = 256
+"""int: Working-memory budget (MiB) of one streaming Monte Carlo chunk; bounds peak
+   memory regardless of the number of paths requested."""
+
+MC_DTYPE = 'float64'
+"""str: Floating-point type of streaming Monte Carlo runs, 'float64' or 'float32'."""
+
+MC_SKETCH_SIZE = 2048
+"""int: Centroids kept by the quantile sketches of streaming Monte Carlo runs."""
+
+PREVIEW_POINTS = 4096
+"""int: Quasi-random nodes at which the analytic preview (`core.analytic_preview`) evaluates
+   its lognormal approximation of the growth factors. More nodes smooth the probability at a
+   proportional cost."""
+
+PORTFOLIO_MODEL_CACHE_SIZE = 64
+"""int: Number of compiled portfolio models (aligned NAVs, drift, covariance and
+   Cholesky factor per distinct asset set) kept in a per-process LRU cache."""
+
 # ---------------- Logging Parameters ----------------
 
 LOGGING_DIR = "logs/"
@@ -84,17 +265,88 @@ LOGGING_DIR = "logs/"
 LOGGING_LIMIT_DAYS = 10
 """int: Number of days to retain rotated log files before deletion."""
 
+LOGGING_FORMAT = 'text'
+"""str: 'text' writes colored lines to the console and plain lines to the file; 'json' writes
+   one JSON object per record to both, with the request ID and, where recorded, stage timings."""
+
+LOGGING_INFO_SAMPLE_RATE = 1.0
+"""float: Fraction of requests whose INFO and DEBUG records are kept. Requests are sampled by
+   request ID, so a sampled request keeps all its lines (in every process); records outside a
+   request are sampled one by one. Warnings and errors are always kept."""
+
 CREATE_HISTOGRAM = False
 """bool: Whether to generate a histogram of simulated returns."""
 
 HISTOGRAM_PATH = 'temp/returns_histogram.png'
 """str: File path where the generated returns histogram will be saved."""
 
+# ---------------- Server Parameters ----------------
+
+WORKER_POOL_KIND = "process"
+"""str: Executor for CPU-bound request work ('process' or 'thread').
+   Process workers scale across cores; thread workers share one interpreter."""
+
+WORKER_POOL_SIZE = os.cpu_count() or 1
+"""int: Number of workers in the analysis pool."""
+
+WORKER_POOL_MAX_QUEUE = 2 * WORKER_POOL_SIZE
+"""int: Requests allowed to wait for a free worker. Beyond
+   WORKER_POOL_SIZE + WORKER_POOL_MAX_QUEUE in-flight requests, new ones get HTTP 503."""
+
+WARMUP_ENABLED = True
+"""bool: Warm every worker at startup for the built-in risk profiles: datasets, the
+   rolling-XIRR index, compiled portfolio models and analytic preview nodes for every
+   horizon in SIMULATION_TIME_HORIZONS, and the Monte Carlo kernels. `/ready` reports
+   success once this is done."""
+
+COLD_START_BUDGET_SECONDS = 5.0
+"""float: Budget for the time from importing the app to being ready. Exceeding it logs a
+   warning; `python -m benchmarks cold-start` fails above it."""
+
+MAX_BATCH_SIZE = 50
+"""int: Maximum number of goals accepted in one `/calculate-goals-batch` request."""
+
+SERIES_MAX_POINTS = None
+"""int or None: Points kept per time series (growth curve, rolling returns, dates) in goal
+   responses that do not set `series_points`. Longer series are downsampled evenly, keeping
+   their first and last points. None returns every point."""
+
+MEMORY_TRACE_SAMPLE_RATE = 0.0
+"""float: Fraction of analysis calls traced with tracemalloc to record peak memory
+   (exported at `/metrics`). Tracing slows every allocation, so keep this small."""
+
+RESULT_CACHE_ENABLED = True
+"""bool: Serve repeated goal requests from the persistent result cache.
+   Entries are invalidated automatically when any NAV or forex file changes."""
+
+RESULT_CACHE_PATH = os.path.join(os.getcwd(), 'data/cache/results.sqlite3')
+"""str: SQLite database holding cached goal results, shared by all server processes."""
+
+RESULT_CACHE_MAX_ENTRIES = 10_000
+"""int: Maximum number of cached results; least recently used entries are evicted beyond it."""
+
+RESULT_CACHE_TTL_SECONDS = 24 * 60 * 60
+"""int: Seconds after which a cached result expires."""
+
+VISUALIZATION_CACHE_SIZE = 256
+"""int: Rendered `/get-returns-visualization` pages kept in a per-process LRU cache,
+   keyed by a hash of their data. Also answers conditional requests (ETag / 304)."""
+
+PLOTLY_JS_PATH = None
+"""str or None: plotly.js bundle served by the app at `/static/plotly.min.js` for the
+   visualization pages. None serves the bundle shipped with the installed plotly package,
+   which matches the version the chart layout is generated with."""
+
 # ---------------- Data Paths ----------------
 
 FOREX_RATES_DIR = os.path.join(os.getcwd(), 'data/newfinal/monthly_forex/')
 """str: Directory containing monthly foreign exchange rate data files."""
 
+FOREX_ASOF_TOLERANCE_DAYS = 31
+"""int: NAV dates are converted at the latest forex rate dated on or before them, if it is at most
+   this many days old; NAV rows without such a rate are dropped. 31 days lets monthly NAV and forex
+   series dated on different days of the month (or missing one month of rates) still match."""
+
 ASSET_NAV_DATA_PATH = {
     "largecap": os.path.join(os.getcwd(), "data/newfinal/monthly_nav/largecap.feather"),
     "sp_500":   os.path.join(os.getcwd(), "data/newfinal/monthly_nav/sp500.feather"),
@@ -102,6 +354,32 @@ ASSET_NAV_DATA_PATH = {
 }
 """dict[str, str]: Maps asset identifiers to paths for their monthly NAV `.feather` files."""
 
+XIRR_INDEX_DIR = os.path.join(os.getcwd(), 'data/index/rolling_xirr/')
+"""str: Directory holding the precomputed rolling-XIRR index, built with `python -m core.xirr_index build`."""
+
+NAV_DATASET_PATH = os.path.join(os.getcwd(), 'data/index/nav_dataset.arrow')
+"""str: Consolidated, memory-mapped Arrow copy of every NAV and forex series, built with `python -m core.nav_dataset build`."""
+
+RAW_DATA_DIR = os.path.join(os.getcwd(), 'data/raw/')
+"""str: Directory of the raw daily price CSVs (as downloaded) that `python -m core.ingest build` turns
+   into the monthly NAV and forex Feather files."""
+
+RAW_NAV_SOURCES = {
+    "largecap": {"currency": "INR", "files": [("NIFTY 50 Historical Data.csv", "Close", "%d %b %Y")]},
+    "sp_500":   {"currency": "USD", "files": [("S&P 500 Historical Data.csv", "Price", "%d-%m-%Y")]},
+    "gold":     {"currency": "INR", "files": [("Gold Prices Historical Data.csv", "INR", "%Y-%m-%d"),
+                                              ("XAU_INR Historical Data.csv", "Price", "%d-%m-%Y")]},
+}
+"""dict[str, dict]: Raw sources of each asset in `ASSET_NAV_DATA_PATH`: its currency (the file gets a
+   `NAV_<currency>` column) and a list of (file under `RAW_DATA_DIR`, price column, `Date` format).
+   Files are combined day by day; where they overlap, later files win."""
+
+RAW_FOREX_SOURCES = {
+    "USD": [("USD_INR Historical Data.csv", "Price", "%d-%m-%Y")],
+}
+"""dict[str, list]: Raw sources of each `<CURRENCY>_to_INR` file in `FOREX_RATES_DIR`, as
+   (file under `RAW_DATA_DIR`, rate column, `Date` format) tuples."""
+
 # ---------------- Portfolio Definitions ----------------
 
 CONSERVATIVE_PORTFOLIO = {
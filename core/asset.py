@@ -1,7 +1,9 @@
 import pandas as pd
 
-from core.xirr_calculator import XirrCalculator
-from core.currency_converter import CurrencyConverter
+from core.dataset_store import get_dataset_store
+from core.exceptions import InvalidReturnCalculationModeError
+from core.xirr_calculator import RETURN_CALCULATION_MODES, XirrCalculator
+from core.xirr_index import get_xirr_index
 
 class Asset:
     """
@@ -36,33 +38,60 @@ class Asset:
         self.expected_return_rate: float = return_rate   # % annual, from rolling‐window XIRR
         self.asset_sip_amount: float = 0.0       # ₹ SIP per month for this asset
         self.asset_xirr: float = 0.0             # XIRR % computed for this asset
+        self.rolling_xirr_stats: dict[int, dict[str, float]] = {}  # horizon -> {mode: %}
         self._df: pd.DataFrame | None = None     # loaded historical DataFrame
         self.data_available = False if return_rate else True
 
     def convert_navs_to_inr(self) -> None:
         """
         Converts the NAV of the historical data to INR using date-matched conversion rates.
+        The converted series is shared through the dataset store, so it is only
+        computed once per process.
         """
         if not self.data_available:
             return
-        curr_conv = CurrencyConverter()
-        if self._df is None:
-            self.load_history()
 
         # Assumes date-aligned FX rates exist for all NAV dates
-        self._df = curr_conv.convert_to_inr(nav_data=self._df)
+        self._df = get_dataset_store().get_inr_nav(self.feather_path)
 
     def load_history(self) -> None:
         """
-        Reads the Feather file into self._df, normalizes dates to midnight, and sorts.
+        Points self._df at the Feather file's history held by the shared dataset
+        store (dates normalized to midnight and sorted). The frame is shared and
+        must not be modified in place.
         Expects the Feather file to contain a 'Date' column.
         """
         if not self.data_available:
             return
-        df = pd.read_feather(self.feather_path)
-        df['Date'] = pd.to_datetime(df['Date']).dt.normalize()
-        df = df.sort_values('Date').reset_index(drop=True)
-        self._df = df
+        self._df = get_dataset_store().get_nav(self.feather_path)
+
+    def compute_rolling_xirr_stats(self, time_horizon: int) -> dict[str, float]:
+        """
+        Returns every rolling-window SIP XIRR statistic (median/mean/
+        pessimistic/optimistic) for this asset at `time_horizon` years.
+
+        Served from the precomputed rolling-XIRR index when it is up to date
+        with the asset's data; otherwise computed from history in one pass.
+        Results are memoized per horizon on the instance.
+
+        :param time_horizon: Number of years for the rolling XIRR window.
+        :return: Dict mapping mode to annual return rate (%).
+        """
+        stats = self.rolling_xirr_stats.get(time_horizon)
+        if stats is not None:
+            return stats
+
+        stats = get_xirr_index().lookup(self.name, self.feather_path, time_horizon)
+        if stats is None:
+            if self._df is None:
+                self.load_history()
+            stats, _, _ = XirrCalculator().compute_rolling_xirr_stats(
+                time_horizon=time_horizon,
+                df=self._df
+            )
+
+        self.rolling_xirr_stats[time_horizon] = stats
+        return stats
 
     def compute_rolling_xirr(
         self,
@@ -70,8 +99,8 @@ class Asset:
         mode: str = "median"
     ) -> float:
         """
-        Uses SIPReturnForecaster to compute rolling-window SIP XIRR (median/mean/etc.)
-        on this asset's history. Stores result in self.expected_return_rate.
+        Looks up the rolling-window SIP XIRR statistic (median/mean/etc.)
+        for this asset's history. Stores result in self.expected_return_rate.
 
         :param time_horizon: Number of years for the rolling XIRR window.
         :param mode: Aggregation mode over rolling windows ('median', 'mean', etc.)
@@ -79,17 +108,11 @@ class Asset:
         """
         if not self.data_available:
             return self.expected_return_rate
-        
-        if self._df is None:
-            self.load_history()
 
-        xirr_calc = XirrCalculator()
+        if mode not in RETURN_CALCULATION_MODES:
+            raise InvalidReturnCalculationModeError(mode, RETURN_CALCULATION_MODES)
 
-        expected, _, _ = xirr_calc.compute_rolling_xirr(
-            time_horizon=time_horizon,
-            df=self._df,
-            mode=mode
-        )
+        expected = self.compute_rolling_xirr_stats(time_horizon)[mode]
         self.expected_return_rate = expected
         return expected
 
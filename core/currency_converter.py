@@ -1,65 +1,105 @@
 import os
+
+import numpy as np
 import pandas as pd
 
+from config import FOREX_ASOF_TOLERANCE_DAYS
+from core.dataset_store import DatasetStore, get_dataset_store
 from core.exceptions import DatesNotAlignedError
-from config import FOREX_RATES_DIR
+from utils.logger import get_logger
+
+
+def nav_currency(nav_data: pd.DataFrame) -> str:
+    """
+    Infers the currency code from the NAV column name.
+
+    :return: Currency code (e.g., 'USD', 'INR').
+    :raises ValueError: If no 'NAV_' column is present.
+    """
+    # Directly check for INR
+    if 'NAV_INR' in nav_data.columns:
+        return 'INR'
+
+    # Find first column starting with 'NAV_'
+    nav_cols = [col for col in nav_data.columns if col.startswith('NAV_')]
+    if not nav_cols:
+        raise ValueError("No column found with prefix 'NAV_'. Cannot determine currency.")
+
+    # Extract currency suffix
+    return nav_cols[0].split('_')[-1]
+
+
+def asof_rates(
+    nav_dates: np.ndarray,
+    rate_dates: np.ndarray,
+    rates: np.ndarray,
+    tolerance: np.timedelta64
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Backward as-of join: for every NAV date, the latest rate dated on or
+    before it.
+
+    :param rate_dates: Sorted datetime64[ns] dates of `rates`.
+    :param tolerance: Maximum age of a matched rate.
+    :return: Tuple (matched_rates, valid); `valid` is False where no rate is
+             dated on or before the NAV date within `tolerance`.
+    """
+    rows = np.searchsorted(rate_dates, nav_dates, side='right') - 1
+    valid = rows >= 0
+    rows = np.maximum(rows, 0)
+    if len(rate_dates):
+        valid &= (nav_dates - rate_dates[rows]) <= tolerance
+        return rates[rows], valid
+    return np.full(len(nav_dates), np.nan), valid
+
 
 class CurrencyConverter:
     """
     Handles conversion of NAV prices from foreign currency to INR using historical forex rates.
+
+    Rates are matched to NAV dates with a backward as-of join (`asof_rates`):
+    each NAV date takes the latest `<CUR>_to_INR` rate on or before it, at
+    most `FOREX_ASOF_TOLERANCE_DAYS` old, so NAV and forex files need not
+    share the same dates. NAV rows without such a rate are dropped.
+
+    NAV and forex files are read through `store` (default: the process-wide
+    dataset store), from its forex directory.
     """
 
-    def __init__(self):
+    def __init__(self, store: DatasetStore | None = None):
+        self.store = store if store is not None else get_dataset_store()
         # DataFrame for NAV history and corresponding forex rates
         self.original_nav_data: pd.DataFrame = None
         self.forex_rate_data: pd.DataFrame = None
 
     def _load_forex_data(self, currency: str) -> None:
         """
-        Loads a Feather file named <currency>_to_INR.feather from the forex directory.
+        Loads <currency>_to_INR.feather from the store's forex directory via
+        the store (parsed once per process).
 
         :param currency: Foreign currency code (e.g., 'USD').
         :raises FileNotFoundError: If the expected forex file is not found.
         """
-        filename = f"{currency.upper()}_to_INR.feather"
-        filepath = os.path.join(FOREX_RATES_DIR, filename)
+        filepath = self.store.forex_path(currency)
 
         if not os.path.exists(filepath):
             raise FileNotFoundError(
-                f"Forex data file '{filename}' not found in '{FOREX_RATES_DIR}'. "
+                f"Forex data file '{os.path.basename(filepath)}' not found in '{self.store.forex_dir}'. "
                 "Expected format: '<CURR>_to_INR.feather'."
             )
 
-        # Read the forex rates into a DataFrame
-        self.forex_rate_data = pd.read_feather(filepath)
-
-    def _is_data_aligned(self) -> bool:
-        """
-        Verifies if NAV and forex rate data are aligned.
-
-        Checks:
-          - Same number of columns.
-          - Identical 'Date' columns in the same order.
-
-        :return: True if aligned; False otherwise.
-        """
-        if len(self.original_nav_data.columns) != len(self.forex_rate_data.columns):
-            return False
-
-        if not self.original_nav_data['Date'].equals(self.forex_rate_data['Date']):
-            return False
-
-        return True
+        # Read the forex rates from the in-memory store
+        self.forex_rate_data = self.store.get_forex(currency)
 
     def _load_nav_data(self, feather_path: str) -> None:
         """
-        Loads NAV data from the specified Feather file.
+        Loads NAV data from the specified Feather file via the store.
 
         :param feather_path: Path to the Feather file.
         :raises FileNotFoundError: If the file can't be read.
         """
         try:
-            df = pd.read_feather(feather_path)
+            df = self.store.get_nav(feather_path)
         except Exception:
             raise FileNotFoundError(f"NAV data file '{feather_path}' not found or unreadable.")
 
@@ -68,22 +108,64 @@ class CurrencyConverter:
 
     def _get_nav_currency(self) -> str:
         """
-        Infers the currency code from the NAV column name.
+        Infers the currency code from the NAV column name of the loaded NAV data.
 
         :return: Currency code (e.g., 'USD', 'INR').
         :raises ValueError: If no 'NAV_' column is present.
         """
-        # Directly check for INR
-        if 'NAV_INR' in self.original_nav_data.columns:
-            return 'INR'
+        return nav_currency(self.original_nav_data)
 
-        # Find first column starting with 'NAV_'
-        nav_cols = [col for col in self.original_nav_data.columns if col.startswith('NAV_')]
-        if not nav_cols:
-            raise ValueError("No column found with prefix 'NAV_'. Cannot determine currency.")
-
-        # Extract currency suffix
-        return nav_cols[0].split('_')[-1]
+    def convert_many_to_inr(self, nav_data: dict[str, pd.DataFrame]) -> dict[str, pd.DataFrame]:
+        """
+        Converts several NAV histories to INR. The assets of each currency
+        are converted in one pass: their dates are concatenated, joined with
+        the forex rates by a single `searchsorted`, multiplied, then split.
+
+        INR histories are returned as they are (shared, not copied); the
+        others are new ['Date', 'NAV_INR'] frames built from the matched
+        rows only.
+
+        :param nav_data: Dict mapping a name to a ['Date', 'NAV_<CUR>'] frame with sorted dates.
+        :return: Dict mapping the same names to ['Date', 'NAV_INR'] frames.
+        :raises FileNotFoundError: If a forex file is missing.
+        :raises DatesNotAlignedError: If none of an asset's dates has a forex rate.
+        """
+        logger = get_logger()
+        tolerance = np.timedelta64(FOREX_ASOF_TOLERANCE_DAYS, 'D')
+
+        by_currency: dict[str, list[str]] = {}
+        for name, df in nav_data.items():
+            by_currency.setdefault(nav_currency(df), []).append(name)
+
+        converted = {name: nav_data[name] for name in by_currency.pop('INR', [])}
+        for currency, names in by_currency.items():
+            self._load_forex_data(currency)
+            rate_dates = self.forex_rate_data['Date'].to_numpy(dtype='datetime64[ns]')
+            rates = self.forex_rate_data[f"{currency}_to_INR"].to_numpy(dtype=np.float64)
+
+            dates = [nav_data[name]['Date'].to_numpy(dtype='datetime64[ns]') for name in names]
+            prices = [nav_data[name][f"NAV_{currency}"].to_numpy(dtype=np.float64) for name in names]
+            matched, valid = asof_rates(np.concatenate(dates), rate_dates, rates, tolerance)
+            inr = np.concatenate(prices) * matched
+
+            bounds = np.cumsum([len(d) for d in dates])[:-1]
+            for name, name_dates, name_inr, name_valid in zip(
+                names, dates, np.split(inr, bounds), np.split(valid, bounds)
+            ):
+                if name_valid.all():
+                    # Shares the NAV frame's dates instead of copying them
+                    converted[name] = pd.DataFrame({'Date': nav_data[name]['Date'], 'NAV_INR': name_inr}, copy=False)
+                    continue
+                if not name_valid.any():
+                    raise DatesNotAlignedError(currency, FOREX_ASOF_TOLERANCE_DAYS)
+                logger.warning(
+                    f"{name}: dropped {int((~name_valid).sum())} of {len(name_valid)} NAV rows "
+                    f"without a {currency}_to_INR rate in the {FOREX_ASOF_TOLERANCE_DAYS} days before them."
+                )
+                converted[name] = pd.DataFrame(
+                    {'Date': name_dates[name_valid], 'NAV_INR': name_inr[name_valid]}, copy=False
+                )
+        return converted
 
     def convert_to_inr(
         self,
@@ -98,7 +180,7 @@ class CurrencyConverter:
         :return: DataFrame with columns ['Date', 'NAV_INR'].
         :raises FileNotFoundError: If neither input is provided or file missing.
         :raises TypeError: If inputs are of incorrect type.
-        :raises DatesNotAlignedError: If NAV and forex dates do not match.
+        :raises DatesNotAlignedError: If no NAV date has a forex rate.
         """
         # Accept either a DataFrame or load from file
         if nav_data is not None:
@@ -112,22 +194,4 @@ class CurrencyConverter:
                 raise TypeError(f"Expected feather_path as str, got {type(feather_path)}.")
             self._load_nav_data(feather_path)
 
-        # Determine currency and skip conversion if already INR
-        currency = self._get_nav_currency()
-        if currency == 'INR':
-            return self.original_nav_data
-
-        # Load forex rates and verify date alignment
-        self._load_forex_data(currency)
-        if not self._is_data_aligned():
-            raise DatesNotAlignedError()
-
-        # Multiply NAV by corresponding forex rate
-        converted_df = self.original_nav_data.copy()
-        price_col = f"NAV_{currency}"
-        rate_col = f"{currency}_to_INR"
-        converted_df[price_col] *= self.forex_rate_data[rate_col]
-
-        # Rename columns to standard output
-        converted_df.columns = ['Date', 'NAV_INR']
-        return converted_df
+        return self.convert_many_to_inr({'nav': self.original_nav_data})['nav']
@@ -0,0 +1,347 @@
+import hashlib
+import os
+import threading
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from config import ASSET_NAV_DATA_PATH, FOREX_RATES_DIR, NAV_DATASET_PATH
+from core.nav_dataset import NavDataset, read_feather_series
+
+
+class _CachedFile:
+    """
+    One cached file: its stat signature, content digest and parsed value.
+    """
+
+    def __init__(self, signature: tuple[int, int], digest: str, value):
+        self.signature = signature   # (st_mtime_ns, st_size)
+        self.digest = digest         # sha256 of file contents
+        self.value = value
+
+
+def fill_gaps(values: np.ndarray) -> None:
+    """
+    Forward-fills, then back-fills, the NaNs of every column of a 2-D array
+    in place (as `DataFrame.ffill().bfill()` would). All-NaN columns are left
+    untouched.
+    """
+    rows = np.arange(values.shape[0])
+    for k in range(values.shape[1]):
+        column = values[:, k]
+        valid = ~np.isnan(column)
+        if not valid.any():
+            continue
+        last_valid = np.maximum.accumulate(np.where(valid, rows, -1))
+        first = rows[valid][0]
+        column[:] = column[np.where(last_valid >= 0, last_valid, first)]
+
+
+class AlignedNavs:
+    """
+    INR NAV histories of every configured asset on one shared date axis.
+
+    `values` is a read-only (dates x assets) float64 matrix in column-major
+    order, so each asset's column is a contiguous view. Gaps are filled once
+    at build time: forward-filled, then back-filled before an asset's first
+    observation. `present[t, k]` tells whether asset k has its own row at
+    `dates[t]` (as opposed to a filled one).
+    """
+
+    def __init__(self, version: str, names: tuple[str, ...], dates: np.ndarray, values: np.ndarray, present: np.ndarray):
+        self.version = version
+        self.names = names
+        self.dates = dates
+        self.values = values
+        self.present = present
+        self._index = {name: k for k, name in enumerate(names)}
+        for array in (self.dates, self.values, self.present):
+            array.setflags(write=False)
+
+    def index_of(self, name: str) -> int | None:
+        return self._index.get(name)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Zero-copy view of one asset's filled NAV column.
+        """
+        return self.values[:, self._index[name]]
+
+    @classmethod
+    def build(cls, version: str, series: dict[str, pd.DataFrame]) -> "AlignedNavs":
+        """
+        Aligns ['Date', 'NAV_INR'] frames on the union of their dates.
+        """
+        names = tuple(series)
+        frame_dates = {
+            name: df['Date'].to_numpy(dtype='datetime64[ns]') for name, df in series.items()
+        }
+        dates = np.unique(np.concatenate(list(frame_dates.values()))) if names else np.array([], dtype='datetime64[ns]')
+
+        values = np.full((len(dates), len(names)), np.nan, order='F')
+        present = np.zeros((len(dates), len(names)), dtype=bool, order='F')
+        for k, name in enumerate(names):
+            rows = np.searchsorted(dates, frame_dates[name])
+            values[rows, k] = series[name]['NAV_INR'].to_numpy(dtype=np.float64)
+            present[rows, k] = True
+        fill_gaps(values)
+        return cls(version, names, dates, values, present)
+
+
+class DatasetStore:
+    """
+    Process-wide, read-only cache of the NAV and forex datasets.
+
+    Each Feather file is parsed once (dates normalized, rows sorted) and kept
+    in memory together with its INR-converted NAV series. The INR series are
+    also aligned once into a single date x asset matrix (`get_aligned_navs`).
+    On every access the file's mtime/size is checked; if it changed, the
+    contents are hashed and the file is only re-parsed when the hash differs
+    as well.
+
+    If the memory-mapped Arrow dataset (`NAV_DATASET_PATH`) holds a series,
+    it is read from there instead of decompressing the Feather file, as
+    long as the source file still matches the copy. Such frames are views of
+    the mapped pages, which every worker process shares; so are the INR
+    series of INR assets, which are the same frames. What each process keeps
+    privately is derived data: the INR conversions of foreign-currency
+    series and the aligned matrix, a few KB per asset.
+
+    Frames handed out are shared between all callers and must be treated as
+    read-only: copy before modifying.
+    """
+
+    def __init__(
+        self,
+        nav_paths: dict[str, str] | None = None,
+        forex_dir: str | None = None,
+        dataset_path: str | None = None
+    ):
+        self.nav_paths = nav_paths if nav_paths is not None else ASSET_NAV_DATA_PATH
+        self.forex_dir = forex_dir if forex_dir is not None else FOREX_RATES_DIR
+        self.dataset_path = dataset_path if dataset_path is not None else NAV_DATASET_PATH
+
+        self._files: dict[str, _CachedFile] = {}
+        self._inr_navs: dict[str, tuple[str, pd.DataFrame]] = {}
+        self._aligned: AlignedNavs | None = None
+        self._dataset: tuple[tuple[int, int], NavDataset] | None = None
+        self._lock = threading.RLock()
+
+    # ---------------- File-level caching ----------------
+
+    @staticmethod
+    def _signature(path: str) -> tuple[int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _digest(path: str) -> str:
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def _get_file(self, path: str, loader: Callable[[str], object]) -> _CachedFile:
+        """
+        Returns the cached entry for `path`, (re)loading it with `loader`
+        only if the file is new or its contents actually changed.
+        """
+        path = os.path.abspath(path)
+        signature = self._signature(path)
+
+        with self._lock:
+            entry = self._files.get(path)
+            if entry is not None and entry.signature == signature:
+                return entry
+
+            digest = self._digest(path)
+            if entry is not None and entry.digest == digest:
+                # Touched but unchanged: keep the parsed value
+                entry.signature = signature
+                return entry
+
+            entry = _CachedFile(signature, digest, loader(path))
+            self._files[path] = entry
+            return entry
+
+    @staticmethod
+    def _read_series(path: str) -> pd.DataFrame:
+        return read_feather_series(path)
+
+    def _get_dataset(self) -> NavDataset | None:
+        """
+        Returns the memory-mapped Arrow dataset, reopened if it was rebuilt,
+        or None if it has not been built.
+        """
+        try:
+            signature = self._signature(self.dataset_path)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            if self._dataset is None or self._dataset[0] != signature:
+                self._dataset = (signature, NavDataset(self.dataset_path))
+            return self._dataset[1]
+
+    def _get_series_file(self, path: str) -> _CachedFile:
+        """
+        Like `_get_file` for NAV and forex series, but seeds the cache from
+        the Arrow dataset on first access, with a frame over zero-copy views
+        of its mapped buffers (`NavDataset.read_series`). The seeded entry carries the
+        source's recorded signature and digest, so `_get_file` still falls
+        back to the Feather file if it changed after the dataset was built.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._files:
+                dataset = self._get_dataset()
+                snapshot = dataset.snapshot(path) if dataset is not None else None
+                if snapshot is not None:
+                    self._files[path] = _CachedFile(*snapshot)
+            return self._get_file(path, self._read_series)
+
+    def forex_path(self, currency: str) -> str:
+        return os.path.join(self.forex_dir, f"{currency.upper()}_to_INR.feather")
+
+    # ---------------- Public accessors ----------------
+
+    def get_nav(self, feather_path: str) -> pd.DataFrame:
+        """
+        Returns the NAV history stored at `feather_path` in its original
+        currency, with normalized and sorted dates.
+
+        :raises FileNotFoundError: If the file does not exist.
+        """
+        return self._get_series_file(feather_path).value
+
+    def get_forex(self, currency: str) -> pd.DataFrame:
+        """
+        Returns the `<currency>_to_INR` rate history from the forex directory.
+
+        :raises FileNotFoundError: If the forex file does not exist.
+        """
+        return self._get_series_file(self.forex_path(currency)).value
+
+    def get_cached(self, path: str, loader: Callable[[str], object]):
+        """
+        Returns `loader(path)`, cached under the same change detection as the
+        datasets. Used for derived artefacts such as the rolling-XIRR index.
+
+        :raises FileNotFoundError: If the file does not exist.
+        """
+        return self._get_file(path, loader).value
+
+    def _get_inr_entries(self, feather_paths: list[str]) -> dict[str, tuple[str, pd.DataFrame]]:
+        """
+        Returns {path: (version, INR frame)} for the NAV files, converting on
+        first use and whenever a NAV file or the forex file it depends on
+        changes. The version is the source-file fingerprint the conversion
+        is cached under; stale series are converted together, in one pass
+        per currency.
+        """
+        from core.currency_converter import CurrencyConverter, nav_currency
+
+        paths = [os.path.abspath(p) for p in feather_paths]
+        with self._lock:
+            entries, stale = {}, {}
+            for path in paths:
+                nav_entry = self._get_series_file(path)
+                currency = nav_currency(nav_entry.value)
+
+                digests = nav_entry.digest
+                if currency != 'INR':
+                    digests += self._get_series_file(self.forex_path(currency)).digest
+                version = hashlib.sha256(digests.encode()).hexdigest()[:16]
+
+                cached = self._inr_navs.get(path)
+                if cached is not None and cached[0] == version:
+                    entries[path] = cached
+                else:
+                    stale[path] = (version, nav_entry.value)
+
+            if stale:
+                converted = CurrencyConverter(store=self).convert_many_to_inr(
+                    {path: nav_df for path, (_, nav_df) in stale.items()}
+                )
+                for path, (version, _) in stale.items():
+                    entries[path] = self._inr_navs[path] = (version, converted[path])
+            return entries
+
+    def _get_inr_entry(self, feather_path: str) -> tuple[str, pd.DataFrame]:
+        """
+        Returns (version, INR frame) for one NAV file (see `_get_inr_entries`).
+        """
+        return self._get_inr_entries([feather_path])[os.path.abspath(feather_path)]
+
+    def _configured_entries(self) -> dict[str, tuple[str, pd.DataFrame]]:
+        """
+        Returns {asset name: (version, INR frame)} for every configured NAV
+        file that exists.
+        """
+        paths = {name: path for name, path in self.nav_paths.items() if os.path.exists(path)}
+        entries = self._get_inr_entries(list(paths.values()))
+        return {name: entries[os.path.abspath(path)] for name, path in paths.items()}
+
+    def get_inr_nav(self, feather_path: str) -> pd.DataFrame:
+        """
+        Returns the NAV history at `feather_path` converted to INR
+        (['Date', 'NAV_INR']). The conversion is cached and redone only when
+        the NAV file or the forex file it depends on changes.
+        """
+        return self._get_inr_entry(feather_path)[1]
+
+    def get_inr_nav_version(self, feather_path: str) -> str:
+        """
+        Returns a short content hash identifying the current INR series of
+        `feather_path` (covers both the NAV file and its forex file).
+        """
+        return self._get_inr_entry(feather_path)[0]
+
+    @staticmethod
+    def _combined_version(entries: dict[str, tuple[str, pd.DataFrame]]) -> str:
+        versions = sorted(f"{name}:{version}" for name, (version, _) in entries.items())
+        return hashlib.sha256('|'.join(versions).encode()).hexdigest()[:16]
+
+    def version(self) -> str:
+        """
+        Returns a short content hash over every configured NAV file and the
+        forex files they depend on. Changes whenever any of them changes.
+        """
+        return self._combined_version(self._configured_entries())
+
+    def get_aligned_navs(self) -> AlignedNavs:
+        """
+        Returns the INR NAVs of every configured asset aligned on one date
+        axis, rebuilt only when a NAV or forex file changes.
+        """
+        with self._lock:
+            entries = self._configured_entries()
+            version = self._combined_version(entries)
+            if self._aligned is None or self._aligned.version != version:
+                series = {name: inr_df for name, (_, inr_df) in entries.items()}
+                self._aligned = AlignedNavs.build(version, series)
+            return self._aligned
+
+    def preload(self) -> None:
+        """
+        Loads and INR-converts every configured NAV file (and the forex files
+        they depend on) so that later requests are served from memory.
+        """
+        self.get_aligned_navs()
+
+
+_store: DatasetStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_store() -> DatasetStore:
+    """
+    Returns the process-wide DatasetStore, creating it on first use.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DatasetStore()
+    return _store
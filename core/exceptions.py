@@ -1,17 +1,36 @@
+import functools
+
+
+class ReconstructibleError(Exception):
+    """
+    Base for the domain exceptions below. Remembers its constructor arguments
+    so instances survive pickling, e.g. when raised inside a worker process.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        self = super().__new__(cls, *args)
+        self._init_args = args
+        self._init_kwargs = kwargs
+        return self
+
+    def __reduce__(self):
+        return functools.partial(type(self), **self._init_kwargs), self._init_args
+
+
 # ---- Asset.py ---- #
 
-class InvalidAllocationWeightsError(Exception):
+class InvalidAllocationWeightsError(ReconstructibleError):
     def __init__(self):
         message = "Specified weights do not sum to 1."
         super().__init__(message)
 
-class InvalidReturnRateError(Exception):
+class InvalidReturnRateError(ReconstructibleError):
     def __init__(self, erring_rate):
         message = f"Expected a positive return rate, but got: {erring_rate}. Rate must be > 0."
         super().__init__(message)
 
 
-class InvalidCashflowsError(Exception):
+class InvalidCashflowsError(ReconstructibleError):
     def __init__(self, cashflows):
         message = (
             f"Invalid cash flow series provided: {cashflows}. "
@@ -21,19 +40,19 @@ class InvalidCashflowsError(Exception):
         super().__init__(message)
 
 
-class InvalidStartDateError(Exception):
+class InvalidStartDateError(ReconstructibleError):
     def __init__(self, start_date):
         message = f"Invalid start date: {start_date}. Start date must be a valid datetime.date or datetime.datetime."
         super().__init__(message)
 
 
-class InvalidSipAmountError(Exception):
+class InvalidSipAmountError(ReconstructibleError):
     def __init__(self, error_amount):
         message = f"SIP amount must be non-negative, but got: {error_amount}."
         super().__init__(message)
 
 
-class LumpsumEnoughToReachGoalError(Exception):
+class LumpsumEnoughToReachGoalError(ReconstructibleError):
     def __init__(self, lumpsum, goal_amount):
         message = (
             f"Lumpsum of {lumpsum} is already greater than or equal to the goal amount {goal_amount}. "
@@ -42,7 +61,7 @@ class LumpsumEnoughToReachGoalError(Exception):
         super().__init__(message)
 
 
-class XirrComputationFailedError(Exception):
+class XirrComputationFailedError(ReconstructibleError):
     def __init__(self, original_exception):
         message = (
             f"XIRR computation failed: {original_exception}. "
@@ -53,19 +72,19 @@ class XirrComputationFailedError(Exception):
 
 # ---- SIP_Goal_Based.py ---- #
 
-class InvalidGoalAmountError(Exception):
+class InvalidGoalAmountError(ReconstructibleError):
     def __init__(self, goal_amount):
         message = f"Goal amount must be positive, but got: {goal_amount}."
         super().__init__(message)
 
 
-class InvalidTimeHorizonError(Exception):
+class InvalidTimeHorizonError(ReconstructibleError):
     def __init__(self, time_horizon):
         message = f"Time horizon must be greater than zero, but got: {time_horizon}."
         super().__init__(message)
 
 
-class InvalidLumpsumAmountError(Exception):
+class InvalidLumpsumAmountError(ReconstructibleError):
     def __init__(self, lumpsum, goal_amount):
         if lumpsum < 0:
             message = f"Lumpsum cannot be negative (got {lumpsum})."
@@ -74,13 +93,13 @@ class InvalidLumpsumAmountError(Exception):
         super().__init__(message)
 
 
-class TimeHorizonNotIntegerError(Exception):
+class TimeHorizonNotIntegerError(ReconstructibleError):
     def __init__(self, value):
         message = f"Time horizon must be an integer number of years (got {value})."
         super().__init__(message)
 
 
-class InvalidRiskProfileError(Exception):
+class InvalidRiskProfileError(ReconstructibleError):
     def __init__(self, profile, valid_profiles):
         message = (
             f"Invalid risk profile: '{profile}'. "
@@ -89,7 +108,7 @@ class InvalidRiskProfileError(Exception):
         super().__init__(message)
 
 
-class DataFileNotFoundError(Exception):
+class DataFileNotFoundError(ReconstructibleError):
     def __init__(self, asset_name, feather_path):
         message = (
             f"No Feather file found for asset '{asset_name}': {feather_path}"
@@ -100,13 +119,13 @@ class DataFileNotFoundError(Exception):
 
 # ---- Prob_Calc.py ---- #
 
-class HistoricalDataNotFoundError(Exception):
+class HistoricalDataNotFoundError(ReconstructibleError):
     def __init__(self, asset_name):
         message = f"Historical NAV data not found for asset: '{asset_name}'."
         super().__init__(message)
 
 
-class HistoricalDataTooLowError(Exception):
+class HistoricalDataTooLowError(ReconstructibleError):
     def __init__(self, asset_name, available_months, required_months):
         message = (
             f"Insufficient historical data for asset '{asset_name}': "
@@ -117,7 +136,7 @@ class HistoricalDataTooLowError(Exception):
 
 # ---- Return_Forecaster.py ---- #
 
-class NeitherDataNorPathProvidedError(Exception):
+class NeitherDataNorPathProvidedError(ReconstructibleError):
     def __init__(self):
         message = (
             "Must provide either a DataFrame of returns or a valid file path. "
@@ -126,7 +145,7 @@ class NeitherDataNorPathProvidedError(Exception):
         super().__init__(message)
 
 
-class InvalidReturnCalculationModeError(Exception):
+class InvalidReturnCalculationModeError(ReconstructibleError):
     def __init__(self, mode, valid_modes):
         message = (
             f"Invalid return calculation mode: '{mode}'. "
@@ -137,16 +156,44 @@ class InvalidReturnCalculationModeError(Exception):
 
 # ---- CurrencyConverter.py ---- #
 
-class NavAlreadyInINRError(Exception):
+class NavAlreadyInINRError(ReconstructibleError):
     def __init__(self):
         message = (
             "NAV Values Already in INR."
         )
         super().__init__(message)
 
-class DatesNotAlignedError(Exception):
-    def __init__(self):
+class DatesNotAlignedError(ReconstructibleError):
+    def __init__(self, currency, tolerance_days):
+        message = (
+            f"No NAV date has a {currency}_to_INR rate dated on or up to {tolerance_days} days before it."
+        )
+        super().__init__(message)
+
+
+# ---- Ingest.py ---- #
+
+class RawDataSchemaError(ReconstructibleError):
+    def __init__(self, source, problem):
+        message = f"Invalid data for '{source}': {problem}"
+        super().__init__(message)
+
+class RawDataMismatchError(ReconstructibleError):
+    def __init__(self, source, mismatched, compared, example):
         message = (
-            f"Date columns of NAV_data and Forex do not match."
+            f"Raw data for '{source}' disagrees with {mismatched} of the {compared} months already stored "
+            f"(e.g. {example}), so it follows another source or convention. Nothing was written; "
+            "rerun with --allow-mismatch to accept it."
         )
-        super().__init__(message)
\ No newline at end of file
+        super().__init__(message)
+
+
+# ---- Worker_Pool.py ---- #
+
+class ServerOverloadedError(ReconstructibleError):
+    def __init__(self, in_flight, capacity):
+        message = (
+            f"Server is at capacity ({in_flight}/{capacity} requests running or queued). "
+            "Retry shortly."
+        )
+        super().__init__(message)
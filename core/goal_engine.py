@@ -1,17 +1,24 @@
 
 import os
+import time as tm
 from datetime import datetime
-from typing import Literal
+from typing import Dict, List, Literal
 
-from config import ASSET_NAV_DATA_PATH, ASSET_RETURN_RATES, CREATE_HISTOGRAM, NUM_SIMULATIONS, TARGET_PROB_OF_SUCCESS
+from config import (
+    ASSET_NAV_DATA_PATH, ASSET_RETURN_RATES, CREATE_HISTOGRAM, MC_ADAPTIVE, MC_ADAPTIVE_BATCH, MC_MAX_SIMULATIONS,
+    MC_MIN_SIMULATIONS, MC_PROBABILITY_TOLERANCE, MC_SIP_TOLERANCE, MC_SIP_TOLERANCE_AMOUNT, NUM_SIMULATIONS,
+    SIMULATION_TIME_HORIZONS, TARGET_PROB_OF_SUCCESS, USER_RISK_PROFILES
+)
 from core.asset import Asset
+from core.dataset_store import get_dataset_store
 from core.exceptions import DataFileNotFoundError
+from core.monte_carlo import ENGINES
 from core.portfolio import Portfolio
 from core.sip_goal_based import SipGoalBased
-from core.sip_plotter import build_plotly_fig
 from models.portfolio_summary import PortfolioSummary
-from models.goal_request import AssetAllocation
+from models.goal_request import AssetAllocation, GoalRequest
 from utils.logger import get_logger
+from utils.metrics import timed_stage
 
 
 def run_analysis(
@@ -19,7 +26,9 @@ def run_analysis(
     time_horizon: int,
     lumpsum: float,
     risk_profile: Literal['conservative','balanced','aggressive', 'custom'],
-    allocation: AssetAllocation
+    allocation: AssetAllocation,
+    engine: Literal['gaussian', 'bootstrap'] | None = None,
+    preview: bool = False
 ) -> PortfolioSummary:
     """
     Orchestrates the entire pipeline for SIP goal analysis:
@@ -28,118 +37,297 @@ def run_analysis(
     3. Builds and processes portfolio
     4. Runs simulations and computes probability
     5. Returns final portfolio summary
+
+    :param engine: Monte Carlo engine for this request (default: MC_ENGINE).
+    :param preview: Compute the probability and suggested SIP analytically
+                    instead of simulating (see `core.analytic_preview`).
     """
     logger = get_logger()
     logger.info("Starting run_analysis")
 
-    # 1) Build SIP plan
-    try:
-        sip_plan = SipGoalBased()
-        sip_plan.set_testing_data(
-            goal=goal_amount,
-            time_horizon=time_horizon,
-            lumpsum=lumpsum,
-            risk_profile=risk_profile,
-            allocation=allocation
+    portfolio = _build_portfolio(goal_amount, time_horizon, lumpsum, risk_profile, allocation, engine)
+    xirrs, dates = _compute_returns(portfolio)
+    _compute_probability(portfolio, preview)
+    return _summarize(portfolio, xirrs, dates)
+
+
+def run_batch_analysis(requests: List[GoalRequest]) -> List[PortfolioSummary]:
+    """
+    Runs the SIP goal analysis for several goals at once.
+
+    Goals are grouped by their set of assets and engine. Within a group, per-asset
+    rolling-return statistics, the compiled return model (shared through
+    the portfolio model cache) and the Monte Carlo paths are computed once
+    and shared; each goal then only evaluates the shared paths.
+
+    :return: One PortfolioSummary per request, in request order.
+    """
+    logger = get_logger()
+    logger.info(f"Starting run_batch_analysis for {len(requests)} goals")
+
+    shared_stats: Dict[str, dict] = {}
+    portfolios: List[Portfolio] = []
+    for req in requests:
+        portfolio = _build_portfolio(
+            goal_amount=req.goal_amount,
+            time_horizon=req.time_horizon,
+            lumpsum=req.lumpsum_amount,
+            risk_profile=req.risk_profile,
+            allocation=req.asset_allocation,
+            engine=req.simulation_engine
         )
-        logger.info("SIP plan initialized")
+        # Same-named assets share one memo of rolling XIRR statistics
+        for asset in portfolio.assets:
+            asset.rolling_xirr_stats = shared_stats.setdefault(asset.name, {})
+        portfolios.append(portfolio)
+
+    groups: Dict[tuple, List[Portfolio]] = {}
+    for portfolio, req in zip(portfolios, requests):
+        if req.preview:
+            continue
+        key = (portfolio.engine, *sorted(a.name for a in portfolio.assets))
+        groups.setdefault(key, []).append(portfolio)
+
+    try:
+        with timed_stage('simulation'):
+            for members in groups.values():
+                _share_simulation(members)
+        logger.info(f"Simulated shared paths for {len(groups)} asset groups")
     except Exception:
-        logger.exception("Failed to initialize SIP plan")
+        logger.exception("Shared simulation failed")
         raise
 
+    summaries = []
+    for portfolio, req in zip(portfolios, requests):
+        xirrs, dates = _compute_returns(portfolio)
+        _compute_probability(portfolio, req.preview)
+        summaries.append(_summarize(portfolio, xirrs, dates))
+    return summaries
+
+
+def warm_up() -> None:
+    """
+    Warms this process's caches for the built-in risk profiles, so that its
+    first requests run as fast as later ones: the dataset store, the
+    rolling-XIRR index, each profile's compiled portfolio model with its
+    analytic preview nodes for every horizon in SIMULATION_TIME_HORIZONS,
+    and a short simulation with every engine. Failures are logged; they
+    never stop startup.
+    """
+    logger = get_logger()
+    start = tm.perf_counter()
+    get_dataset_store().preload()
+
+    for profile in (p for p in USER_RISK_PROFILES if p != 'custom'):
+        try:
+            portfolio = _build_portfolio(1.0, max(SIMULATION_TIME_HORIZONS), 0.0, profile, AssetAllocation())
+            model = portfolio.get_model()
+            for horizon in SIMULATION_TIME_HORIZONS:
+                for asset in portfolio.assets:
+                    asset.compute_rolling_xirr(horizon)
+                model.preview_factors(horizon * 12)
+            for engine in ENGINES:
+                portfolio.engine = engine
+                portfolio.simulate_factors_at([12], MC_ADAPTIVE_BATCH)
+        except Exception:
+            logger.exception(f"Warm-up failed for the '{profile}' profile")
+    logger.info(f"Warm-up completed in {tm.perf_counter() - start : 0.3f} s.")
+
+
+def _share_simulation(members: List[Portfolio]) -> None:
+    """
+    Simulates one set of paths (up to the longest horizon) for portfolios
+    over the same assets and engine, and hands each its per-asset growth
+    factors.
+    """
+    lead = members[0]
+    order = [a.name for a in lead.assets]
+
+    # Adaptive estimates start from the shared paths and add their own as needed
+    num_simulations = MC_MIN_SIMULATIONS if MC_ADAPTIVE else NUM_SIMULATIONS
+    paths = lead.simulate_factors_at([p.total_months for p in members], num_simulations)
+    for portfolio in members:
+        cols = [order.index(a.name) for a in portfolio.assets]
+        lumpsum_growth, sip_growth = paths[portfolio.total_months]
+        portfolio.use_path_factors(num_simulations, lumpsum_growth[:, cols], sip_growth[:, cols])
+
+
+def _build_portfolio(
+    goal_amount: float,
+    time_horizon: int,
+    lumpsum: float,
+    risk_profile: Literal['conservative','balanced','aggressive', 'custom'],
+    allocation: AssetAllocation,
+    engine: Literal['gaussian', 'bootstrap'] | None = None
+) -> Portfolio:
+    """
+    Validates the inputs, loads the assets and builds an INR-converted portfolio
+    simulated with `engine` (default: MC_ENGINE).
+    """
+    logger = get_logger()
+
+    # 1) Build SIP plan
+    with timed_stage('plan'):
+        try:
+            sip_plan = SipGoalBased()
+            sip_plan.set_testing_data(
+                goal=goal_amount,
+                time_horizon=time_horizon,
+                lumpsum=lumpsum,
+                risk_profile=risk_profile,
+                allocation=allocation
+            )
+            logger.info("SIP plan initialized")
+        except Exception:
+            logger.exception("Failed to initialize SIP plan")
+            raise
+
     # 2) Load assets
-    try:
-        assets = []
-        for name, weight in sip_plan.asset_weights.items():
-            if weight == 0:
-                continue
-            path = ASSET_NAV_DATA_PATH.get(name)
-            if path is None:
-                return_rate = ASSET_RETURN_RATES.get(name)
-                if return_rate is not None:
-                    # Create constant return Asset
-                    assets.append(Asset(name=name, feather_path=None, weight=weight, return_rate=return_rate, deterministic=True))
+    with timed_stage('load'):
+        try:
+            assets = []
+            for name, weight in sip_plan.asset_weights.items():
+                if weight == 0:
                     continue
-            if not path or not os.path.exists(path):
-                msg = f"No data file for asset '{name}': {path}"
-                logger.error(msg)
-                raise DataFileNotFoundError(name, path)
-            # Create variable return Asset
-            assets.append(Asset(name=name, feather_path=path, weight=weight))
-        logger.info("Assets loaded")
-    except Exception:
-        logger.exception("Asset loading failed")
-        raise
+                path = ASSET_NAV_DATA_PATH.get(name)
+                if path is None:
+                    return_rate = ASSET_RETURN_RATES.get(name)
+                    if return_rate is not None:
+                        # Create constant return Asset
+                        assets.append(Asset(name=name, feather_path=None, weight=weight, return_rate=return_rate, deterministic=True))
+                        continue
+                if not path or not os.path.exists(path):
+                    msg = f"No data file for asset '{name}': {path}"
+                    logger.error(msg)
+                    raise DataFileNotFoundError(name, path)
+                # Create variable return Asset
+                assets.append(Asset(name=name, feather_path=path, weight=weight))
+            logger.info("Assets loaded")
+        except Exception:
+            logger.exception("Asset loading failed")
+            raise
 
     # 3) Build portfolio
-    try:
-        portfolio = Portfolio(
-            goal_amount=sip_plan.goal_amount,
-            time_horizon=sip_plan.time_horizon,
-            lumpsum_amount=sip_plan.lumpsum_amount,
-            assets=assets,
-            start_date=datetime.today(),
-            risk_profile=sip_plan.risk_profile
-        )
-        portfolio.check_weights()
-        portfolio.convert_assets_to_inr()
-        logger.info("Portfolio constructed")
-    except Exception:
-        logger.exception("Portfolio construction failed")
-        raise
+    with timed_stage('build'):
+        try:
+            portfolio = Portfolio(
+                goal_amount=sip_plan.goal_amount,
+                time_horizon=sip_plan.time_horizon,
+                lumpsum_amount=sip_plan.lumpsum_amount,
+                assets=assets,
+                start_date=datetime.today(),
+                risk_profile=sip_plan.risk_profile
+            )
+            if engine is not None:
+                portfolio.engine = engine
+            portfolio.check_weights()
+            portfolio.convert_assets_to_inr()
+            logger.info("Portfolio constructed")
+        except Exception:
+            logger.exception("Portfolio construction failed")
+            raise
+
+    return portfolio
+
+
+def _compute_returns(portfolio: Portfolio) -> tuple[list, list]:
+    """
+    Computes per-asset and portfolio XIRRs, per-asset SIPs and the
+    deterministic growth curve. Returns the portfolio's rolling XIRRs and dates.
+    """
+    logger = get_logger()
 
     # 4) Compute XIRR & allocations
-    try:
-        portfolio.compute_asset_xirr(mode='median')
-        portfolio.compute_per_asset_sips()
-        xirrs, dates = portfolio.compute_portfolio_rolling_xirr(mode='median')
-        logger.info("Computed XIRRs and allocations")
-    except Exception:
-        logger.exception("XIRR/allocation computation failed")
-        raise
+    with timed_stage('xirr'):
+        try:
+            portfolio.compute_asset_xirr(mode='median')
+            portfolio.compute_per_asset_sips()
+            xirrs, dates = portfolio.compute_portfolio_rolling_xirr(mode='median')
+            logger.info("Computed XIRRs and allocations")
+        except Exception:
+            logger.exception("XIRR/allocation computation failed")
+            raise
 
     # 5) Simulate growth
-    try:
-        portfolio.simulate_growth()
-        logger.info("Simulated portfolio growth")
-    except Exception:
-        logger.exception("Growth simulation failed")
-        raise
+    with timed_stage('growth'):
+        try:
+            portfolio.simulate_growth()
+            logger.info("Simulated portfolio growth")
+        except Exception:
+            logger.exception("Growth simulation failed")
+            raise
 
     # 6) Plot histogram (optional)
     if CREATE_HISTOGRAM:
+        with timed_stage('histogram'):
+            try:
+                # SipPlotter().plot_returns(portfolio)
+                logger.info("Plotted returns histogram")
+            except Exception:
+                logger.exception("Histogram plotting failed")
+                # non-fatal: continue
+
+    return xirrs, dates
+
+
+def _compute_probability(portfolio: Portfolio, preview: bool = False) -> None:
+    """
+    Estimates the SIP needed for TARGET_PROB_OF_SUCCESS and the goal
+    probability at the computed SIP from the same paths, or approximates both
+    analytically for a preview. With MC_ADAPTIVE each estimate has its own
+    stopping rule (MC_SIP_TOLERANCE, MC_PROBABILITY_TOLERANCE); the SIP goes
+    first so that the probability is evaluated on every path it needed.
+    """
+    logger = get_logger()
+
+    # 7) Probability & SIP suggestion
+    with timed_stage('probability'):
         try:
-            # SipPlotter().plot_returns(portfolio)
-            logger.info("Plotted returns histogram")
+            if preview:
+                portfolio.preview_probability_of_reaching_goal(
+                    monthly_sip=portfolio.total_monthly_sip,
+                    lumpsum=portfolio.lumpsum_amount
+                )
+                portfolio.preview_sip_for_probability(
+                    target_prob=TARGET_PROB_OF_SUCCESS,
+                    lumpsum=portfolio.lumpsum_amount
+                )
+                logger.info("Previewed Goal Achievement Probability and Suggested SIP.")
+                return
+            num_simulations = MC_MAX_SIMULATIONS if MC_ADAPTIVE else NUM_SIMULATIONS
+            portfolio.suggest_sip_for_probability(
+                target_prob=TARGET_PROB_OF_SUCCESS,
+                num_simulations=num_simulations,
+                lumpsum=portfolio.lumpsum_amount,
+                tolerance=MC_SIP_TOLERANCE if MC_ADAPTIVE else None,
+                tolerance_amount=MC_SIP_TOLERANCE_AMOUNT
+            )
+            portfolio.probability_of_reaching_goal(
+                monthly_sip=portfolio.total_monthly_sip,
+                num_simulations=num_simulations,
+                lumpsum=portfolio.lumpsum_amount,
+                tolerance=MC_PROBABILITY_TOLERANCE if MC_ADAPTIVE else None
+            )
+            logger.info(f"Computed Goal Achievement Probability and Suggested SIP.")
         except Exception:
-            logger.exception("Histogram plotting failed")
-            # non-fatal: continue
+            logger.exception("Probability/SIP suggestion failed")
+            raise
 
-    # 7) Probability & SIP suggestion
-    try:
-        prob = portfolio.probability_of_reaching_goal(
-            monthly_sip=portfolio.total_monthly_sip,
-            num_simulations=NUM_SIMULATIONS,
-            lumpsum=portfolio.lumpsum_amount
-        )
-        suggested = portfolio.suggest_sip_for_probability(
-            target_prob=TARGET_PROB_OF_SUCCESS,
-            num_simulations=NUM_SIMULATIONS,
-            lumpsum=portfolio.lumpsum_amount
-        )
-        logger.info(f"Computed Goal Achievement Probability and Suggested SIP.")
-    except Exception:
-        logger.exception("Probability/SIP suggestion failed")
-        raise
 
+def _summarize(portfolio: Portfolio, xirrs: list, dates: list) -> PortfolioSummary:
+    """
+    Builds the PortfolioSummary with visualisation data attached.
+    """
+    logger = get_logger()
 
     # 8) Summarize and return
-    try:
-        summary = portfolio.get_portfolio_summary()
-        summary.rolling_returns = xirrs
-        summary.dates = [d.strftime('%Y-%m-%d') for d in dates] if dates else None
-        logger.info("Portfolio summary generated with visualisation data.")
-        return summary
-    except Exception:
-        logger.exception("Final summary generation failed")
-        raise
\ No newline at end of file
+    with timed_stage('summary'):
+        try:
+            summary = portfolio.get_portfolio_summary()
+            summary.rolling_returns = xirrs
+            summary.dates = [d.strftime('%Y-%m-%d') for d in dates] if dates else None
+            logger.info("Portfolio summary generated with visualisation data.")
+            return summary
+        except Exception:
+            logger.exception("Final summary generation failed")
+            raise
@@ -0,0 +1,437 @@
+"""
+Ingestion of the raw daily price CSVs into the monthly NAV and forex files.
+
+Every series in `RAW_NAV_SOURCES` and `RAW_FOREX_SOURCES` is built from one
+or more CSVs under `RAW_DATA_DIR`, as downloaded: newest or oldest rows
+first, thousands separators, vendor-specific date formats. The raw files are
+parsed in parallel worker processes, reading only the `Date` and price
+columns, with vectorized pandas/numpy conversions.
+
+The monthly files keep the existing convention: one row per calendar month,
+dated at the month end and holding the month's first available price (what
+an instalment at the start of the month buys at). Months without any rows
+are forward-filled. A refresh appends the months after the last one already
+in a file.
+
+Stored history is never dropped or silently rewritten. Every raw row is
+parsed, so that on all the months both cover the raw values can be checked
+against the stored ones; if they differ, the raw files follow another source
+or convention and the run fails with `RawDataMismatchError` (unless
+mismatches are allowed, with a warning). A full rebuild keeps the stored
+months outside the raw files' range.
+
+Non-INR NAV series only gain the months their forex series covers (as
+updated in the same run), so every NAV month stays convertible. All outputs
+are validated before anything is written (columns `Date` and the value
+column, float64, consecutive month ends, positive finite values); each file
+is then replaced atomically.
+
+Usage
+-----
+    python -m core.ingest build                   # append new months
+    python -m core.ingest build --full            # rebuild the months the raw files cover
+    python -m core.ingest build --allow-mismatch  # accept raw files that disagree with stored months
+    python -m core.ingest build --series sp_500 --series USD
+    python -m core.ingest build --output-dir /tmp/monthly --workers 4
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    ASSET_NAV_DATA_PATH,
+    FOREX_RATES_DIR,
+    RAW_DATA_DIR,
+    RAW_FOREX_SOURCES,
+    RAW_NAV_SOURCES,
+)
+from core.exceptions import RawDataMismatchError, RawDataSchemaError
+from core.nav_dataset import read_feather_series
+from utils.logger import get_logger
+
+
+class _Target:
+    """
+    One monthly output file and the raw files it is built from.
+    """
+
+    def __init__(self, name: str, kind: str, path: str, column: str, currency: str, files: list[tuple[str, str, str]]):
+        self.name = name            # asset name or currency code
+        self.kind = kind            # 'nav' or 'forex'
+        self.path = path
+        self.column = column        # 'NAV_<CUR>' or '<CUR>_to_INR'
+        self.currency = currency
+        self.files = files          # (raw file, price column, date format)
+
+
+def month_ends(dates: np.ndarray) -> np.ndarray:
+    """
+    Calendar month end of every date, as datetime64[ns].
+    """
+    months = dates.astype('datetime64[M]')
+    return ((months + 1).astype('datetime64[D]') - 1).astype('datetime64[ns]')
+
+
+def parse_raw_file(path: str, value_column: str, date_format: str) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Reads the `Date` and `value_column` columns of a raw CSV. Rows without
+    a price (blank or '-') are dropped.
+
+    :return: Tuple (dates, prices, dropped): datetime64[ns] and float64
+             arrays in file order, and the number of rows without a price.
+    :raises RawDataSchemaError: If a column is missing or a date does not
+                                match `date_format`.
+    """
+    try:
+        df = pd.read_csv(
+            path, usecols=['Date', value_column], dtype=str,
+            encoding='utf-8-sig', keep_default_na=False
+        )
+    except ValueError as e:
+        raise RawDataSchemaError(os.path.basename(path), e)
+
+    dates = pd.to_datetime(df['Date'], format=date_format, errors='coerce')
+    unparsed = dates.isna() & (df['Date'].str.strip() != '')
+    if unparsed.any():
+        examples = df.loc[unparsed, 'Date'].head(3).tolist()
+        raise RawDataSchemaError(os.path.basename(path), f"dates {examples} do not match format '{date_format}'")
+
+    keep = dates.notna().to_numpy()
+    prices = pd.to_numeric(
+        df.loc[keep, value_column].str.replace(',', '', regex=False), errors='coerce'
+    ).to_numpy(dtype=np.float64)
+    dates = dates[keep].to_numpy(dtype='datetime64[ns]')
+
+    priced = ~np.isnan(prices)
+    return dates[priced], prices[priced], int((~priced).sum())
+
+
+def _parse_task(task: tuple) -> tuple[np.ndarray, np.ndarray, int]:
+    return parse_raw_file(*task)
+
+
+def monthly_first(parsed: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Combines the daily rows of several files (later files win on the same
+    date) and reduces them to each month's first price.
+
+    :return: Tuple (month_end_dates, values), sorted by date.
+    """
+    dates = np.concatenate([d for d, _ in parsed] or [np.array([], dtype='datetime64[ns]')])
+    values = np.concatenate([v for _, v in parsed] or [np.array([], dtype=np.float64)])
+    if not len(dates):
+        return dates, values
+    rank = np.concatenate([np.full(len(d), i) for i, (d, _) in enumerate(parsed)])
+
+    order = np.lexsort((rank, dates))
+    dates, values = dates[order], values[order]
+    last_of_day = np.append(dates[1:] != dates[:-1], True)
+    dates, values = dates[last_of_day], values[last_of_day]
+
+    months, first = np.unique(month_ends(dates), return_index=True)
+    return months, values[first]
+
+
+def _fill_months(dates: np.ndarray, values: np.ndarray) -> tuple[np.ndarray, np.ndarray, int]:
+    """
+    Reindexes sorted month-end values onto every month end from the first
+    to the last date, forward-filling missing months.
+
+    :return: Tuple (dates, values, filled_months).
+    """
+    months = np.arange(dates[0].astype('datetime64[M]'), dates[-1].astype('datetime64[M]') + 1)
+    full = month_ends(months)
+    rows = np.searchsorted(dates, full, side='right') - 1
+    return full, values[rows], int(len(full) - len(dates))
+
+
+def validate_monthly(name: str, df: pd.DataFrame, column: str) -> None:
+    """
+    Checks a monthly NAV or forex frame before it is written.
+
+    :raises RawDataSchemaError: If the frame does not hold exactly `Date`
+                                and `column`, with float64 values at
+                                consecutive month ends, all positive and finite.
+    """
+    if list(df.columns) != ['Date', column]:
+        raise RawDataSchemaError(name, f"expected columns ['Date', '{column}'], got {list(df.columns)}")
+    if df['Date'].dtype != np.dtype('datetime64[ns]') or df[column].dtype != np.float64:
+        raise RawDataSchemaError(name, f"expected datetime64[ns] and float64 columns, got {df.dtypes.tolist()}")
+    if df.empty:
+        raise RawDataSchemaError(name, "no rows")
+
+    dates = df['Date'].to_numpy()
+    if (dates != month_ends(dates)).any():
+        raise RawDataSchemaError(name, "dates are not month ends")
+    if (np.diff(dates.astype('datetime64[M]').astype(np.int64)) != 1).any():
+        raise RawDataSchemaError(name, "months are not consecutive")
+    values = df[column].to_numpy()
+    if not (np.isfinite(values) & (values > 0)).all():
+        raise RawDataSchemaError(name, "values must be positive and finite")
+
+
+def overlap_mismatches(
+    stored: pd.DataFrame,
+    column: str,
+    dates: np.ndarray,
+    values: np.ndarray,
+    rtol: float = 1e-6
+) -> tuple[pd.DataFrame, int]:
+    """
+    Compares monthly values built from the raw files with the stored rows
+    of the same months.
+
+    :return: Tuple (mismatches, compared): the months whose values differ by
+             more than `rtol` (relative), as ['Date', 'stored', 'raw'], and
+             the number of months compared.
+    """
+    stored_dates = stored['Date'].to_numpy()
+    rows = np.searchsorted(stored_dates, dates)
+    common = (rows < len(stored_dates)) & (stored_dates[np.minimum(rows, len(stored_dates) - 1)] == dates)
+    stored_values = stored[column].to_numpy()[rows[common]]
+    raw_values = values[common]
+    differ = np.abs(raw_values - stored_values) > rtol * np.abs(stored_values)
+    mismatches = pd.DataFrame({
+        'Date': dates[common][differ], 'stored': stored_values[differ], 'raw': raw_values[differ]
+    })
+    return mismatches, int(common.sum())
+
+
+def _targets(
+    names: list[str] | None,
+    nav_sources: dict,
+    forex_sources: dict,
+    nav_paths: dict[str, str],
+    forex_dir: str
+) -> list[_Target]:
+    """
+    Output files to build, forex first (NAV series are aligned with them).
+
+    :raises KeyError: If a name is not a configured source, or an asset has
+                      no path in `nav_paths`.
+    """
+    targets = [
+        _Target(currency, 'forex', os.path.join(forex_dir, f"{currency}_to_INR.feather"),
+                f"{currency}_to_INR", currency, files)
+        for currency, files in forex_sources.items()
+    ] + [
+        _Target(name, 'nav', nav_paths[name], f"NAV_{spec['currency']}", spec['currency'], spec['files'])
+        for name, spec in nav_sources.items()
+    ]
+    if names is None:
+        return targets
+    unknown = set(names) - {t.name for t in targets}
+    if unknown:
+        raise KeyError(f"Unknown series: {sorted(unknown)}")
+    return [t for t in targets if t.name in names]
+
+
+def _write_feather(df: pd.DataFrame, path: str) -> None:
+    """
+    Atomically replaces `path` with `df` as Feather.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_feather(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def ingest(
+    names: list[str] | None = None,
+    full: bool = False,
+    output_dir: str | None = None,
+    workers: int | None = None,
+    raw_dir: str | None = None,
+    nav_sources: dict | None = None,
+    forex_sources: dict | None = None,
+    nav_paths: dict[str, str] | None = None,
+    forex_dir: str | None = None,
+    allow_mismatch: bool = False
+) -> dict[str, str]:
+    """
+    Builds or refreshes the monthly NAV and forex files from the raw CSVs.
+
+    :param names: Assets and/or currencies to process (default: all sources).
+    :param full: Rebuild every month the raw files cover instead of only
+                 appending new months; stored months outside their range
+                 are kept.
+    :param output_dir: Write under `<output_dir>/monthly_nav/` and
+                       `<output_dir>/monthly_forex/` instead of in place.
+    :param workers: Parser processes (default: one per CPU, at most one per file).
+    :param allow_mismatch: Warn instead of failing when the raw files
+                           disagree with stored months (which then keep
+                           their stored values, unless `full`).
+    :return: Dict mapping series name to what was done.
+    :raises RawDataSchemaError: If a raw file or an output fails validation;
+                                nothing is written in that case.
+    :raises RawDataMismatchError: If the raw files disagree with stored months;
+                                  nothing is written in that case.
+    """
+    logger = get_logger()
+    start = time.perf_counter()
+    raw_dir = raw_dir if raw_dir is not None else RAW_DATA_DIR
+    forex_dir = forex_dir if forex_dir is not None else FOREX_RATES_DIR
+    targets = _targets(
+        names,
+        nav_sources if nav_sources is not None else RAW_NAV_SOURCES,
+        forex_sources if forex_sources is not None else RAW_FOREX_SOURCES,
+        nav_paths if nav_paths is not None else ASSET_NAV_DATA_PATH,
+        forex_dir
+    )
+
+    existing: dict[str, pd.DataFrame | None] = {}
+    for target in targets:
+        df = None
+        if os.path.exists(target.path):
+            df = read_feather_series(target.path)
+            validate_monthly(target.name, df, target.column)
+        existing[target.name] = df
+
+    # ---- Parse every raw file in parallel ----
+    tasks, owners = [], []
+    for target in targets:
+        for file, value_column, date_format in target.files:
+            tasks.append((os.path.join(raw_dir, file), value_column, date_format))
+            owners.append(target.name)
+
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_task, tasks))
+    else:
+        results = [_parse_task(task) for task in tasks]
+    parse_seconds = time.perf_counter() - start
+
+    parsed: dict[str, list] = {target.name: [] for target in targets}
+    for owner, task, (dates, prices, dropped) in zip(owners, tasks, results):
+        parsed[owner].append((dates, prices))
+        if dropped:
+            logger.debug(f"{owner}: skipped {dropped} rows without a price in {os.path.basename(task[0])}.")
+
+    # ---- Reduce to months, append, align with forex and validate ----
+    outputs: dict[str, pd.DataFrame] = {}
+    outcomes: dict[str, str] = {}
+    for target in targets:
+        df = existing[target.name]
+        dates, values = monthly_first(parsed[target.name])
+
+        if target.kind == 'nav' and target.currency != 'INR' and len(dates):
+            forex = outputs.get(target.currency)
+            forex_path = os.path.join(forex_dir, f"{target.currency}_to_INR.feather")
+            if forex is None and os.path.exists(forex_path):
+                forex = read_feather_series(forex_path)
+            if forex is None:
+                raise RawDataSchemaError(target.name, f"no {target.currency}_to_INR series to align with")
+            covered = (dates >= forex['Date'].iloc[0]) & (dates <= forex['Date'].iloc[-1])
+            if not covered.all():
+                logger.warning(
+                    f"{target.name}: leaving out {int((~covered).sum())} months outside the "
+                    f"{target.currency}_to_INR range."
+                )
+            dates, values = dates[covered], values[covered]
+
+        if df is not None and len(dates):
+            mismatches, compared = overlap_mismatches(df, target.column, dates, values)
+            if len(mismatches):
+                first = mismatches.iloc[0]
+                example = f"{first['Date']:%Y-%m-%d}: stored {first['stored']:g}, raw {first['raw']:g}"
+                if not allow_mismatch:
+                    raise RawDataMismatchError(target.name, len(mismatches), compared, example)
+                logger.warning(
+                    f"{target.name}: raw data disagrees with {len(mismatches)} of {compared} stored months "
+                    f"(e.g. {example}); {'using the raw values' if full else 'keeping the stored values'}."
+                )
+
+        # Stored months kept as they are: all of them on a refresh; on a full
+        # rebuild, those before the raw data starts and after it ends
+        kept, later = df, None
+        if df is not None and full and len(dates):
+            kept = df[df['Date'] < dates[0]]
+            later = df[df['Date'] > dates[-1]]
+        if kept is not None and kept.empty:
+            kept = None
+        if kept is not None:
+            newer = dates > kept['Date'].iloc[-1]
+            dates, values = dates[newer], values[newer]
+
+        if not len(dates):
+            outcomes[target.name] = 'unchanged'
+            continue
+
+        if later is not None and len(later):
+            dates = np.concatenate([dates, later['Date'].to_numpy()])
+            values = np.concatenate([values, later[target.column].to_numpy()])
+        if kept is not None:
+            # Carry the last kept month into any gap before the first new one
+            dates = np.concatenate([kept['Date'].to_numpy()[-1:], dates])
+            values = np.concatenate([kept[target.column].to_numpy()[-1:], values])
+        dates, values, filled = _fill_months(dates, values)
+        if kept is not None:
+            dates, values = dates[1:], values[1:]
+        if filled:
+            logger.warning(f"{target.name}: forward-filled {filled} months without data.")
+
+        new_rows = pd.DataFrame({'Date': dates, target.column: values.astype(np.float64)})
+        output = new_rows if kept is None else pd.concat([kept[['Date', target.column]], new_rows], ignore_index=True)
+        validate_monthly(target.name, output, target.column)
+
+        outputs[target.name] = output
+        if not full:
+            outcomes[target.name] = f"appended {len(new_rows)} months" if kept is not None else f"built {len(new_rows)} months"
+        else:
+            kept_months = (0 if kept is None else len(kept)) + (0 if later is None else len(later))
+            outcomes[target.name] = f"rebuilt {len(new_rows) - (0 if later is None else len(later))} months" + (
+                f", kept {kept_months} stored months outside the raw data" if kept_months else ""
+            )
+
+    # ---- Write only once everything validated ----
+    for target in targets:
+        if target.name not in outputs:
+            continue
+        path = target.path
+        if output_dir is not None:
+            folder = 'monthly_forex' if target.kind == 'forex' else 'monthly_nav'
+            path = os.path.join(output_dir, folder, os.path.basename(target.path))
+        _write_feather(outputs[target.name], path)
+
+    logger.info(
+        f"Ingested {len(tasks)} raw files with {workers} workers in "
+        f"{time.perf_counter() - start:.2f} s (parsing {parse_seconds:.2f} s)."
+    )
+    return outcomes
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the monthly NAV and forex files from the raw daily CSVs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Append new months (or rebuild) from the raw files.")
+    build.add_argument("--full", action="store_true",
+                       help="Rebuild every month the raw files cover; stored months before them are kept.")
+    build.add_argument("--allow-mismatch", action="store_true",
+                       help="Warn instead of failing when the raw files disagree with stored months.")
+    build.add_argument("--series", action="append", dest="names", help="Asset name or currency code (repeatable).")
+    build.add_argument("--output-dir", default=None, help="Write here instead of replacing the configured files.")
+    build.add_argument("--workers", type=int, default=None, help="Parser processes (default: one per CPU).")
+    args = parser.parse_args(argv)
+
+    try:
+        results = ingest(
+            args.names, full=args.full, output_dir=args.output_dir, workers=args.workers,
+            allow_mismatch=args.allow_mismatch
+        )
+    except KeyError as e:
+        parser.error(str(e))
+    logger = get_logger()
+    logger.info(f"Monthly files updated: {json.dumps(results)}")
+    if any(outcome != 'unchanged' for outcome in results.values()) and args.output_dir is None:
+        logger.info("Refresh the derived data with `python -m core.nav_dataset build` and `python -m core.xirr_index build`.")
+
+
+if __name__ == "__main__":
+    main()
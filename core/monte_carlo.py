@@ -0,0 +1,806 @@
+"""
+Monte Carlo engine for goal-probability estimates.
+
+The terminal value of a SIP portfolio on any simulated path is linear in the
+lumpsum and the monthly SIP:
+
+    V = lumpsum * A + sip * B
+
+where, for that path, A is the value at the horizon of 1 rupee invested at
+month 0 and B is the value of 1 rupee invested at the start of every month
+(both already weighted across assets). Simulating the per-path factors
+(A, B) once is therefore enough to answer the goal probability for any SIP,
+lumpsum or goal amount in O(N), and to read the SIP needed for a target
+probability directly off a quantile of the per-path ratios
+(goal - lumpsum * A) / B.
+
+Engines
+-------
+Per-path monthly log-returns come from one of `ENGINES`:
+
+  - 'gaussian' (`simulate_path_factors_at`): i.i.d. multivariate normal
+    log-returns with the historical drift and covariance
+  - 'bootstrap' (`bootstrap_path_factors_at`): circular block bootstrap of
+    the historical monthly return vectors, which keeps their fat tails,
+    cross-asset dependence and autocorrelation within a block
+
+Both feed the same blocked accumulation. Gathering historical rows is much
+cheaper than drawing and correlating normals; best-of-7 timings (best of 3
+at 500,000 paths) for 4 assets over 10 years:
+
+    paths      gaussian     bootstrap    speedup
+    5,000         61 ms        11 ms        5.3x
+    50,000       647 ms       142 ms        4.5x
+    500,000     7.14 s        1.94 s        3.7x
+
+Performance
+-----------
+`simulate_path_factors` draws, correlates and exponentiates whole blocks of
+months in preallocated month-major buffers; per month it only runs one
+in-place add to compound the block. A block is at most
+`block_months` long, no longer than the horizon, and short enough for each
+buffer to fit in `_BLOCK_BUFFER_BYTES` (3 months at 5,000 paths and 4
+assets) when one month fits at all. Best-of-30 timings (best of 15 at 30
+years) for 5,000 paths and 4 assets, interleaved with the previous
+per-month loop:
+
+    horizon    per-month loop    blocked kernel    speedup
+    1 year          8.4 ms            5.9 ms          1.4x
+    10 years       72.6 ms           55.4 ms          1.3x
+    30 years      250.2 ms          166.5 ms          1.5x
+
+The kernel is bound by normal-variate generation (about 80% of the time),
+so the remaining gains must come from drawing fewer variates.
+
+Variance reduction
+------------------
+The Gaussian engine draws its shocks by one of `SAMPLERS`:
+
+  - 'pseudo': independent pseudo-random normals
+  - 'antithetic': paths come in pairs (2i, 2i+1) with opposite shocks
+  - 'sobol': scrambled Sobol points mapped through the inverse normal CDF.
+    Each block of months uses its own independently scrambled engine, with
+    the points randomly permuted across paths (Latin supercube sampling),
+    which keeps the dimension, and the memory, per engine at
+    block_months x n_assets.
+
+`goal_probability_estimate` can also apply a control variate: the terminal
+value itself, whose mean under the simulated model is known in closed form
+(`expected_path_factors`, `expected_bootstrap_factors`). It returns a standard error that accounts for
+the antithetic pairing and the control, so the adaptive stopping rule stops
+sooner when the variance is lower.
+
+Parallel simulation
+-------------------
+With `workers > 1`, paths are split into one shard per worker. Each shard
+draws from its own generator, spawned from the caller's generator
+(`Generator.spawn`, i.e. `SeedSequence.spawn`), so shards are statistically
+independent. Shards run on a shared thread or process pool
+(`MC_PARALLEL_KIND`), created once per size and never shut down, so
+concurrent simulations share it safely; runs with fewer paths than workers
+use fewer shards on the same pool. Shards are concatenated in shard order: for a given seed
+and worker count the output is bit-identical from run to run, whatever the
+scheduling. NumPy releases the GIL in the random fills, the matrix product
+and the ufuncs, so threads scale too without pickling the results.
+
+Streaming
+---------
+`stream_goal_estimate` runs any number of paths in chunks sized to fit
+`MC_MEMORY_BUDGET_MB`, optionally in float32, keeping only per-chunk
+accumulators: an exact count of paths reaching the goal and fixed-size
+quantile sketches of the required SIP and the terminal value. Peak memory
+therefore depends on the chunk size, not on the number of paths.
+
+    python -m core.monte_carlo --profile balanced --horizon 10 --paths 1000000 --float32
+    python -m core.monte_carlo --engine gaussian --paths 1000000
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import threading
+import warnings
+from statistics import NormalDist
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+from config import (
+    MC_BLOCK_MONTHS, MC_BOOTSTRAP_BLOCK_MONTHS, MC_CHUNK_PATHS, MC_DTYPE, MC_ENGINE, MC_MEMORY_BUDGET_MB,
+    MC_PARALLEL_KIND, MC_PARALLEL_WORKERS, MC_SAMPLER, MC_SKETCH_SIZE
+)
+from utils.logger import forward_to_parent, worker_log_queue
+from utils.quantile_sketch import QuantileSketch
+
+
+def simulate_path_factors(
+    mu: np.ndarray,
+    chol: np.ndarray,
+    num_months: int,
+    num_simulations: int,
+    rng: np.random.Generator | None = None,
+    block_months: int = MC_BLOCK_MONTHS,
+    dtype: type = np.float64,
+    workers: int = 1,
+    sampler: str = 'pseudo'
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Simulates correlated monthly log-returns and accumulates per-asset growth
+    factors for every path.
+
+    :param mu: Shape (n_assets,) mean monthly log-return.
+    :param chol: Shape (n_assets, n_assets) Cholesky factor of the covariance.
+    :param num_months: Number of months to simulate.
+    :param num_simulations: Number of paths.
+    :param rng: Random generator (default: a freshly seeded one).
+    :param block_months: Months simulated per vectorized block.
+    :param dtype: Floating-point type of the simulation (np.float64 or np.float32).
+    :param workers: Number of parallel shards (1 simulates in the calling thread).
+    :param sampler: How shocks are drawn, one of SAMPLERS.
+    :return: Tuple (lumpsum_growth, sip_growth), each (num_simulations, n_assets):
+             growth of 1 rupee invested at month 0, and of 1 rupee invested at
+             the start of every month.
+    """
+    return simulate_path_factors_at(
+        mu, chol, [num_months], num_simulations,
+        rng=rng, block_months=block_months, dtype=dtype, workers=workers, sampler=sampler
+    )[num_months]
+
+
+def simulate_path_factors_at(
+    mu: np.ndarray,
+    chol: np.ndarray,
+    horizons_months: list[int],
+    num_simulations: int,
+    rng: np.random.Generator | None = None,
+    block_months: int = MC_BLOCK_MONTHS,
+    dtype: type = np.float64,
+    workers: int = 1,
+    sampler: str = 'pseudo'
+) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """
+    Simulates one set of paths up to the longest horizon and snapshots the
+    per-asset growth factors at every requested horizon, so several goals
+    over the same assets share the same random shocks.
+
+    Months are processed in blocks of at most `block_months` (see the module
+    docstring): shocks for a whole block are drawn into a preallocated
+    buffer, turned into log-returns with one matrix product, and compounded
+    with one in-place add per month and one `exp` per block, so no per-month
+    arrays are allocated. Blocks are split at the requested horizons.
+
+    :param horizons_months: Horizons (in months) to report factors for.
+    :param workers: Number of parallel shards (see the module docstring).
+    :param sampler: How shocks are drawn, one of SAMPLERS.
+    :return: Dict mapping each horizon to (lumpsum_growth, sip_growth), as
+             returned by `simulate_path_factors`.
+    """
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler: '{sampler}'. Expected one of {SAMPLERS}.")
+    rng = rng if rng is not None else np.random.default_rng()
+    workers = max(1, workers)
+    if min(workers, num_simulations) > 1:
+        return _simulate_sharded(
+            simulate_path_factors_at, (mu, chol, horizons_months), num_simulations, rng, workers,
+            paired=sampler == 'antithetic', block_months=block_months, dtype=dtype, sampler=sampler
+        )
+
+    dtype = np.dtype(dtype)
+    num_assets = len(mu)
+    mu = np.asarray(mu, dtype=dtype)
+    chol_t = np.ascontiguousarray(chol.T, dtype=dtype)
+
+    def fill_returns(returns: np.ndarray, shocks: np.ndarray, start_month: int) -> None:
+        _draw_shocks(rng, shocks, sampler)
+        np.matmul(
+            shocks.reshape(-1, num_assets), chol_t,
+            out=returns.reshape(-1, num_assets)
+        )
+        returns += mu
+
+    return _accumulate_path_factors(fill_returns, horizons_months, num_simulations, num_assets, block_months, dtype)
+
+
+def bootstrap_path_factors_at(
+    log_returns: np.ndarray,
+    horizons_months: list[int],
+    num_simulations: int,
+    rng: np.random.Generator | None = None,
+    block_length: int = MC_BOOTSTRAP_BLOCK_MONTHS,
+    block_months: int = MC_BLOCK_MONTHS,
+    dtype: type = np.float64,
+    workers: int = 1
+) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """
+    Like `simulate_path_factors_at`, but builds every path from historical
+    monthly return vectors (circular block bootstrap) instead of Gaussian
+    shocks: each path strings together blocks of `block_length` consecutive
+    months, every block starting at a uniformly drawn month of the history
+    and wrapping around its end. Returns of all assets in a month are taken
+    together, so cross-asset correlation, fat tails and autocorrelation
+    within a block are kept.
+
+    Block starts are drawn for all paths at once, and the month indices of a
+    whole simulation block are one (months x paths) index array, gathered
+    with a single `np.take`.
+
+    :param log_returns: Shape (history_months, n_assets) historical monthly log-returns.
+    :param block_length: Consecutive historical months per bootstrap block.
+    :return: Dict mapping each horizon to (lumpsum_growth, sip_growth), as
+             returned by `simulate_path_factors`.
+    :raises ValueError: If there is no return history.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    workers = max(1, workers)
+    if min(workers, num_simulations) > 1:
+        return _simulate_sharded(
+            bootstrap_path_factors_at, (log_returns, horizons_months), num_simulations, rng, workers,
+            block_length=block_length, block_months=block_months, dtype=dtype
+        )
+
+    history, num_assets = log_returns.shape
+    if not history:
+        raise ValueError("Block bootstrap needs at least one month of return history.")
+    dtype = np.dtype(dtype)
+    block_length = max(1, min(block_length, history))
+    # Appending the first block_length - 1 months makes wrapped blocks contiguous
+    extended = np.concatenate([log_returns, log_returns[:block_length - 1]]).astype(dtype)
+
+    months = np.arange(max([0, *horizons_months]))
+    block_of, offset_of = months // block_length, months % block_length
+    starts = np.empty((0, num_simulations), dtype=np.int64)
+    first_block = 0
+
+    def fill_returns(returns: np.ndarray, scratch: np.ndarray, start_month: int) -> None:
+        nonlocal starts, first_block
+        span = slice(start_month, start_month + len(returns))
+        blocks = block_of[span]
+        # A bootstrap block may straddle simulation blocks: keep its start
+        kept = starts[blocks[0] - first_block:]
+        fresh = rng.integers(0, history, size=(blocks[-1] - blocks[0] + 1 - len(kept), num_simulations))
+        starts = np.concatenate([kept, fresh]) if len(kept) else fresh
+        first_block = blocks[0]
+
+        index = starts[blocks - first_block]
+        index += offset_of[span, None]
+        np.take(extended, index, axis=0, out=returns, mode='clip')   # in range; 'raise' would buffer `out`
+
+    return _accumulate_path_factors(fill_returns, horizons_months, num_simulations, num_assets, block_months, dtype)
+
+
+def _accumulate_path_factors(
+    fill_returns: Callable[[np.ndarray, np.ndarray, int], None],
+    horizons_months: list[int],
+    num_simulations: int,
+    num_assets: int,
+    block_months: int,
+    dtype: np.dtype
+) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """
+    Compounds monthly log-returns into per-asset growth factors, one block of
+    months at a time. `fill_returns(returns, scratch, start_month)` writes the
+    (months x paths x assets) log-returns of the block starting at
+    `start_month` into `returns`; it may use `scratch` (same shape) freely.
+    """
+    lumpsum_growth = np.ones((num_simulations, num_assets), dtype=dtype)
+    sip_growth = np.zeros((num_simulations, num_assets), dtype=dtype)
+
+    checkpoints = sorted(set(max(0, int(h)) for h in horizons_months))
+    results: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+    if checkpoints and checkpoints[0] == 0:
+        results[0] = (lumpsum_growth.copy(), sip_growth.copy())
+    if not checkpoints or checkpoints[-1] == 0:
+        return results
+
+    # Month-major scratch buffers (any leading slice of months stays
+    # contiguous), no longer than the horizon and, when a month fits at all,
+    # small enough to stay in cache: fresh multi-MB buffers also page-fault
+    # on every call, which made short horizons slower than a per-month loop
+    month_bytes = num_simulations * num_assets * np.dtype(dtype).itemsize
+    cached_months = _BLOCK_BUFFER_BYTES // month_bytes or block_months
+    block = max(1, min(block_months, checkpoints[-1], cached_months))
+    scratch_buf = np.empty((block, num_simulations, num_assets), dtype=dtype)
+    return_buf = np.empty_like(scratch_buf)
+
+    elapsed = 0
+    for checkpoint in checkpoints:
+        while elapsed < checkpoint:
+            months = min(block, checkpoint - elapsed)
+            returns = return_buf[:months]
+            fill_returns(returns, scratch_buf[:months], elapsed)
+
+            # tail[j] = growth from the start of month j to the end of the block,
+            # summed month by month: contiguous adds beat a strided reverse cumsum
+            tail = scratch_buf[:months]
+            tail[-1] = returns[-1]
+            for j in range(months - 2, -1, -1):
+                np.add(tail[j + 1], returns[j], out=tail[j])
+            np.exp(tail, out=tail)
+
+            # SIPs made in earlier blocks compound through this block; this block's
+            # SIPs (one at the start of every month) add their own tail growth
+            block_growth = tail[0]
+            sip_growth *= block_growth
+            sip_growth += tail.sum(axis=0)
+            lumpsum_growth *= block_growth
+            elapsed += months
+
+        if checkpoint:
+            last = checkpoint == checkpoints[-1]
+            results[checkpoint] = (
+                (lumpsum_growth, sip_growth) if last
+                else (lumpsum_growth.copy(), sip_growth.copy())
+            )
+
+    return results
+
+
+ENGINES = ('gaussian', 'bootstrap')
+SAMPLERS = ('pseudo', 'antithetic', 'sobol')
+# Cap on each of the kernel's two month-major block buffers (about L2 size)
+_BLOCK_BUFFER_BYTES = 1 << 19
+
+
+def _draw_shocks(rng: np.random.Generator, out: np.ndarray, sampler: str) -> None:
+    """
+    Fills `out` (months x paths x assets) with standard normal shocks.
+    """
+    if sampler == 'pseudo':
+        rng.standard_normal(out=out, dtype=out.dtype)
+        return
+
+    months, paths, assets = out.shape
+    if sampler == 'antithetic':
+        half = paths // 2
+        draws = rng.standard_normal((months, half, assets), dtype=out.dtype)
+        out[:, 0:2 * half:2] = draws
+        np.negative(draws, out=out[:, 1:2 * half:2])
+        if paths % 2:
+            out[:, -1] = rng.standard_normal((months, assets), dtype=out.dtype)
+        return
+
+    from scipy.special import ndtri
+    from scipy.stats import qmc
+
+    engine = qmc.Sobol(d=months * assets, scramble=True, rng=rng)
+    with warnings.catch_warnings():
+        # Sobol balance is best at powers of 2; any prefix is still low-discrepancy
+        warnings.simplefilter('ignore', UserWarning)
+        points = engine.random(paths)
+    # Scrambling keeps structure tied to the point index, so points of
+    # successive engines would be correlated path by path: shuffle them
+    # (Latin supercube sampling)
+    points = points[rng.permutation(paths)]
+    np.clip(points, 1e-12, 1 - 1e-12, out=points)
+    out[...] = ndtri(points).reshape(paths, months, assets).transpose(1, 0, 2)
+
+
+_executors: dict[tuple[str, int], Executor] = {}
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int, kind: str = MC_PARALLEL_KIND) -> Executor:
+    """
+    Returns the process-wide simulation pool of `kind` with `workers`
+    workers, creating it on first use. Pools are keyed by kind and size and
+    never shut down, so concurrent callers can always submit to them; in
+    practice there is one, sized MC_PARALLEL_WORKERS.
+    """
+    with _executor_lock:
+        executor = _executors.get((kind, workers))
+        if executor is None:
+            if kind == 'process':
+                context = multiprocessing.get_context('spawn')
+                executor = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=context,
+                    initializer=forward_to_parent, initargs=(worker_log_queue(context),)
+                )
+            elif kind == 'thread':
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='monte-carlo')
+            else:
+                raise ValueError(f"Unknown Monte Carlo pool kind: '{kind}'. Expected 'process' or 'thread'.")
+            _executors[(kind, workers)] = executor
+        return executor
+
+
+def _simulate_sharded(
+    simulate: Callable,
+    args: tuple,
+    num_simulations: int,
+    rng: np.random.Generator,
+    workers: int,
+    paired: bool = False,
+    **kwargs
+) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """
+    Simulates `num_simulations` paths as up to `workers` independent shards
+    (fewer if there are fewer paths) on the simulation pool of `workers`
+    workers, each `simulate(*args, size, rng=child, **kwargs)`, and
+    concatenates them in shard order. With `paired`, antithetic pairs are
+    kept whole within shards.
+    """
+    shards = min(workers, num_simulations)
+    sizes = [len(part) for part in np.array_split(np.arange(num_simulations), shards)]
+    if paired:
+        sizes = [len(part) * 2 for part in np.array_split(np.arange(num_simulations // 2), shards)]
+        sizes[-1] += num_simulations % 2
+    executor = _get_executor(workers)
+    futures = [
+        executor.submit(simulate, *args, size, rng=child, **kwargs)
+        for size, child in zip(sizes, rng.spawn(shards))
+    ]
+    shards = [future.result() for future in futures]
+    return {
+        horizon: (
+            np.concatenate([shard[horizon][0] for shard in shards]),
+            np.concatenate([shard[horizon][1] for shard in shards]),
+        )
+        for horizon in shards[0]
+    }
+
+
+def goal_probability(
+    lumpsum_factors: np.ndarray,
+    sip_factors: np.ndarray,
+    lumpsum: float,
+    monthly_sip: float,
+    goal_amount: float
+) -> float:
+    """
+    Fraction of paths whose terminal value reaches `goal_amount`.
+
+    :param lumpsum_factors: Shape (N,) weighted lumpsum growth per path.
+    :param sip_factors: Shape (N,) weighted SIP growth per path.
+    """
+    terminal = lumpsum * lumpsum_factors + monthly_sip * sip_factors
+    return float((terminal >= goal_amount).mean())
+
+
+def expected_path_factors(
+    mu: np.ndarray,
+    chol: np.ndarray,
+    weights: np.ndarray,
+    num_months: int
+) -> tuple[float, float]:
+    """
+    Closed-form means of the weighted (lumpsum, SIP) growth factors under
+    the simulated model: each asset's monthly growth exp(r) with
+    r ~ N(mu, sigma^2) has mean g = exp(mu + sigma^2 / 2), so E[A] = g^M and
+    E[B] = g + g^2 + ... + g^M, weighted across assets.
+    """
+    variance = np.einsum('ij,ij->i', chol, chol)
+    growth = np.exp(np.asarray(mu) + variance / 2)
+    powers = growth[None, :] ** np.arange(1, num_months + 1)[:, None]
+    lumpsum_mean = powers[-1] if num_months else np.ones_like(growth)
+    return float(lumpsum_mean @ weights), float(powers.sum(axis=0) @ weights)
+
+
+def expected_bootstrap_factors(
+    log_returns: np.ndarray,
+    weights: np.ndarray,
+    num_months: int,
+    block_length: int = MC_BOOTSTRAP_BLOCK_MONTHS
+) -> tuple[float, float]:
+    """
+    Exact means of the weighted (lumpsum, SIP) growth factors under the
+    circular block bootstrap of `bootstrap_path_factors_at`. Blocks are
+    independent, so with h(o, e) the mean growth over offsets [o, e) of a
+    block (averaged over all starts), G = h(0, L) and R = h(0, r) for the
+    last, partial block of r = M mod L months:
+
+        E[A] = G^(M // L) * R
+        E[B] = R * (G^0 + ... + G^(M // L - 1)) * sum_o h(o, L) + sum_o h(o, r)
+    """
+    history = len(log_returns)
+    block_length = max(1, min(block_length, history))
+    extended = np.concatenate([log_returns, log_returns[:block_length - 1]])
+    cumulative = np.vstack([np.zeros(log_returns.shape[1]), np.cumsum(extended, axis=0)])
+    starts = np.arange(history)
+
+    def h(offset: int, end: int) -> np.ndarray:
+        return np.exp(cumulative[starts + end] - cumulative[starts + offset]).mean(axis=0)
+
+    full_blocks, rest = divmod(num_months, block_length)
+    block_growth = h(0, block_length)
+    rest_growth = h(0, rest)
+    block_sip = sum(h(o, block_length) for o in range(block_length))
+    rest_sip = sum((h(o, rest) for o in range(rest)), np.zeros_like(block_growth))
+
+    lumpsum_mean = block_growth ** full_blocks * rest_growth
+    sip_mean = rest_growth * block_sip * (block_growth[None, :] ** np.arange(full_blocks)[:, None]).sum(axis=0) + rest_sip
+    return float(lumpsum_mean @ weights), float(sip_mean @ weights)
+
+
+def goal_probability_estimate(
+    lumpsum_factors: np.ndarray,
+    sip_factors: np.ndarray,
+    lumpsum: float,
+    monthly_sip: float,
+    goal_amount: float,
+    paired: bool = False,
+    control_means: tuple[float, float] | None = None
+) -> tuple[float, float]:
+    """
+    Goal probability with its standard error.
+
+    :param paired: Whether paths (2i, 2i+1) are antithetic pairs; the error is
+                   then estimated from the pair means.
+    :param control_means: Exact (E[A], E[B]) of the factors. If given, the
+                          terminal value is used as a control variate with
+                          the variance-minimizing coefficient.
+    :return: Tuple (probability, standard_error).
+    """
+    terminal = lumpsum * lumpsum_factors + monthly_sip * sip_factors
+    values = (terminal >= goal_amount).astype(np.float64)
+
+    if control_means is not None:
+        expected = lumpsum * control_means[0] + monthly_sip * control_means[1]
+        centered = terminal - terminal.mean()
+        denom = float(centered @ centered)
+        if denom > 0:
+            beta = float(centered @ (values - values.mean())) / denom
+            values = values - beta * (terminal - expected)
+
+    if paired and len(values) >= 4:
+        pairs = len(values) // 2
+        values = (values[0:2 * pairs:2] + values[1:2 * pairs:2]) / 2
+
+    n = len(values)
+    probability = float(np.clip(values.mean(), 0.0, 1.0))
+    error = float(values.std(ddof=1) / math.sqrt(n)) if n > 1 else 1.0
+    return probability, error
+
+
+def probability_margin(hits: int, num_paths: int, confidence: float) -> float:
+    """
+    Half-width of the Wilson score interval for a probability estimated as
+    `hits / num_paths` at the given confidence level. Unlike the normal
+    approximation, it does not collapse to 0 when no or all paths hit.
+    """
+    if num_paths <= 0:
+        return 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = hits / num_paths
+    return z / (1 + z * z / num_paths) * math.sqrt(p * (1 - p) / num_paths + z * z / (4 * num_paths ** 2))
+
+
+def sip_for_probability(
+    lumpsum_factors: np.ndarray,
+    sip_factors: np.ndarray,
+    lumpsum: float,
+    goal_amount: float,
+    target_prob: float
+) -> float:
+    """
+    Smallest monthly SIP for which at least `target_prob` of the paths reach
+    `goal_amount`.
+
+    A path reaches the goal iff sip >= (goal - lumpsum * A) / B, so the answer
+    is the ceil(target_prob * N)-th smallest of those ratios (floored at 0).
+    """
+    required = (goal_amount - lumpsum * lumpsum_factors) / sip_factors
+    k = min(max(math.ceil(target_prob * len(required)), 1), len(required))
+    sip = float(np.partition(required, k - 1)[k - 1])
+    return max(sip, 0.0)
+
+
+def sip_margin(
+    lumpsum_factors: np.ndarray,
+    sip_factors: np.ndarray,
+    lumpsum: float,
+    goal_amount: float,
+    target_prob: float,
+    confidence: float
+) -> float:
+    """
+    Half-width of the distribution-free confidence interval of
+    `sip_for_probability`, in rupees: the required SIPs of order statistics
+    n*p ± z*sqrt(n*p*(1-p)) bracket the true `target_prob` quantile at the
+    given confidence, whatever the distribution of the paths. Assumes
+    independent paths; for antithetic pairs the interval is conservative.
+    """
+    required = (goal_amount - lumpsum * lumpsum_factors) / sip_factors
+    n = len(required)
+    if n == 0:
+        return math.inf
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    spread = z * math.sqrt(n * target_prob * (1 - target_prob))
+    low = min(max(math.floor(target_prob * n - spread), 1), n)
+    high = min(max(math.ceil(target_prob * n + spread), 1), n)
+    bounds = np.maximum(np.partition(required, [low - 1, high - 1])[[low - 1, high - 1]], 0.0)
+    return float(bounds[1] - bounds[0]) / 2
+
+
+def chunk_paths_for_budget(
+    num_assets: int,
+    memory_budget_mb: float = MC_MEMORY_BUDGET_MB,
+    block_months: int = MC_BLOCK_MONTHS,
+    dtype: type = np.float64,
+    bootstrap: bool = False
+) -> int:
+    """
+    Largest number of paths per chunk whose working set fits the budget.
+
+    Per path, the kernel holds two (block_months x n_assets) scratch buffers
+    and two n_assets growth accumulators in `dtype` (plus, when
+    bootstrapping, block_months int64 month indices); the streaming loop
+    adds the weighted factors and derived per-path values (float64).
+    """
+    itemsize = np.dtype(dtype).itemsize
+    per_path = (2 * block_months + 2) * num_assets * itemsize + 6 * 8
+    if bootstrap:
+        per_path += block_months * 8
+    return max(1, int(memory_budget_mb * 2**20) // per_path)
+
+
+class StreamingEstimate:
+    """
+    Accumulators of a streamed Monte Carlo run for one goal: paths seen,
+    paths reaching the goal, and sketches of the SIP each path requires and
+    of its terminal value.
+    """
+
+    def __init__(self, goal_amount: float, lumpsum: float, monthly_sip: float, sketch_size: int = MC_SKETCH_SIZE):
+        self.goal_amount = goal_amount
+        self.lumpsum = lumpsum
+        self.monthly_sip = monthly_sip
+        self.num_paths = 0
+        self.hits = 0
+        self.chunks = 0
+        self.chunk_paths = 0
+        self.required_sip = QuantileSketch(sketch_size)
+        self.terminal_value = QuantileSketch(sketch_size)
+
+    def update(self, lumpsum_factors: np.ndarray, sip_factors: np.ndarray) -> None:
+        """
+        Folds one chunk of weighted per-path factors into the accumulators.
+        """
+        lumpsum_factors = lumpsum_factors.astype(np.float64, copy=False)
+        sip_factors = sip_factors.astype(np.float64, copy=False)
+        terminal = self.lumpsum * lumpsum_factors + self.monthly_sip * sip_factors
+        self.hits += int(np.count_nonzero(terminal >= self.goal_amount))
+        self.terminal_value.add(terminal)
+        self.required_sip.add((self.goal_amount - self.lumpsum * lumpsum_factors) / sip_factors)
+        self.num_paths += len(terminal)
+        self.chunks += 1
+        self.chunk_paths = max(self.chunk_paths, len(terminal))
+
+    def merge(self, other: "StreamingEstimate") -> None:
+        self.num_paths += other.num_paths
+        self.hits += other.hits
+        self.chunks += other.chunks
+        self.chunk_paths = max(self.chunk_paths, other.chunk_paths)
+        self.required_sip.merge(other.required_sip)
+        self.terminal_value.merge(other.terminal_value)
+
+    @property
+    def probability(self) -> float:
+        """
+        Fraction of paths reaching the goal with `monthly_sip` (exact).
+        """
+        return self.hits / self.num_paths if self.num_paths else 0.0
+
+    @property
+    def standard_error(self) -> float:
+        p = self.probability
+        return math.sqrt(p * (1 - p) / self.num_paths) if self.num_paths else 0.0
+
+    def sip_for_probability(self, target_prob: float) -> float:
+        """
+        Monthly SIP reaching the goal on `target_prob` of the paths, read
+        from the sketch (exact while the run fits in one sketch).
+        """
+        return max(self.required_sip.quantile(target_prob), 0.0)
+
+    def terminal_quantiles(self, quantiles: list[float]) -> dict[float, float]:
+        return {q: self.terminal_value.quantile(q) for q in quantiles}
+
+
+def stream_goal_estimate(
+    mu: np.ndarray,
+    chol: np.ndarray,
+    weights: np.ndarray,
+    num_months: int,
+    num_simulations: int,
+    goal_amount: float,
+    lumpsum: float = 0.0,
+    monthly_sip: float = 0.0,
+    rng: np.random.Generator | None = None,
+    chunk_paths: int | None = MC_CHUNK_PATHS,
+    memory_budget_mb: float = MC_MEMORY_BUDGET_MB,
+    dtype: type | str = MC_DTYPE,
+    block_months: int = MC_BLOCK_MONTHS,
+    workers: int = MC_PARALLEL_WORKERS,
+    sampler: str = MC_SAMPLER,
+    log_returns: np.ndarray | None = None
+) -> StreamingEstimate:
+    """
+    Streams `num_simulations` paths through the Monte Carlo kernel in chunks
+    and returns the goal statistics, without ever holding all paths.
+
+    :param weights: Shape (n_assets,) portfolio weights.
+    :param chunk_paths: Paths per chunk; capped so that a chunk fits
+                        `memory_budget_mb` (None: as many as the budget allows).
+    :param memory_budget_mb: Working-memory budget of one chunk, in MiB.
+    :param dtype: 'float64' or 'float32' (halves memory, about 1e-7 relative precision).
+    :param workers: Parallel shards per chunk (see `simulate_path_factors_at`).
+    :param sampler: How shocks are drawn, one of SAMPLERS.
+    :param log_returns: Historical monthly log-returns; if given, paths are
+                        block-bootstrapped from them (`bootstrap_path_factors_at`)
+                        instead of drawn from the Gaussian model.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    dtype = np.dtype(dtype)
+    weights = np.asarray(weights, dtype=dtype)
+    bootstrap = log_returns is not None
+    budget_paths = chunk_paths_for_budget(len(mu), memory_budget_mb, block_months, dtype, bootstrap)
+    chunk = min(chunk_paths or budget_paths, budget_paths)
+
+    estimate = StreamingEstimate(goal_amount, lumpsum, monthly_sip)
+    remaining = num_simulations
+    while remaining > 0:
+        paths = min(chunk, remaining)
+        if bootstrap:
+            lumpsum_growth, sip_growth = bootstrap_path_factors_at(
+                log_returns, [num_months], paths,
+                rng=rng, block_months=block_months, dtype=dtype, workers=workers
+            )[num_months]
+        else:
+            lumpsum_growth, sip_growth = simulate_path_factors(
+                mu, chol, num_months, paths,
+                rng=rng, block_months=block_months, dtype=dtype, workers=workers, sampler=sampler
+            )
+        estimate.update(lumpsum_growth @ weights, sip_growth @ weights)
+        remaining -= paths
+    return estimate
+
+
+def main(argv: list[str] | None = None) -> None:
+    from core.goal_engine import _build_portfolio
+    from models.goal_request import AssetAllocation
+    from config import TARGET_PROB_OF_SUCCESS, USER_RISK_PROFILES
+
+    parser = argparse.ArgumentParser(description="Streaming Monte Carlo goal estimate for large path counts.")
+    parser.add_argument("--engine", choices=ENGINES, default=MC_ENGINE)
+    parser.add_argument("--profile", choices=[p for p in USER_RISK_PROFILES if p != 'custom'], default='balanced')
+    parser.add_argument("--horizon", type=int, default=10, help="Years (default: 10).")
+    parser.add_argument("--goal", type=float, default=1e7, help="Goal amount in INR (default: 1e7).")
+    parser.add_argument("--lumpsum", type=float, default=0.0, help="Lumpsum in INR (default: 0).")
+    parser.add_argument("--paths", type=int, default=1_000_000, help="Number of paths (default: 1e6).")
+    parser.add_argument("--chunk-paths", type=int, default=MC_CHUNK_PATHS, help="Paths per chunk.")
+    parser.add_argument("--budget-mb", type=float, default=MC_MEMORY_BUDGET_MB, help="Memory budget per chunk (MiB).")
+    parser.add_argument("--float32", action="store_true", help="Simulate in float32.")
+    parser.add_argument("--workers", type=int, default=MC_PARALLEL_WORKERS, help="Parallel shards per chunk.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    portfolio = _build_portfolio(args.goal, args.horizon, args.lumpsum, args.profile, AssetAllocation())
+    portfolio.compute_asset_xirr(mode='median')
+    portfolio.compute_per_asset_sips()
+    portfolio.rng = np.random.default_rng(args.seed)
+    portfolio.engine = args.engine
+
+    estimate = portfolio.stream_goal_estimate(
+        args.paths,
+        chunk_paths=args.chunk_paths,
+        memory_budget_mb=args.budget_mb,
+        dtype='float32' if args.float32 else MC_DTYPE,
+        workers=args.workers
+    )
+    print(json.dumps({
+        'engine': args.engine,
+        'paths': estimate.num_paths,
+        'chunks': estimate.chunks,
+        'chunk_paths': estimate.chunk_paths,
+        'monthly_sip': portfolio.total_monthly_sip,
+        'goal_probability': estimate.probability,
+        'standard_error': estimate.standard_error,
+        'sip_for_target_probability': estimate.sip_for_probability(TARGET_PROB_OF_SUCCESS),
+        'terminal_value_quantiles': estimate.terminal_quantiles([0.001, 0.01, 0.05, 0.5, 0.95, 0.99, 0.999]),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Consolidated, memory-mapped copy of the NAV and forex datasets.
+
+Every NAV and forex Feather file is written into one uncompressed Arrow IPC
+file (`NAV_DATASET_PATH`): a `Date` column holding the union of all dates and
+one float64 column per series, null where the series has no row. Each
+column's field metadata records its source file (path relative to the
+dataset file, value column name, mtime/size and sha256), so readers can tell
+whether the copy is current.
+
+The file is opened with memory mapping: nothing is copied or decompressed on
+open, and every worker process on the host shares the same OS page cache.
+`table` projects columns and slices a date range as zero-copy views.
+`read_series` hands out a series as a DataFrame over read-only NumPy views
+of the mapped buffers, as long as its rows are contiguous on the shared date
+axis (as they are when every series follows the same monthly grid);
+otherwise its rows are copied out and the build logs a warning.
+
+Usage
+-----
+    python -m core.nav_dataset build
+    python -m core.nav_dataset build --output /tmp/navs.arrow
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from config import ASSET_NAV_DATA_PATH, FOREX_RATES_DIR, NAV_DATASET_PATH
+from utils.logger import get_logger
+
+
+def read_feather_series(path: str) -> pd.DataFrame:
+    """
+    Reads a NAV or forex Feather file with normalized and sorted dates.
+    """
+    df = pd.read_feather(path)
+    df['Date'] = pd.to_datetime(df['Date']).dt.normalize()
+    return df.sort_values('Date').reset_index(drop=True)
+
+
+def source_files(nav_paths: dict[str, str] | None = None, forex_dir: str | None = None) -> dict[str, str]:
+    """
+    Lists the series to consolidate: every Feather file next to the
+    configured NAV files and in the forex directory.
+
+    :return: Dict mapping series name ('nav/<stem>' or 'forex/<stem>') to path.
+    """
+    nav_paths = nav_paths if nav_paths is not None else ASSET_NAV_DATA_PATH
+    forex_dir = forex_dir if forex_dir is not None else FOREX_RATES_DIR
+
+    sources = {}
+    dirs = [('nav', d) for d in sorted({os.path.dirname(p) for p in nav_paths.values()})] + [('forex', forex_dir)]
+    for kind, directory in dirs:
+        for path in sorted(glob.glob(os.path.join(directory, '*.feather'))):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            sources[f"{kind}/{stem}"] = os.path.abspath(path)
+    return sources
+
+
+class NavDataset:
+    """
+    Read-only view of a consolidated Arrow dataset, memory-mapped on open.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path if path is not None else NAV_DATASET_PATH
+        self._source = pa.memory_map(self.path, 'r')
+        reader = pa.ipc.open_file(self._source)
+        # Written as a single record batch: every column is one contiguous buffer
+        self._batch = reader.get_batch(0)
+        self._dates = self._batch.column('Date').to_numpy(zero_copy_only=True)
+
+        self.sources: dict[str, dict] = {}
+        for field in self._batch.schema:
+            if field.name == 'Date':
+                continue
+            meta = {k.decode(): v.decode() for k, v in (field.metadata or {}).items()}
+            meta['path'] = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(self.path)), meta['source']))
+            self.sources[field.name] = meta
+        self._by_path = {meta['path']: name for name, meta in self.sources.items()}
+
+    @property
+    def series_names(self) -> list[str]:
+        return list(self.sources)
+
+    def _row_range(self, start, end) -> tuple[int, int]:
+        lo = 0 if start is None else int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(start), 'ns'), 'left'))
+        hi = len(self._dates) if end is None else int(np.searchsorted(self._dates, np.datetime64(pd.Timestamp(end), 'ns'), 'right'))
+        return lo, max(lo, hi)
+
+    def table(self, columns: list[str] | None = None, start=None, end=None) -> pa.RecordBatch:
+        """
+        Zero-copy projection of `columns` (default: all series) over the
+        dates in [start, end], with the `Date` column first. Absent values
+        are null.
+
+        :raises KeyError: If a column is not in the dataset.
+        """
+        columns = self.series_names if columns is None else columns
+        unknown = set(columns) - set(self.sources)
+        if unknown:
+            raise KeyError(f"Series not in dataset: {sorted(unknown)}")
+        lo, hi = self._row_range(start, end)
+        return self._batch.select(['Date', *columns]).slice(lo, hi - lo)
+
+    def read_series(self, name: str, start=None, end=None) -> pd.DataFrame:
+        """
+        One series as it was read from its source file: ['Date', <value
+        column>] with the dataset's rows where it is present.
+
+        If those rows are contiguous, both columns are zero-copy, read-only
+        views of the memory-mapped buffers; otherwise they are copied out.
+        """
+        batch = self.table([name], start, end)
+        values = batch.column(name)
+        if values.null_count:
+            rows = np.flatnonzero(values.is_valid().to_numpy(zero_copy_only=False))
+            if len(rows) == 0 or rows[-1] - rows[0] + 1 == len(rows):
+                batch = batch.slice(rows[0] if len(rows) else 0, len(rows))
+            else:
+                batch = batch.filter(values.is_valid())
+        return pd.DataFrame({
+            'Date': batch.column('Date').to_numpy(zero_copy_only=True),
+            self.sources[name]['column']: batch.column(name).to_numpy(zero_copy_only=True),
+        }, copy=False)
+
+    def snapshot(self, path: str) -> tuple[tuple[int, int], str, pd.DataFrame] | None:
+        """
+        Returns the recorded (mtime_ns, size) signature, sha256 digest and
+        contents of the source file at `path`, or None if it is not in the
+        dataset. Callers compare the signature/digest with the file on disk.
+        """
+        name = self._by_path.get(os.path.abspath(path))
+        if name is None:
+            return None
+        meta = self.sources[name]
+        signature = (int(meta['mtime_ns']), int(meta['size']))
+        return signature, meta['sha256'], self.read_series(name)
+
+
+def build(path: str | None = None, sources: dict[str, str] | None = None) -> dict[str, int]:
+    """
+    Writes every source series into one uncompressed Arrow IPC file,
+    atomically replacing `path` (default: `NAV_DATASET_PATH`).
+
+    :return: Dict mapping series name to its number of rows.
+    """
+    path = path if path is not None else NAV_DATASET_PATH
+    sources = sources if sources is not None else source_files()
+    base_dir = os.path.dirname(os.path.abspath(path))
+
+    frames, fields = {}, []
+    for name, source in sources.items():
+        with open(source, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        stat = os.stat(source)
+        df = read_feather_series(source)
+        value_column = next(c for c in df.columns if c != 'Date')
+        frames[name] = df[['Date', value_column]]
+        fields.append(pa.field(name, pa.float64(), metadata={
+            'source': os.path.relpath(source, base_dir),
+            'column': value_column,
+            'mtime_ns': str(stat.st_mtime_ns),
+            'size': str(stat.st_size),
+            'sha256': digest,
+        }))
+
+    dates = np.unique(np.concatenate(
+        [df['Date'].to_numpy(dtype='datetime64[ns]') for df in frames.values()]
+    )) if frames else np.array([], dtype='datetime64[ns]')
+
+    arrays = [pa.array(dates, type=pa.timestamp('ns'))]
+    for name, df in frames.items():
+        rows = np.searchsorted(dates, df['Date'].to_numpy(dtype='datetime64[ns]'))
+        if len(rows) and rows[-1] - rows[0] + 1 != len(rows):
+            get_logger().warning(
+                f"{name}: {rows[-1] - rows[0] + 1 - len(rows)} dates of other series fall inside its range; "
+                "it will be copied on read instead of served from the mapped pages."
+            )
+        values = np.full(len(dates), np.nan)
+        values[rows] = df.iloc[:, 1].to_numpy(dtype=np.float64)
+        present = np.zeros(len(dates), dtype=bool)
+        present[rows] = True
+        arrays.append(pa.array(values, type=pa.float64(), mask=~present))
+
+    schema = pa.schema([pa.field('Date', pa.timestamp('ns')), *fields])
+    batch = pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_batch(batch)
+    os.replace(tmp_path, path)
+    return {name: len(df) for name, df in frames.items()}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build the memory-mapped NAV/forex dataset.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_cmd = sub.add_parser("build", help="Consolidate every NAV and forex file into one Arrow file.")
+    build_cmd.add_argument("--output", default=None, help="Output path (default: NAV_DATASET_PATH).")
+    args = parser.parse_args(argv)
+
+    rows = build(args.output)
+    get_logger().info(f"NAV dataset written to {args.output or NAV_DATASET_PATH}: {json.dumps(rows)}")
+
+
+if __name__ == "__main__":
+    main()
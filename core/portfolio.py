@@ -1,12 +1,26 @@
 # core/Portfolio.py
 
+import math
 from datetime import datetime
+from functools import lru_cache
+from statistics import NormalDist
 from typing import List, Dict, Literal
 
 import pandas as pd
 import numpy as np
 
+from config import (
+    MC_ADAPTIVE_BATCH, MC_BOOTSTRAP_BLOCK_MONTHS, MC_CONFIDENCE_LEVEL, MC_CONTROL_VARIATE, MC_ENGINE,
+    MC_MIN_SIMULATIONS, MC_PARALLEL_WORKERS, MC_SAMPLER, SIMULATION_SEED
+)
 from core.asset import Asset
+from core.dataset_store import AlignedNavs, fill_gaps, get_dataset_store
+from core.monte_carlo import (
+    ENGINES, StreamingEstimate, bootstrap_path_factors_at, expected_bootstrap_factors, expected_path_factors,
+    goal_probability, goal_probability_estimate, probability_margin, simulate_path_factors_at, sip_for_probability,
+    sip_margin, stream_goal_estimate
+)
+from core.portfolio_model import PortfolioModel, get_portfolio_model_cache
 from core.xirr_calculator import XirrCalculator
 from models.asset_summary import AssetSummary
 from models.portfolio_summary import PortfolioSummary
@@ -21,7 +35,7 @@ class Portfolio:
       - computes portfolio XIRR via rolling historical NAV
       - simulates month-by-month growth
       - estimates probability of reaching goal via Monte Carlo
-      - suggests SIP to hit a target probability
+      - suggests SIP to hit a target probability from the same simulated paths
     """
 
     def __init__(
@@ -48,15 +62,25 @@ class Portfolio:
         self.asset_xirrs: Dict[str, float] = {}
         self.total_monthly_sip: float = 0.0
         self.monthly_rate: float = 0.0
-        self.cumulative_investment: List[float] = []
-        self.cumulative_returns: List[float] = []
+        self.cumulative_investment: np.ndarray = np.zeros(0)
+        self.cumulative_returns: np.ndarray = np.zeros(0)
         self.portfolio_xirr: float = 0.0
         self.portfolio_forecasted_xirr: float = 0.0
 
         # Probability-related
         self._composite_nav_df: pd.DataFrame | None = None
+        self._model: PortfolioModel | None = None
+        self._path_factors: tuple[int, np.ndarray, np.ndarray] | None = None
+        self._preview_factors: tuple[np.ndarray, np.ndarray] | None = None
+        self.previewed = False                          # probability and SIP from the analytic preview
+        self.rng = np.random.default_rng(SIMULATION_SEED)
+        self.engine = MC_ENGINE
+        self.sampler = MC_SAMPLER
+        self.control_variate = MC_CONTROL_VARIATE
         self.goal_achievement_probability: float = None
+        self.probability_margin: float | None = None   # CI half-width of the first estimate
         self.suggested_sip: float = 0.0
+        self.suggested_sip_margin: float | None = None  # CI half-width of the suggested SIP (₹)
 
     def check_weights(self) -> None:
         """
@@ -106,21 +130,12 @@ class Portfolio:
         Builds composite NAV by weighted sum of each asset's NAV_INR series.
         Returns DataFrame ['Date', 'NAV_INR'].
         """
-        if self._composite_nav_df is None:
-            self.prepare_composite_nav()
-
-        weights = {a.name: a.weight for a in self.assets}
-        missing = set(weights) - set(self._composite_nav_df.columns)
-        if missing:
-            raise ValueError(f"Missing NAV columns for assets: {missing}")
-
-        weighted = self._composite_nav_df.mul(pd.Series(weights), axis=1)
-        nav_series = weighted.sum(axis=1)
-
+        model = self.get_model()
+        weights = np.array([a.weight for a in self.assets])
         return pd.DataFrame({
-            "Date": nav_series.index,
-            "NAV_INR": nav_series.values
-        }).reset_index(drop=True)
+            "Date": model.dates,
+            "NAV_INR": model.composite_nav(weights)
+        })
 
     def compute_portfolio_rolling_xirr(self, mode: Literal["mean", "median", "optimistic", "pessimistic"] = "median") -> tuple[float, list]:
         """
@@ -133,29 +148,23 @@ class Portfolio:
     def simulate_growth(self) -> None:
         """
         Simulates month-by-month portfolio growth at `self.monthly_rate` and SIP.
-        Populates self.cumulative_investment and cumulative_returns.
+        Populates self.cumulative_investment and cumulative_returns (arrays
+        over months 0..total_months).
         """
         M, r, s, L = self.total_months, self.monthly_rate, self.total_monthly_sip, self.lumpsum_amount
-        months = list(range(M + 1))
-        inv_list, val_list = [], []
-
-        for m in months:
-            # Investment to date
-            inv = (L + s * max(0, m - 1)) if L > 0 else s * m
-            inv_list.append(inv)
-
-            # Portfolio value to date
-            if L > 0:
-                lump_growth = L * (1 + r) ** m
-                sip_growth = s * (((1 + r) ** m - 1) / r) * (1 + r) if m > 0 else 0
-                val = lump_growth + sip_growth
-            else:
-                val = s * (((1 + r) ** m - 1) / r) * (1 + r) if m > 0 else 0
+        months = np.arange(M + 1)
+        growth = (1 + r) ** months
+
+        # Investment to date: with a lumpsum, the first SIP is paid a month later
+        invested = (L + s * np.maximum(months - 1, 0)) if L > 0 else s * months.astype(np.float64)
 
-            val_list.append(val)
+        # Portfolio value to date: lumpsum growth plus the SIP annuity (due)
+        value = L * growth if L > 0 else np.zeros(M + 1)
+        annuity = months[1:] if r == 0 else (growth[1:] - 1) / r * (1 + r)
+        value[1:] += s * annuity
 
-        self.cumulative_investment = inv_list
-        self.cumulative_returns = [max(0, val - inv) for val, inv in zip(val_list, inv_list)]
+        self.cumulative_investment = invested
+        self.cumulative_returns = np.maximum(value - invested, 0.0)
 
     def get_portfolio_summary(self) -> PortfolioSummary:
         """
@@ -174,18 +183,18 @@ class Portfolio:
 
         growth = (
             (self.cumulative_returns[-1] / self.cumulative_investment[-1] * 100)
-            if self.cumulative_investment and self.cumulative_investment[-1] != 0
+            if len(self.cumulative_investment) and self.cumulative_investment[-1] != 0
             else 0
         )
 
-        months = list(range(self.total_months + 1))  # 0 to total_months inclusive
-        
+        months = np.arange(self.total_months + 1)  # 0 to total_months inclusive
+
         # Ensure cumulative_returns and cumulative_investment are properly aligned with months
         if len(self.cumulative_returns) != len(months):
             # If simulation didn't run properly, provide empty arrays
-            if not self.cumulative_returns or not self.cumulative_investment:
-                self.cumulative_returns = [0.0] * len(months)
-                self.cumulative_investment = [0.0] * len(months)
+            if not len(self.cumulative_returns) or not len(self.cumulative_investment):
+                self.cumulative_returns = np.zeros(len(months))
+                self.cumulative_investment = np.zeros(len(months))
 
         return PortfolioSummary(
             goal_amount=self.goal_amount,
@@ -206,163 +215,413 @@ class Portfolio:
                 if self.suggested_sip - self.total_monthly_sip >= 1000
                 else "No additional SIP required."
             ),
-            months=months,
-            cumulative_investment=[round(x, 2) for x in self.cumulative_investment],
-            cumulative_returns=[round(x, 2) for x in self.cumulative_returns]
+            goal_probability_margin=(
+                round(self.probability_margin * 100, 2) if self.probability_margin is not None else None
+            ),
+            suggested_sip_margin=(
+                round(self.suggested_sip_margin, 2) if self.suggested_sip_margin is not None else None
+            ),
+            probability_confidence_level=MC_CONFIDENCE_LEVEL if self.probability_margin is not None else None,
+            simulated_paths=self.simulated_paths or None,
+            simulation_engine='analytic' if self.previewed else (self.engine if self.simulated_paths else None),
+            months=months.tolist(),
+            cumulative_investment=np.round(self.cumulative_investment, 2).tolist(),
+            cumulative_returns=np.round(self.cumulative_returns, 2).tolist()
         )
     
-    def _simulate_asset_navs(self, asset: Asset, date_range: pd.Series, base_price: float = 10.0):
+    def prepare_composite_nav(self) -> None:
         """
-        Simulates NAV history for a given asset using expected return rate,
-        generating data for each date in `date_range`.
+        Aligns each Asset's NAV_INR history by date and fills gaps,
+        storing in self._composite_nav_df (one column per asset, in the
+        order of self.assets).
+
+        Data assets are sliced out of the dataset store's aligned NAV matrix
+        (built and gap-filled once per dataset version) instead of being
+        concatenated and filled per request. If NAV data for an asset is
+        missing, simulates it using the asset's expected return rate over the
+        dates of the first asset with data.
         """
-        annual_rate = asset.expected_return_rate / 100  # e.g., 0.12 for 12%
-        monthly_rate = (1 + annual_rate) ** (1/12) - 1  # Monthly compounding rate
+        data_assets = [a for a in self.assets if a._df is not None]
+        aligned = self._aligned_navs(data_assets)
+
+        if data_assets:
+            cols = [aligned.index_of(a.name) for a in data_assets]
+            present = aligned.present[:, cols]
+            if present.any(axis=1).all():
+                rows = slice(None)
+            else:
+                rows = present.any(axis=1)
+            dates = aligned.dates[rows]
+            data_navs = aligned.values[rows][:, cols]
+            # Simulated NAVs follow the first data asset's own dates
+            sim_rows = present[rows, 0]
+        else:
+            start = pd.Timestamp.today().normalize()
+            periods = self.time_horizon * 12 * 2
+            dates = pd.date_range(start=start, periods=periods, freq='MS').to_numpy(dtype='datetime64[ns]')
+            data_navs = np.empty((len(dates), 0))
+            sim_rows = np.ones(len(dates), dtype=bool)
+
+        navs = np.empty((len(dates), len(self.assets)), order='F')
+        n_sim = int(sim_rows.sum())
+        data_col = 0
+        for k, asset in enumerate(self.assets):
+            if asset._df is not None:
+                navs[:, k] = data_navs[:, data_col]
+                data_col += 1
+            else:
+                navs[:, k] = np.nan
+                navs[sim_rows, k] = _deterministic_navs(asset.expected_return_rate, n_sim)
+        fill_gaps(navs)
+
+        self._composite_nav_df = pd.DataFrame(
+            navs,
+            index=pd.DatetimeIndex(dates, name='Date'),
+            columns=[a.name for a in self.assets]
+        )
 
-        navs = [base_price]
-        for _ in range(1, len(date_range)):
-            # Deterministic compounding
-            new_nav = navs[-1] * (1 + monthly_rate)
-            navs.append(round(new_nav, 2))
+    @staticmethod
+    def _aligned_navs(data_assets: List[Asset]) -> AlignedNavs:
+        """
+        Returns the store's shared aligned matrix when it holds every data
+        asset's series; otherwise aligns this portfolio's own series.
+        """
+        store = get_dataset_store()
+        aligned = store.get_aligned_navs()
+        if all(store.nav_paths.get(a.name) == a.feather_path and aligned.index_of(a.name) is not None
+               for a in data_assets):
+            return aligned
+        return AlignedNavs.build('', {a.name: a._df for a in data_assets})
 
-        df = pd.DataFrame({'Date': date_range, 'NAV_INR': navs})
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df[['Date', 'NAV_INR']]
 
-        # Save into the asset for access later
-        asset._df = df
+    def _model_key(self) -> tuple | None:
+        """
+        Identifies the data behind this portfolio's model: each asset's name
+        with the version of its INR series (or its fixed rate if it has no
+        data). None if no asset has data, since the simulated history then
+        depends on today's date.
+        """
+        store = get_dataset_store()
+        key = []
+        for asset in self.assets:
+            if asset.data_available:
+                key.append((asset.name, store.get_inr_nav_version(asset.feather_path)))
+            else:
+                key.append((asset.name, 'rate', asset.expected_return_rate))
+        return tuple(key) if any(a.data_available for a in self.assets) else None
 
+    def _compile_model(self) -> PortfolioModel:
+        if self._composite_nav_df is None:
+            self.prepare_composite_nav()
+        return PortfolioModel.from_frame(
+            self._composite_nav_df[[a.name for a in self.assets]],
+            deterministic=tuple(getattr(a, "deterministic", False) for a in self.assets)
+        )
 
-    def prepare_composite_nav(self) -> None:
+    def get_model(self) -> PortfolioModel:
         """
-        Aligns each Asset's NAV_INR history by date and fills gaps,
-        storing in self._composite_nav_df.
-
-        If NAV data for an asset is missing, simulates it using the asset's
-        expected return rate and a shared date range from other assets.
+        Returns the compiled model (aligned NAVs, log-returns, drift,
+        covariance, Cholesky factor) of this portfolio's assets. Models are
+        shared through a process-wide LRU cache by every portfolio over the
+        same assets and data, whatever their weights.
         """
-        dfs = []
-        to_do = []
-        date_range = None
+        if self._model is None:
+            key = self._model_key()
+            if key is None:
+                self._model = self._compile_model()
+            else:
+                self._model = get_portfolio_model_cache().get_or_create(key, self._compile_model)
+        return self._model
 
-        # Step 1: Find date_range and collect existing NAVs
-        for asset in self.assets:
-            if asset._df is None:
-                to_do.append(asset)
-                continue
+    def estimate_return_model(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the monthly log-return drift vector and the Cholesky factor
+        of its covariance from the composite NAV history.
 
-            # Set date_range from first available asset
-            if date_range is None:
-                date_range = asset._df['Date']
+        Assets with `asset.deterministic == True` get zero volatility.
+        """
+        model = self.get_model()
+        return model.mu, model.chol
 
-            df = asset._df[['Date', 'NAV_INR']].copy()
-            df.set_index('Date', inplace=True)
-            df.rename(columns={'NAV_INR': asset.name}, inplace=True)
-            dfs.append(df)
+    @property
+    def simulated_paths(self) -> int:
+        return self._path_factors[0] if self._path_factors is not None else 0
 
-        # Step 2: Sanity check for missing date_range
-        if date_range is None:
-            start = pd.Timestamp.today().normalize()
-            # periods = self.time_horizon * 12 + 1
-            periods = self.time_horizon * 12 * 2
-            date_range = pd.date_range(start=start, periods=periods, freq='MS')  # 'MS' = Month Start
-            date_range = pd.Series(date_range)
-            # raise ValueError("No asset contains NAV data. Cannot infer date range for simulation.")
+    @property
+    def paired_paths(self) -> bool:
+        """
+        Whether simulated paths come in antithetic pairs.
+        """
+        return self.engine == 'gaussian' and self.sampler == 'antithetic'
 
-        # Step 3: Simulate missing assets
-        for asset in to_do:
-            self._simulate_asset_navs(asset, date_range)
-            df = asset._df[['Date', 'NAV_INR']].copy()
-            df.set_index('Date', inplace=True)
-            df.rename(columns={'NAV_INR': asset.name}, inplace=True)
-            dfs.append(df)
+    def simulate_factors_at(self, horizons_months: list[int], num_simulations: int) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+        """
+        Simulates per-asset (lumpsum, SIP) growth factors at every horizon with
+        this portfolio's engine: Gaussian shocks from the compiled drift and
+        covariance, or block-bootstrapped historical returns.
 
-        # Step 4: Combine all NAVs
-        combined = pd.concat(dfs, axis=1).sort_index().ffill().bfill()
-        self._composite_nav_df = combined
+        :raises ValueError: If the engine is unknown.
+        """
+        if self.engine not in ENGINES:
+            raise ValueError(f"Unknown Monte Carlo engine: '{self.engine}'. Expected one of {ENGINES}.")
+        model = self.get_model()
+        if self.engine == 'bootstrap':
+            return bootstrap_path_factors_at(
+                model.bootstrap_returns, horizons_months, num_simulations,
+                rng=self.rng, block_length=MC_BOOTSTRAP_BLOCK_MONTHS, workers=MC_PARALLEL_WORKERS
+            )
+        return simulate_path_factors_at(
+            model.mu, model.chol, horizons_months, num_simulations,
+            rng=self.rng, workers=MC_PARALLEL_WORKERS, sampler=self.sampler
+        )
 
+    def _get_path_factors(self, num_simulations: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the weighted per-path (lumpsum, SIP) growth factors over
+        self.total_months for at least `num_simulations` paths. Paths are
+        simulated once per portfolio; asking for more only simulates the
+        missing ones and appends them.
+        """
+        missing = num_simulations - self.simulated_paths
+        if missing > 0:
+            if self.paired_paths:
+                missing += missing % 2   # keep antithetic pairs aligned across top-ups
+            lumpsum_growth, sip_growth = self.simulate_factors_at([self.total_months], missing)[self.total_months]
+            weights = np.array([a.weight for a in self.assets])
+            lumpsum_factors, sip_factors = lumpsum_growth @ weights, sip_growth @ weights
+            if self._path_factors is not None:
+                lumpsum_factors = np.concatenate([self._path_factors[1], lumpsum_factors])
+                sip_factors = np.concatenate([self._path_factors[2], sip_factors])
+            self._path_factors = (len(lumpsum_factors), lumpsum_factors, sip_factors)
+        return self._path_factors[1], self._path_factors[2]
+
+    def use_path_factors(
+        self,
+        num_simulations: int,
+        lumpsum_growth: np.ndarray,
+        sip_growth: np.ndarray
+    ) -> None:
+        """
+        Uses per-asset growth factors simulated elsewhere (columns in the order
+        of self.assets, over self.total_months) instead of simulating, so that
+        several goals over the same assets can share one set of paths.
+        """
+        weights = np.array([a.weight for a in self.assets])
+        self._path_factors = (num_simulations, lumpsum_growth @ weights, sip_growth @ weights)
 
     def probability_of_reaching_goal(
         self,
         monthly_sip: float,
         lumpsum: float = 0.0,
-        num_simulations: int = 10_000
+        num_simulations: int = 10_000,
+        goal_amount: float | None = None,
+        tolerance: float | None = None,
+        confidence: float = MC_CONFIDENCE_LEVEL
     ) -> float:
         """
-        Monte Carlo simulation to estimate probability of reaching self.goal_amount
-        over self.total_months, given monthly_sip and optional lumpsum.
+        Monte Carlo estimate of the probability of reaching `goal_amount`
+        (default: self.goal_amount) over self.total_months, given monthly_sip
+        and optional lumpsum.
 
+        Paths are simulated once per portfolio; since the terminal value is
+        linear in lumpsum and SIP, later calls only re-evaluate the paths.
         Assets with `asset.deterministic == True` will be simulated with zero volatility.
-        """
-        if self._composite_nav_df is None:
-            self.prepare_composite_nav()
 
-        # --- compute historical log-returns ---
-        log_returns = np.log(self._composite_nav_df / self._composite_nav_df.shift(1)).dropna()
-        mu = log_returns.mean().values                  # shape (n_assets,)
-        cov = log_returns.cov().values                  # shape (n_assets, n_assets)
-
-        # --- zero-out rows/cols for any deterministic asset ---
-        for idx, asset in enumerate(self.assets):
-            if getattr(asset, "deterministic", False):
-                cov[idx, :] = 0.0
-                cov[:, idx] = 0.0
-                mu[idx] = mu[idx]  # leave drift intact
-
-        # --- prepare allocations ---
-        weights = np.array([a.weight for a in self.assets])
-        months = self.total_months
-        lumpsum_alloc = weights * lumpsum
-        sip_alloc     = weights * monthly_sip
-
-        # --- set up simulation arrays ---
-        num_assets = len(self.assets)
-        values = np.zeros((num_simulations, num_assets))
-        # L = np.linalg.cholesky(cov)
-        try:
-            L = np.linalg.cholesky(cov)
-        except np.linalg.LinAlgError:
-            # Add small jitter to diagonal
-            jitter = 1e-8
-            cov += np.eye(cov.shape[0]) * jitter
-            L = np.linalg.cholesky(cov)
-
-        # --- run the Monte Carlo ---
-        for m in range(months):
-            # add Lumpsum + SIP on month 0, else just SIP
-            values += (lumpsum_alloc + sip_alloc) if m == 0 else sip_alloc
-
-            # draw shocks
-            z = np.random.randn(num_simulations, num_assets)
-            # correlated returns
-            returns = z @ L.T + mu
-            # apply to values
-            values *= np.exp(returns)
-
-        # --- compute probability ---
-        portfolio_vals = values.sum(axis=1)
-        prob = float((portfolio_vals >= self.goal_amount).mean())
+        With a `tolerance`, the estimate is adaptive: starting from
+        MC_MIN_SIMULATIONS paths, paths are added in batches until the
+        Wilson interval at `confidence` is within ±tolerance, with
+        `num_simulations` as the path budget. Without one, exactly
+        `num_simulations` paths are used (or more, if already simulated).
+        The achieved half-width of the first estimate is kept in
+        self.probability_margin.
+        """
+        goal_amount = self.goal_amount if goal_amount is None else goal_amount
+
+        if tolerance is None:
+            lumpsum_factors, sip_factors = self._get_path_factors(num_simulations)
+        else:
+            target = min(MC_MIN_SIMULATIONS, num_simulations)
+            while True:
+                lumpsum_factors, sip_factors = self._get_path_factors(target)
+                n = len(lumpsum_factors)
+                prob, margin = self._estimate_probability(
+                    lumpsum_factors, sip_factors, lumpsum, monthly_sip, goal_amount, confidence
+                )
+                if n >= num_simulations or margin <= tolerance:
+                    break
+                # Jump to the path count the current estimate needs, at least one batch ahead
+                needed = math.ceil(n * (margin / tolerance) ** 2)
+                target = min(num_simulations, max(n + MC_ADAPTIVE_BATCH, needed))
+
+        prob, margin = self._estimate_probability(
+            lumpsum_factors, sip_factors, lumpsum, monthly_sip, goal_amount, confidence
+        )
         if self.goal_achievement_probability is None:
             self.goal_achievement_probability = prob
+            self.probability_margin = margin
         return prob
 
+    def _estimate_probability(
+        self,
+        lumpsum_factors: np.ndarray,
+        sip_factors: np.ndarray,
+        lumpsum: float,
+        monthly_sip: float,
+        goal_amount: float,
+        confidence: float
+    ) -> tuple[float, float]:
+        """
+        Returns (probability, confidence-interval half-width). Plain sampling
+        uses the Wilson interval; antithetic pairs and the control variate
+        use the normal interval of their own (smaller) standard error. Sobol
+        points keep the Wilson interval, which overstates their error.
+        """
+        paired = self.paired_paths
+        control_means = None
+        if self.control_variate:
+            model = self.get_model()
+            weights = np.array([a.weight for a in self.assets])
+            if self.engine == 'bootstrap':
+                control_means = expected_bootstrap_factors(
+                    model.bootstrap_returns, weights, self.total_months, MC_BOOTSTRAP_BLOCK_MONTHS
+                )
+            else:
+                control_means = expected_path_factors(model.mu, model.chol, weights, self.total_months)
+
+        prob, error = goal_probability_estimate(
+            lumpsum_factors, sip_factors, lumpsum, monthly_sip, goal_amount,
+            paired=paired, control_means=control_means
+        )
+        n = len(lumpsum_factors)
+        if (not paired and control_means is None) or error == 0:
+            # Wilson also covers the degenerate case of all or no paths hitting
+            return prob, probability_margin(round(prob * n), n, confidence)
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        return prob, z * error
+
 
     def suggest_sip_for_probability(
         self,
         target_prob: float = 0.95,
         lumpsum: float = 0.0,
-        num_simulations: int = 10_000
+        num_simulations: int = 10_000,
+        tolerance: float | None = None,
+        tolerance_amount: float = 0.0,
+        confidence: float = MC_CONFIDENCE_LEVEL
     ) -> float:
         """
-        Uses bisection search to find SIP that achieves target probability.
+        Finds the SIP that achieves target probability directly from a quantile
+        of the simulated paths (no search over repeated simulations). Uses
+        all paths already simulated if there are at least `num_simulations`.
+
+        With a `tolerance`, the path count is adaptive: starting from
+        MC_MIN_SIMULATIONS paths (or those already simulated), paths are
+        added in batches until the order-statistic interval of the SIP at
+        `confidence` (`sip_margin`) is within ±tolerance of the SIP, as a
+        fraction, or within ±tolerance_amount rupees, with `num_simulations`
+        as the path budget. The achieved half-width, in rupees, is kept in
+        self.suggested_sip_margin.
         """
-        low, high = 0.0, self.goal_amount
-        for _ in range(20):
-            mid = (low + high) / 2
-            p = self.probability_of_reaching_goal(mid, lumpsum, num_simulations)
-            if p < target_prob:
-                low = mid
-            else:
-                high = mid
-        self.suggested_sip = round(high, 2)
+        target = num_simulations if tolerance is None else min(MC_MIN_SIMULATIONS, num_simulations)
+        while True:
+            lumpsum_factors, sip_factors = self._get_path_factors(target)
+            n = len(lumpsum_factors)
+            sip = sip_for_probability(lumpsum_factors, sip_factors, lumpsum, self.goal_amount, target_prob)
+            margin = sip_margin(lumpsum_factors, sip_factors, lumpsum, self.goal_amount, target_prob, confidence)
+            if tolerance is None:
+                break
+            limit = max(tolerance * sip, tolerance_amount)
+            if n >= num_simulations or margin <= limit:
+                break
+            # Jump to the path count the current interval needs, at least one batch ahead
+            needed = math.ceil(n * (margin / limit) ** 2) if limit > 0 else num_simulations
+            target = min(num_simulations, max(n + MC_ADAPTIVE_BATCH, needed))
+
+        self.suggested_sip = round(min(sip, self.goal_amount), 2)
+        self.suggested_sip_margin = margin
         return self.suggested_sip
+
+    def _get_preview_factors(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the weighted (lumpsum, SIP) growth factors at the analytic
+        preview's nodes over self.total_months. The per-asset nodes are kept
+        on the shared model, so every portfolio over the same assets, data
+        and horizon reuses them.
+        """
+        if self._preview_factors is None:
+            lumpsum_growth, sip_growth = self.get_model().preview_factors(self.total_months)
+            weights = np.array([a.weight for a in self.assets])
+            self._preview_factors = (lumpsum_growth @ weights, sip_growth @ weights)
+        return self._preview_factors
+
+    def preview_probability_of_reaching_goal(
+        self,
+        monthly_sip: float,
+        lumpsum: float = 0.0,
+        goal_amount: float | None = None
+    ) -> float:
+        """
+        Analytic approximation of `probability_of_reaching_goal` under the
+        Gaussian return model, without simulating (see
+        `core.analytic_preview`). Fast enough for interactive previews.
+        """
+        goal_amount = self.goal_amount if goal_amount is None else goal_amount
+        lumpsum_factors, sip_factors = self._get_preview_factors()
+        prob = goal_probability(lumpsum_factors, sip_factors, lumpsum, monthly_sip, goal_amount)
+        if self.goal_achievement_probability is None:
+            self.goal_achievement_probability = prob
+            self.previewed = True
+        return prob
+
+    def preview_sip_for_probability(self, target_prob: float = 0.95, lumpsum: float = 0.0) -> float:
+        """
+        Analytic approximation of `suggest_sip_for_probability`.
+        """
+        lumpsum_factors, sip_factors = self._get_preview_factors()
+        sip = sip_for_probability(lumpsum_factors, sip_factors, lumpsum, self.goal_amount, target_prob)
+        self.suggested_sip = round(min(sip, self.goal_amount), 2)
+        return self.suggested_sip
+
+    def stream_goal_estimate(
+        self,
+        num_simulations: int,
+        monthly_sip: float | None = None,
+        lumpsum: float | None = None,
+        **kwargs
+    ) -> StreamingEstimate:
+        """
+        Streams `num_simulations` paths in memory-bounded chunks (see
+        `core.monte_carlo.stream_goal_estimate`, which takes the keyword
+        arguments) for path counts too large to hold at once. Defaults to
+        the portfolio's own SIP and lumpsum, and uses the portfolio's engine.
+        Does not touch the cached paths.
+        """
+        model = self.get_model()
+        weights = np.array([a.weight for a in self.assets])
+        if self.engine == 'bootstrap':
+            kwargs.setdefault('log_returns', model.bootstrap_returns)
+        return stream_goal_estimate(
+            model.mu, model.chol, weights, self.total_months, num_simulations, self.goal_amount,
+            lumpsum=self.lumpsum_amount if lumpsum is None else lumpsum,
+            monthly_sip=self.total_monthly_sip if monthly_sip is None else monthly_sip,
+            rng=self.rng,
+            **kwargs
+        )
+
+
+@lru_cache(maxsize=256)
+def _deterministic_navs(annual_rate_pct: float, periods: int, base_price: float = 10.0) -> np.ndarray:
+    """
+    NAV series of an asset compounding monthly at a fixed annual rate,
+    starting at `base_price` and rounded to paise at every step. Cached, as
+    the same rate is simulated over the same dates by every request.
+    """
+    monthly_rate = (1 + annual_rate_pct / 100) ** (1/12) - 1
+
+    navs = [base_price]
+    for _ in range(1, periods):
+        navs.append(round(navs[-1] * (1 + monthly_rate), 2))
+
+    series = np.array(navs[:periods], dtype=np.float64)
+    series.setflags(write=False)
+    return series
@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from config import PORTFOLIO_MODEL_CACHE_SIZE
+from core.analytic_preview import preview_path_factors
+from utils.lru_cache import LRUCache
+
+
+class PortfolioModel:
+    """
+    Immutable, precomputed statistics of one set of assets, shared by every
+    portfolio over those assets (whatever their weights):
+
+      - `dates` and `navs`: the date-aligned NAV history (dates x assets)
+      - `log_returns`: monthly log-returns of `navs`
+      - `bootstrap_returns`: the log-returns resampled by the block-bootstrap
+        engine, with deterministic assets held at their mean return
+      - `mu`, `cov`: drift vector and covariance of the log-returns, with
+        deterministic assets given zero volatility
+      - `chol`: Cholesky factor of `cov`, with a small diagonal jitter added
+        once if the covariance is not positive definite
+
+    All arrays are read-only. Analytic preview nodes are derived on demand
+    and memoized per horizon (`preview_factors`).
+    """
+
+    JITTER = 1e-8
+
+    def __init__(self, names: tuple[str, ...], dates: np.ndarray, navs: np.ndarray, deterministic: tuple[bool, ...]):
+        self.names = names
+        self.dates = dates
+        self.navs = navs
+
+        self.log_returns = np.diff(np.log(navs), axis=0)
+        self.mu = self.log_returns.mean(axis=0)
+        cov = np.atleast_2d(np.cov(self.log_returns, rowvar=False))
+        self.bootstrap_returns = self.log_returns.copy()
+
+        # Deterministic assets compound at a fixed rate: no volatility
+        for idx, is_deterministic in enumerate(deterministic):
+            if is_deterministic:
+                cov[idx, :] = 0.0
+                cov[:, idx] = 0.0
+                # NAVs rounded to paise would otherwise add noise to a fixed rate
+                self.bootstrap_returns[:, idx] = self.mu[idx]
+
+        try:
+            chol = np.linalg.cholesky(cov)
+        except np.linalg.LinAlgError:
+            cov = cov + np.eye(cov.shape[0]) * self.JITTER
+            chol = np.linalg.cholesky(cov)
+        self.cov = cov
+        self.chol = chol
+
+        for array in (self.dates, self.navs, self.log_returns, self.bootstrap_returns, self.mu, self.cov, self.chol):
+            array.setflags(write=False)
+        self._preview: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        self._preview_lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, nav_df: pd.DataFrame, deterministic: tuple[bool, ...]) -> "PortfolioModel":
+        """
+        Builds the model from an aligned NAV frame (Date index, one column per asset).
+        """
+        return cls(
+            names=tuple(nav_df.columns),
+            dates=nav_df.index.to_numpy(dtype='datetime64[ns]'),
+            navs=nav_df.to_numpy(dtype=np.float64, copy=True),
+            deterministic=deterministic
+        )
+
+    def composite_nav(self, weights: np.ndarray) -> np.ndarray:
+        """
+        Weighted NAV of the portfolio at every date, `navs @ weights`.
+        """
+        return self.navs @ weights
+
+    def preview_factors(self, num_months: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Per-asset (lumpsum, SIP) growth factors at the analytic preview's
+        nodes over `num_months` (see `core.analytic_preview`), computed once
+        per horizon. Read-only.
+        """
+        with self._preview_lock:
+            if num_months not in self._preview:
+                factors = preview_path_factors(self.mu, self.chol, num_months)
+                for array in factors:
+                    array.setflags(write=False)
+                self._preview[num_months] = factors
+            return self._preview[num_months]
+
+
+_model_cache: LRUCache | None = None
+_model_cache_lock = threading.Lock()
+
+
+def get_portfolio_model_cache() -> LRUCache:
+    """
+    Returns the process-wide LRU cache of compiled portfolio models.
+    """
+    global _model_cache
+    if _model_cache is None:
+        with _model_cache_lock:
+            if _model_cache is None:
+                _model_cache = LRUCache(PORTFOLIO_MODEL_CACHE_SIZE)
+    return _model_cache
@@ -1,12 +1,42 @@
+"""
+Rolling-returns visualization.
+
+`build_plotly_fig` defines the chart (histogram with mode and median, and the
+rolling-return trend). Pages are not rendered from it per request: the
+figure's trace styles and layout are generated once into a static script
+(`returns-chart.js`), served with plotly.js itself from `/static/` under
+versioned URLs. A page is then a fixed HTML template with only the data
+arrays and the histogram, mode and median values injected as JSON
+(`generate_returns_html`), so it costs a histogram and a `json.dumps`.
+
+plotly itself (about a second to import) is only imported when the chart
+script is first built.
+"""
+
+import gzip
+import hashlib
 import json
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+import os
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 
-app = FastAPI()
+from config import PLOTLY_JS_PATH
+
+# Trace order of `build_plotly_fig`, relied on by the chart script
+_HISTOGRAM, _MODE, _MEDIAN, _TREND = range(4)
+
+
+def _histogram_stats(rr: np.ndarray, bins: int) -> tuple[np.ndarray, np.ndarray, float, float]:
+    """
+    Histogram counts and edges of the rolling returns, with the mode (centre
+    of the fullest bin) and the median.
+    """
+    counts, edges = np.histogram(rr, bins=bins)
+    mode_idx = np.argmax(counts)
+    return counts, edges, float((edges[mode_idx] + edges[mode_idx + 1]) / 2), float(np.median(rr))
+
 
 def build_plotly_fig(rolling_returns, dates=None, bins=20, kde_bw=0.7):
     """
@@ -15,12 +45,12 @@ def build_plotly_fig(rolling_returns, dates=None, bins=20, kde_bw=0.7):
       • Right: Trendline (Mon DD labels or index)
       • Responsive layout settings
     """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     rr = np.asarray(rolling_returns)
     # compute mode & median
-    counts, edges = np.histogram(rr, bins=bins)
-    mode_idx   = np.argmax(counts)
-    mode_val   = (edges[mode_idx] + edges[mode_idx+1]) / 2
-    median_val = np.median(rr)
+    counts, edges, mode_val, median_val = _histogram_stats(rr, bins)
 
     # x‑axis values
     if dates is not None:
@@ -117,9 +147,104 @@ def build_plotly_fig(rolling_returns, dates=None, bins=20, kde_bw=0.7):
     return fig
 
 
-def generate_returns_html(rolling_returns, dates=None):
-    if not rolling_returns:
-        return """
+def returns_chart_data(rolling_returns, dates=None, bins=20) -> dict:
+    """
+    The per-page values of `build_plotly_fig`: data arrays, histogram bins,
+    mode and median, as injected into the page template. Returns are sent
+    with 4 decimals (of a percent); the statistics use full precision.
+    """
+    rr = np.asarray(rolling_returns, dtype=np.float64)
+    counts, edges, mode_val, median_val = _histogram_stats(rr, bins)
+    return {
+        'returns': np.round(rr, 4).tolist(),
+        'x': list(dates) if dates is not None else list(range(len(rr))),
+        'x_title': "Date" if dates is not None else "Index",
+        'bins': {'start': float(edges[0]), 'end': float(edges[-1]), 'size': float(edges[1] - edges[0])},
+        'mode': mode_val,
+        'median': median_val,
+        'max_count': int(counts.max()),
+    }
+
+
+class StaticAsset:
+    """
+    A file served at `/static/<name>`: its bytes, a gzip copy and an ETag.
+    """
+
+    def __init__(self, content: bytes, media_type: str):
+        self.content = content
+        self.media_type = media_type
+        self.etag = f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+        self.gzipped = gzip.compress(content, compresslevel=6, mtime=0)
+
+
+@lru_cache(maxsize=1)
+def chart_script() -> str:
+    """
+    `returns-chart.js`: the traces and layout of `build_plotly_fig` without
+    their data, and `renderReturnsChart(element, data)` filling them in
+    from `returns_chart_data`.
+    """
+    import plotly.io as pio
+
+    figure = json.loads(pio.to_json(build_plotly_fig([0.0, 1.0], dates=['2000-01-01', '2000-02-01'])))
+    for trace in figure['data']:
+        for key in ('x', 'y', 'xbins'):
+            trace.pop(key, None)
+    return f"""(function () {{
+  var FIGURE = {json.dumps(figure, separators=(',', ':'))};
+  window.renderReturnsChart = function (element, d) {{
+    var figure = JSON.parse(JSON.stringify(FIGURE)), traces = figure.data;
+    traces[{_HISTOGRAM}].x = d.returns;
+    traces[{_HISTOGRAM}].xbins = d.bins;
+    traces[{_MODE}].x = [d.mode, d.mode];
+    traces[{_MODE}].y = [0, d.max_count];
+    traces[{_MEDIAN}].x = [d.median, d.median];
+    traces[{_MEDIAN}].y = [0, d.max_count];
+    traces[{_TREND}].x = d.x;
+    traces[{_TREND}].y = d.returns;
+    figure.layout.xaxis.title.text = d.x_title;
+    Plotly.newPlot(element, traces, figure.layout, {{responsive: true}});
+  }};
+}})();
+"""
+
+
+def _plotly_js_path() -> str:
+    if PLOTLY_JS_PATH is not None:
+        return PLOTLY_JS_PATH
+    import plotly
+    return os.path.join(os.path.dirname(plotly.__file__), 'package_data', 'plotly.min.js')
+
+
+@lru_cache(maxsize=None)
+def static_asset(name: str) -> StaticAsset | None:
+    """
+    Returns the static asset `name` ('plotly.min.js' or 'returns-chart.js'),
+    loaded once per process, or None for unknown names.
+    """
+    if name == 'plotly.min.js':
+        with open(_plotly_js_path(), 'rb') as f:
+            return StaticAsset(f.read(), 'text/javascript')
+    if name == 'returns-chart.js':
+        return StaticAsset(chart_script().encode(), 'text/javascript')
+    return None
+
+
+@lru_cache(maxsize=None)
+def asset_version(name: str) -> str:
+    """
+    Cheap version tag of a static asset, used in its URL so that browsers
+    may cache it indefinitely: file size and mtime for plotly.js, the
+    content hash for the chart script.
+    """
+    if name == 'plotly.min.js':
+        stat = os.stat(_plotly_js_path())
+        return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+    return static_asset(name).etag.strip('"')[:16]
+
+
+_EMPTY_PAGE = """
         <div style="display:flex;justify-content:center;align-items:center;height:100%">
             <p style="color:#666;text-align:center">
                 No rolling returns data available.<br>
@@ -128,47 +253,45 @@ def generate_returns_html(rolling_returns, dates=None):
         </div>
         """
 
-    fig = build_plotly_fig(rolling_returns, dates)
-
-    # Grab exactly the same snippet you used before
-    snippet = fig.to_html(include_plotlyjs="cdn", full_html=False)
-
-    # Inject it into the wrapper above
-    html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-            <style>
-            html, body {{
-                margin: 0;
-                padding: 0;
-                width: 100%;
-                height: 100%;
-                overflow: hidden;
-            }}
-            #graph {{
-                position: relative;
-                width: 100%;
-                height: 100%;
-                display: block;
-            }}
-            #graph .plotly-graph-div,
-            #graph .js-plotly-plot {{
-                position: absolute !important;
-                top: 0 !important;
-                left: 0 !important;
-                width: 100% !important;
-                height: 100% !important;
-            }}
-            </style>
-        </head>
-        <body>
-            <div id="graph">
-            {snippet}
-            </div>
-        </body>
-        </html>
-    """
-    return html
+# Split once around the data; a page is head + JSON + tail
+_PAGE_HEAD, _PAGE_TAIL = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="{asset_url}plotly.min.js?v={plotly_version}"></script>
+<script src="{asset_url}returns-chart.js?v={chart_version}"></script>
+<style>
+html, body {{ margin: 0; padding: 0; width: 100%; height: 100%; overflow: hidden; }}
+#graph {{ position: relative; width: 100%; height: 100%; display: block; }}
+#graph .plotly-graph-div {{ position: absolute; top: 0; left: 0; width: 100%; height: 100%; }}
+</style>
+</head>
+<body>
+<div id="graph"><div id="chart" class="plotly-graph-div"></div></div>
+<script>renderReturnsChart(document.getElementById("chart"), @DATA@);</script>
+</body>
+</html>
+""".split('@DATA@')
+
+
+@lru_cache(maxsize=16)
+def _page_head(asset_url: str) -> str:
+    return _PAGE_HEAD.format(
+        asset_url=asset_url,
+        plotly_version=asset_version('plotly.min.js'),
+        chart_version=asset_version('returns-chart.js')
+    )
+
+
+def generate_returns_html(rolling_returns, dates=None, asset_url: str = '/static/'):
+    """
+    Renders the rolling-returns page from the prebuilt template.
+
+    :param asset_url: URL prefix under which `static_asset`s are served.
+    """
+    if not rolling_returns:
+        return _EMPTY_PAGE
+
+    # '</' must not close the script element the data sits in
+    data = json.dumps(returns_chart_data(rolling_returns, dates), separators=(',', ':')).replace('</', '<\\/')
+    return _page_head(asset_url) + data + _PAGE_TAIL
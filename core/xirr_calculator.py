@@ -1,12 +1,10 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import pyxirr
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Literal
-from colorama import Fore
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import Counter
 
 from core.exceptions import (
     HistoricalDataTooLowError,
@@ -15,6 +13,15 @@ from core.exceptions import (
     InvalidReturnCalculationModeError
 )
 
+XIRR_TOLERANCE_PCT = 1e-6
+"""float: Maximum deviation (percentage points) of batched XIRRs from pyxirr."""
+
+RETURN_CALCULATION_MODES = ("median", "mean", "pessimistic", "optimistic")
+"""tuple[str]: Supported statistics over the rolling XIRR series."""
+
+_XIRR_SOLVER_TOL = 1e-12
+"""float: Convergence threshold on ln(1 + r) for the batched solver."""
+
 
 class XirrCalculator:
     """
@@ -30,84 +37,168 @@ class XirrCalculator:
         df: pd.DataFrame,
         time_horizon: int,
         sip_amount: float = 1000
-    ) -> List[float]:
+    ) -> tuple[List[float], List]:
         """
         Compute XIRRs for all rolling SIP windows of specified time_horizon.
 
+        Every window is solved at once: the cash-flow schedule of all windows
+        is laid out as a (windows x months) matrix and a single batched
+        safeguarded Newton/bisection iteration finds every IRR together.
+        Results agree with `pyxirr.xirr` (Actual/365) to within
+        `XIRR_TOLERANCE_PCT` percentage points; any window that fails to
+        converge is handed to pyxirr instead.
+
         Args:
             df: DataFrame containing ['Date', 'NAV_INR'] columns.
             time_horizon: Duration in years for each SIP window.
             sip_amount: Monthly SIP amount in INR.
 
         Returns:
-            List of XIRR values (annualized returns in %).
+            Tuple of (XIRR values in %, end date of each window).
         """
         months = time_horizon * 12
-        xirrs: List[float] = []
-        end_dates: List = []
+        num_windows = len(df) - months
+        if num_windows <= 0:
+            return [], []
+
+        navs = df['NAV_INR'].to_numpy(dtype=np.float64)
+        days = df['Date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+        if not np.all(np.isfinite(navs)) or np.any(navs <= 0):
+            raise XirrComputationFailedError(
+                "NAV series contains non-positive or missing values."
+            )
+
+        # Maturity value per unit of SIP: sum over the window of end_price / buy_price
+        inv_cumsum = np.concatenate(([0.0], np.cumsum(1.0 / navs)))
+        starts = np.arange(num_windows)
+        units_per_rupee = inv_cumsum[starts + months] - inv_cumsum[starts]
+        maturity_ratio = units_per_rupee * navs[months:months + num_windows]
 
-        for start in range(len(df) - months):
-            window = df.iloc[start : start + months + 1]
-            if len(window) < months + 1:
-                continue
+        # Years from each investment date to its window's redemption date
+        day_windows = sliding_window_view(days, months + 1)[:num_windows]
+        years_to_end = (day_windows[:, -1:] - day_windows[:, :-1]) / 365.0
 
-            # SIP investments
-            dates = list(window['Date'][:months])
-            amounts = [-sip_amount] * months
+        log_rates = self._solve_log_rates(maturity_ratio, years_to_end)
 
-            # Units purchased each month
-            start_prices = window['NAV_INR'].iloc[:months].values
-            end_price = window['NAV_INR'].iloc[months]
-            units = [sip_amount / p for p in start_prices]
+        xirrs = np.expm1(log_rates) * 100
+        end_dates = list(df['Date'].iloc[months:months + num_windows])
 
-            total_units = sum(units)
-            maturity_value = total_units * end_price
+        failed = np.flatnonzero(~np.isfinite(xirrs))
+        for idx in failed:
+            xirrs[idx] = self._pyxirr_window(df, idx, months, sip_amount)
 
-            # Add final redemption
-            dates.append(window['Date'].iloc[months])
-            amounts.append(maturity_value)
+        return xirrs.tolist(), end_dates
 
-            try:
-                xirr_val = pyxirr.xirr(dict(zip(dates, amounts))) * 100
-                xirrs.append(xirr_val)
-                end_dates.append(window['Date'].iloc[months])
-            except Exception as e:
-                raise XirrComputationFailedError(e)
+    @staticmethod
+    def _solve_log_rates(
+        maturity_ratio: np.ndarray,
+        years_to_end: np.ndarray,
+        max_iter: int = 100
+    ) -> np.ndarray:
+        """
+        Batched root solve of the SIP XIRR equation in x = ln(1 + r).
 
-        return xirrs, end_dates
+        Multiplying the NPV by (1 + r)^T turns it into
+            g(x) = maturity_ratio - sum_j exp(x * years_to_end_j),
+        which is strictly decreasing and concave, so every window has a
+        unique root. Newton steps are taken where they stay inside the
+        current bracket, bisection otherwise.
 
-    def compute_rolling_xirr(
+        :param maturity_ratio: Shape (W,) maturity value / SIP amount per window.
+        :param years_to_end: Shape (W, months) year fractions to redemption.
+        :return: Shape (W,) log growth rates; NaN where no root was found.
+        """
+        lo = np.full(maturity_ratio.shape, -10.0)
+        hi = np.full(maturity_ratio.shape, 10.0)
+        x = np.zeros(maturity_ratio.shape)
+        converged = np.zeros(maturity_ratio.shape, dtype=bool)
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            for _ in range(max_iter):
+                growth = np.exp(x[:, None] * years_to_end)
+                g = maturity_ratio - growth.sum(axis=1)
+                dg = -(growth * years_to_end).sum(axis=1)
+
+                # Tighten brackets: g > 0 means the root lies to the right
+                lo = np.where(g > 0, x, lo)
+                hi = np.where(g > 0, hi, x)
+
+                step = g / dg
+                newton = x - step
+                inside = np.isfinite(newton) & (newton >= lo) & (newton <= hi)
+                x_new = np.where(inside, newton, 0.5 * (lo + hi))
+
+                converged = np.abs(x_new - x) < _XIRR_SOLVER_TOL
+                x = x_new
+                if converged.all():
+                    break
+
+        return np.where(converged, x, np.nan)
+
+    @staticmethod
+    def _pyxirr_window(df: pd.DataFrame, start: int, months: int, sip_amount: float) -> float:
+        """
+        Solves a single rolling window with pyxirr. Used as a fallback for
+        windows the batched solver could not converge on.
+        """
+        window = df.iloc[start : start + months + 1]
+        dates = list(window['Date'])
+        units = (sip_amount / window['NAV_INR'].iloc[:months]).sum()
+        amounts = [-sip_amount] * months + [units * window['NAV_INR'].iloc[months]]
+        try:
+            return pyxirr.xirr(dates, amounts) * 100
+        except Exception as e:
+            raise XirrComputationFailedError(e)
+
+    @staticmethod
+    def summarize_xirrs(xirrs: List[float]) -> dict[str, float]:
+        """
+        Computes every supported return statistic over a series of XIRRs in
+        one pass.
+
+        Returns:
+            Dict mapping each mode in RETURN_CALCULATION_MODES to its value
+            (% annualized, rounded to 2 decimals).
+        """
+        arr = np.asarray(xirrs, dtype=np.float64)
+        p25, p50, p75 = np.percentile(arr, [25, 50, 75])
+        return {
+            "median": round(float(p50), 2),
+            "mean": round(float(arr.mean()), 2),
+            "pessimistic": round(float(p25), 2),
+            "optimistic": round(float(p75), 2),
+        }
+
+    def compute_rolling_xirr_stats(
         self,
         time_horizon: int,
         feather_path: str | None = None,
-        df: pd.DataFrame | None = None,
-        mode: Literal["mean", "median", "optimistic", "pessimistic"] = "median"
-    ) -> tuple[float, list, list]:
+        df: pd.DataFrame | None = None
+    ) -> tuple[dict[str, float], list, list]:
         """
-        Estimate return using rolling SIP XIRR approach over historical data.
+        Computes the rolling SIP XIRR series once and summarizes it with every
+        supported statistic.
 
         Args:
             time_horizon: Duration (in years) for each SIP window.
             feather_path: Optional path to Feather file with NAV data.
             df: Optional pre-loaded DataFrame with ['Date', 'NAV_INR'].
-            mode: Statistic to compute from XIRR values ('median', 'mean', 'pessimistic', 'optimistic').
 
         Returns:
-            Annualized return (% CAGR) as float.
+            Tuple of (statistics by mode, XIRR values, window end dates).
 
         Raises:
             NeitherDataNorPathProvidedError: If both df and feather_path are missing.
             HistoricalDataTooLowError: If data is insufficient for computation.
-            InvalidReturnCalculationModeError: If mode is not recognized.
-            XirrComputationFailedError: If pyxirr fails to compute any return.
+            XirrComputationFailedError: If any window's XIRR cannot be computed.
         """
         if df is None:
             if feather_path is None:
                 raise NeitherDataNorPathProvidedError()
             df = pd.read_feather(feather_path)
 
-        # Ensure sorted and clean data
-        df['Date'] = pd.to_datetime(df['Date'])
+        # Ensure sorted and clean data (without mutating the caller's frame)
+        df = df.assign(Date=pd.to_datetime(df['Date']))
         df = df.sort_values('Date').reset_index(drop=True)
 
         # Compute rolling XIRRs
@@ -115,18 +206,35 @@ class XirrCalculator:
         if not xirrs:
             raise HistoricalDataTooLowError('', '', '')
 
+        return self.summarize_xirrs(xirrs), xirrs, end_dates
 
-        # Return appropriate statistic
-        series = pd.Series(xirrs)
-        if mode == "median":
-            return round(series.median(), 2), xirrs, end_dates
-        elif mode == "mean":
-            return round(series.mean(), 2), xirrs, end_dates
-        elif mode == "pessimistic":
-            return round(series.quantile(0.25), 2), xirrs, end_dates
-        elif mode == "optimistic":
-            return round(series.quantile(0.75), 2), xirrs, end_dates
-        else:
-            raise InvalidReturnCalculationModeError(
-                mode, ("median", "mean", "pessimistic", "optimistic")
-            )
+    def compute_rolling_xirr(
+        self,
+        time_horizon: int,
+        feather_path: str | None = None,
+        df: pd.DataFrame | None = None,
+        mode: Literal["mean", "median", "optimistic", "pessimistic"] = "median"
+    ) -> tuple[float, list, list]:
+        """
+        Estimate return using rolling SIP XIRR approach over historical data.
+
+        Args:
+            time_horizon: Duration (in years) for each SIP window.
+            feather_path: Optional path to Feather file with NAV data.
+            df: Optional pre-loaded DataFrame with ['Date', 'NAV_INR'].
+            mode: Statistic to compute from XIRR values ('median', 'mean', 'pessimistic', 'optimistic').
+
+        Returns:
+            Tuple of (annualized return as % CAGR, XIRR values, window end dates).
+
+        Raises:
+            NeitherDataNorPathProvidedError: If both df and feather_path are missing.
+            HistoricalDataTooLowError: If data is insufficient for computation.
+            InvalidReturnCalculationModeError: If mode is not recognized.
+            XirrComputationFailedError: If any window's XIRR cannot be computed.
+        """
+        if mode not in RETURN_CALCULATION_MODES:
+            raise InvalidReturnCalculationModeError(mode, RETURN_CALCULATION_MODES)
+
+        stats, xirrs, end_dates = self.compute_rolling_xirr_stats(time_horizon, feather_path, df)
+        return stats[mode], xirrs, end_dates
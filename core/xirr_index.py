@@ -0,0 +1,208 @@
+"""
+Persistent index of precomputed rolling SIP XIRRs.
+
+For every asset in `ASSET_NAV_DATA_PATH` and every horizon from 1 year up to
+the length of its history, the index stores the rolling-window XIRR series
+and its summary statistics (median, mean, pessimistic/p25, optimistic/p75),
+one `.npz` file per asset under `XIRR_INDEX_DIR`.
+
+Entries are tagged with the dataset store's version of the asset's INR
+series, so a stale index is never used. When new months are appended to a
+NAV file, `update` only solves the windows ending in the new months.
+
+Usage
+-----
+    python -m core.xirr_index build            # incremental where possible
+    python -m core.xirr_index build --full     # rebuild from scratch
+    python -m core.xirr_index build --asset gold --asset largecap
+"""
+
+import argparse
+import json
+import os
+import threading
+
+import numpy as np
+
+from config import ASSET_NAV_DATA_PATH, XIRR_INDEX_DIR
+from core.dataset_store import DatasetStore, get_dataset_store
+from core.xirr_calculator import RETURN_CALCULATION_MODES, XirrCalculator
+from utils.logger import get_logger
+
+
+class XirrIndex:
+    """
+    Reads and maintains the on-disk rolling-XIRR index.
+    """
+
+    def __init__(self, index_dir: str | None = None, store: DatasetStore | None = None):
+        self.index_dir = index_dir if index_dir is not None else XIRR_INDEX_DIR
+        self.store = store if store is not None else get_dataset_store()
+
+    def path_for(self, asset_name: str) -> str:
+        return os.path.join(self.index_dir, f"{asset_name}.npz")
+
+    # ---------------- Reading ----------------
+
+    @staticmethod
+    def _load(path: str) -> dict:
+        """
+        Parses an index file into
+        {'version', 'dates', 'navs', 'series': {h: xirrs}, 'stats': {h: {mode: value}}}.
+        """
+        with np.load(path) as data:
+            horizons = [int(h) for h in data['horizons']]
+            stats_matrix = data['stats']
+            return {
+                'version': str(data['version']),
+                'dates': data['dates'],
+                'navs': data['navs'],
+                'series': {h: data[f'xirr_{h}'] for h in horizons},
+                'stats': {
+                    h: dict(zip(RETURN_CALCULATION_MODES, map(float, stats_matrix[i])))
+                    for i, h in enumerate(horizons)
+                },
+            }
+
+    def _read(self, asset_name: str) -> dict | None:
+        path = self.path_for(asset_name)
+        if not os.path.exists(path):
+            return None
+        return self.store.get_cached(path, self._load)
+
+    def lookup(self, asset_name: str, feather_path: str, time_horizon: int) -> dict[str, float] | None:
+        """
+        Returns the precomputed statistics for `asset_name` at `time_horizon`
+        years, or None if the index is missing, stale or lacks the horizon.
+
+        :return: Dict mapping each mode in RETURN_CALCULATION_MODES to its value (%).
+        """
+        entry = self._read(asset_name)
+        if entry is None:
+            return None
+        if entry['version'] != self.store.get_inr_nav_version(feather_path):
+            return None
+        return entry['stats'].get(time_horizon)
+
+    # ---------------- Building ----------------
+
+    def update(self, asset_name: str, feather_path: str, full: bool = False) -> str:
+        """
+        Brings the index of one asset up to date with its NAV file.
+
+        If the stored series is a prefix of the current history, only windows
+        ending in the newly added months are computed; otherwise (or with
+        `full=True`) every horizon is recomputed.
+
+        :return: 'unchanged', 'incremental' or 'rebuilt'.
+        """
+        df = self.store.get_inr_nav(feather_path)
+        version = self.store.get_inr_nav_version(feather_path)
+        dates = df['Date'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        navs = df['NAV_INR'].to_numpy(dtype=np.float64)
+
+        old = None if full else self._read(asset_name)
+        if old is not None and old['version'] == version:
+            return 'unchanged'
+
+        known = 0
+        if old is not None:
+            k = len(old['dates'])
+            if k <= len(dates) and np.array_equal(old['dates'], dates[:k]) and np.array_equal(old['navs'], navs[:k]):
+                known = k
+
+        calc = XirrCalculator()
+        series: dict[int, np.ndarray] = {}
+        stats: dict[int, dict[str, float]] = {}
+        for h in range(1, (len(df) - 1) // 12 + 1):
+            months = h * 12
+            if known and h in old['series']:
+                if known < len(df):
+                    _, new_xirrs, _ = calc.compute_rolling_xirr_stats(h, df=df.iloc[known - months:])
+                    series[h] = np.concatenate([old['series'][h], new_xirrs])
+                else:
+                    series[h] = old['series'][h]
+                stats[h] = calc.summarize_xirrs(series[h])
+            else:
+                stats[h], xirrs, _ = calc.compute_rolling_xirr_stats(h, df=df)
+                series[h] = np.asarray(xirrs)
+
+        self._write(asset_name, version, dates, navs, series, stats)
+        return 'incremental' if known else 'rebuilt'
+
+    def _write(self, asset_name, version, dates, navs, series, stats) -> None:
+        """
+        Atomically writes one asset's index file.
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        horizons = sorted(series)
+        arrays = {f'xirr_{h}': series[h] for h in horizons}
+        arrays['stats'] = np.array(
+            [[stats[h][m] for m in RETURN_CALCULATION_MODES] for h in horizons], dtype=np.float64
+        ).reshape(len(horizons), len(RETURN_CALCULATION_MODES))
+
+        path = self.path_for(asset_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                version=np.array(version),
+                dates=dates,
+                navs=navs,
+                horizons=np.array(horizons, dtype=np.int64),
+                **arrays
+            )
+        os.replace(tmp_path, path)
+
+    def build(self, nav_paths: dict[str, str] | None = None, full: bool = False) -> dict[str, str]:
+        """
+        Updates the index for every asset in `nav_paths` (default: all
+        configured assets).
+
+        :return: Dict mapping asset name to the update outcome.
+        """
+        nav_paths = nav_paths if nav_paths is not None else ASSET_NAV_DATA_PATH
+        return {
+            name: self.update(name, path, full=full)
+            for name, path in nav_paths.items()
+        }
+
+
+_index: XirrIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_xirr_index() -> XirrIndex:
+    """
+    Returns the process-wide XirrIndex, creating it on first use.
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = XirrIndex()
+    return _index
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or update the rolling-XIRR index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build the index, incrementally where possible.")
+    build.add_argument("--full", action="store_true", help="Recompute every horizon from scratch.")
+    build.add_argument("--asset", action="append", dest="assets", help="Asset name (repeatable).")
+    args = parser.parse_args(argv)
+
+    logger = get_logger()
+    nav_paths = ASSET_NAV_DATA_PATH
+    if args.assets:
+        unknown = set(args.assets) - set(nav_paths)
+        if unknown:
+            parser.error(f"Unknown assets: {sorted(unknown)}")
+        nav_paths = {name: nav_paths[name] for name in args.assets}
+
+    results = get_xirr_index().build(nav_paths, full=args.full)
+    logger.info(f"Rolling-XIRR index updated: {json.dumps(results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,157 @@
 # main.py
 
+import asyncio
+import hashlib
+import json
 import time as tm
-import tracemalloc
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+import uuid
 
-from core.goal_engine import run_analysis
-from core.sip_plotter import generate_returns_html
-from core.exceptions import DataFileNotFoundError, InvalidAllocationWeightsError
+# Cold start is measured from here, before the heavy imports
+_IMPORT_START = tm.perf_counter()
+
+from contextlib import asynccontextmanager
+from typing import Callable, List
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
+
+from core.dataset_store import get_dataset_store
+from config import (
+    COLD_START_BUDGET_SECONDS, MAX_BATCH_SIZE, RESULT_CACHE_ENABLED, SERIES_MAX_POINTS, VISUALIZATION_CACHE_SIZE
+)
+from core.goal_engine import run_analysis, run_batch_analysis
+from core.sip_plotter import asset_version, generate_returns_html, static_asset
+from core.exceptions import DataFileNotFoundError, InvalidAllocationWeightsError, ServerOverloadedError
 from models.goal_request import GoalRequest
 from models.portfolio_summary import PortfolioSummary
-from utils.logger import get_logger
+from utils.logger import current_request_id, get_logger, reset_request_id, set_request_id
+from utils.lru_cache import LRUCache
+from utils.metrics import (
+    PEAK_MEMORY,
+    REQUEST_LATENCY,
+    REQUESTS_TOTAL,
+    STAGE_LATENCY,
+    collect_timings,
+    render_metrics,
+    server_timing,
+    should_trace_memory,
+)
+from utils.result_cache import ResultCache, request_key
+from utils.series import decode_series, shape_series
+from utils.worker_pool import WorkerPool
+
+# CPU-bound work runs here, never on the event loop
+worker_pool = WorkerPool()
+
+# Results shared by every server process
+result_cache = ResultCache()
+
+# Rendered visualization pages by content hash (per process)
+visualization_cache = LRUCache(VISUALIZATION_CACHE_SIZE)
+
+# Seconds from import to warm, once warm-up has completed
+ready_after: float | None = None
+
+async def warm_up_server() -> None:
+    """
+    Loads every NAV and forex dataset into the shared in-memory store, so
+    requests never parse Feather files, builds the static visualization
+    assets and warms every worker, all off the event loop. Then records the
+    cold-start time and marks the server ready.
+    """
+    global ready_after
+    logger = get_logger()
+    try:
+        start = tm.time()
+        await asyncio.to_thread(get_dataset_store().preload)
+        logger.info(f"Datasets preloaded in {tm.time() - start : 0.3f} s.")
+        start = tm.time()
+        await asyncio.to_thread(lambda: [static_asset(name) for name in ('plotly.min.js', 'returns-chart.js')])
+        logger.info(f"Static assets built in {tm.time() - start : 0.3f} s.")
+        start = tm.time()
+        await worker_pool.warm()
+        logger.info(f"Workers warmed in {tm.time() - start : 0.3f} s.")
+    except Exception:
+        logger.exception("Server warm-up failed; not ready.")
+        return
+
+    ready_after = tm.perf_counter() - _IMPORT_START
+    if ready_after > COLD_START_BUDGET_SECONDS:
+        logger.warning(f"Ready after {ready_after : 0.3f} s, over the cold-start budget of {COLD_START_BUDGET_SECONDS} s.")
+    else:
+        logger.info(f"Ready after {ready_after : 0.3f} s (cold-start budget {COLD_START_BUDGET_SECONDS} s).")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts the worker pool and warms the server in the background
+    (`warm_up_server`). Requests are accepted meanwhile; `/ready` only
+    reports success once warm-up is done.
+    """
+    worker_pool.start()
+    warm_up = asyncio.create_task(warm_up_server())
+    yield
+    warm_up.cancel()
+    worker_pool.shutdown()
+    result_cache.close()
 
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Tags the request with an ID (the client's `X-Request-ID`, or a new one)
+    for its log records, records latency and status per endpoint, and
+    appends the total time to the `Server-Timing` header.
+    """
+    request_id = request.headers.get('x-request-id', '')[:64] or uuid.uuid4().hex[:16]
+    token = set_request_id(request_id)
+    start = tm.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        reset_request_id(token)
+    elapsed = tm.perf_counter() - start
+
+    route = request.scope.get('route')
+    endpoint = route.path if route is not None else 'unmatched'
+    REQUEST_LATENCY.observe(endpoint, elapsed)
+    REQUESTS_TOTAL.inc(endpoint, str(response.status_code))
+
+    total = server_timing({'total': elapsed})
+    stages = response.headers.get('Server-Timing')
+    response.headers['Server-Timing'] = f"{stages}, {total}" if stages else total
+    response.headers['X-Request-ID'] = request_id
+    return response
+
+async def run_instrumented(endpoint: str, response: Response, fn: Callable, *args, **kwargs):
+    """
+    Runs `fn` on the worker pool, recording its per-stage timings (and, for a
+    sampled fraction of calls, its peak memory), logging them and exposing
+    them in the `Server-Timing` header of `response`. Records logged by `fn`
+    carry the current request ID.
+    """
+    result, timings, peak = await worker_pool.run(
+        collect_timings, fn, *args, trace_memory=should_trace_memory(), request_id=current_request_id(), **kwargs
+    )
+    for stage, seconds in timings.items():
+        STAGE_LATENCY.observe(stage, seconds)
+    if timings:
+        get_logger().info(f"Stage timings: {server_timing(timings)}", extra={'stages': timings})
+    if peak is not None:
+        PEAK_MEMORY.observe(endpoint, peak)
+        get_logger().info(f"Peak memory usage: {peak / 10**6:.3f} MB")
+    if timings:
+        response.headers['Server-Timing'] = server_timing(timings)
+    return result
+
+def shape_response(req: GoalRequest, summary: PortfolioSummary) -> PortfolioSummary:
+    """
+    Downsamples and/or packs the time series of `summary` as `req` asks.
+    Results are cached in full, so every shape is served from one entry.
+    """
+    points = req.series_points if req.series_points is not None else SERIES_MAX_POINTS
+    return shape_series(summary, points, req.series_step, req.series_encoding)
 
 @app.post(
     "/calculate-goal",
@@ -23,9 +161,11 @@ app = FastAPI()
         This endpoint computes a goal-based SIP strategy based on user inputs such as goal amount,
         time horizon, lumpsum, and risk profile. It returns the monthly SIP needed, asset allocation,
         expected growth, and other insights including XIRR and goal probability.
+        Set `series_points` / `series_step` to downsample the time series, and
+        `series_encoding="compact"` to receive them as base64-packed arrays.
     """
 )
-async def calculate_goal(req: GoalRequest) -> JSONResponse:
+async def calculate_goal(req: GoalRequest, response: Response) -> JSONResponse:
     """
     Endpoint to calculate SIP goal based on user input.
     Logs performance metrics and handles expected/unexpected exceptions.
@@ -34,26 +174,40 @@ async def calculate_goal(req: GoalRequest) -> JSONResponse:
     logger.info('------- New Goal Calculation Request Received -------')
     try:
         start = tm.time()
-        tracemalloc.start()
+        # Previews are cheaper to recompute than to look up
+        key = request_key(req) if RESULT_CACHE_ENABLED and not req.preview else None
+        cached = await asyncio.to_thread(result_cache.get, key) if key else None
+        if cached is not None:
+            logger.info(f"Served from result cache in {tm.time() - start : 0.3f} s.")
+            logger.info('------------------------------------------')
+            return shape_response(req, cached)
 
-        result = run_analysis(
+        result = await run_instrumented(
+            "/calculate-goal",
+            response,
+            run_analysis,
             goal_amount=req.goal_amount,
             time_horizon=req.time_horizon,
             lumpsum=req.lumpsum_amount,
             risk_profile=req.risk_profile,
-            allocation=req.asset_allocation
+            allocation=req.asset_allocation,
+            engine=req.simulation_engine,
+            preview=req.preview
         )
 
-        _, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
+        if key:
+            await asyncio.to_thread(result_cache.put, key, result)
         end = tm.time()
 
         logger.info(f"Total Request Runtime: {end - start : 0.3f} s.")
-        logger.info(f"Peak memory usage: {peak / 10**6:.3f} MB")
         logger.info('Goal Calculation Completed Successfully.')
         logger.info('------------------------------------------')
-        return result
-    
+        return shape_response(req, result)
+
+    except ServerOverloadedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
     except DataFileNotFoundError as e:
         logger.exception(e)
         raise HTTPException(status_code=400, detail="One or more specified assets do not exist in database.")
@@ -65,17 +219,122 @@ async def calculate_goal(req: GoalRequest) -> JSONResponse:
         logger.exception("Unexpected error during goal calculation.")
         raise HTTPException(status_code=500, detail=f"Unexpected error during goal calculation: {str(e)}.")
 
+@app.post(
+    "/calculate-goals-batch",
+    response_model=List[PortfolioSummary],
+    summary="Calculate Several Goal-Based SIP Plans",
+    description="""
+        Computes goal-based SIP strategies for a list of goals in one call. Goals over the
+        same set of assets share data loading, return statistics and Monte Carlo paths,
+        which makes this much faster than calling `/calculate-goal` once per goal.
+        Returns one summary per goal, in request order.
+    """
+)
+async def calculate_goals_batch(reqs: List[GoalRequest], response: Response) -> List[PortfolioSummary]:
+    """
+    Endpoint to calculate several SIP goals at once.
+    """
+    logger = get_logger()
+    logger.info(f'------- New Batch Goal Calculation Request Received ({len(reqs)} goals) -------')
+    if not reqs or len(reqs) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Batch must contain between 1 and {MAX_BATCH_SIZE} goals.")
+    try:
+        start = tm.time()
+        keys = [request_key(req) if RESULT_CACHE_ENABLED and not req.preview else None for req in reqs]
+        results = await asyncio.to_thread(result_cache.get_many, keys)
+        missing = [i for i, result in enumerate(results) if result is None]
+        logger.info(f"{len(reqs) - len(missing)} of {len(reqs)} goals served from result cache.")
+
+        if missing:
+            computed = await run_instrumented(
+                "/calculate-goals-batch", response, run_batch_analysis, [reqs[i] for i in missing]
+            )
+            for i, result in zip(missing, computed):
+                results[i] = result
+            await asyncio.to_thread(
+                result_cache.put_many, [(keys[i], results[i]) for i in missing if keys[i]]
+            )
+        logger.info(f"Total Request Runtime: {tm.time() - start : 0.3f} s.")
+        logger.info('Batch Goal Calculation Completed Successfully.')
+        logger.info('------------------------------------------')
+        return [shape_response(req, result) for req, result in zip(reqs, results)]
+
+    except ServerOverloadedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    except DataFileNotFoundError as e:
+        logger.exception(e)
+        raise HTTPException(status_code=400, detail="One or more specified assets do not exist in database.")
+
+    except InvalidAllocationWeightsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except Exception as e:
+        logger.exception("Unexpected error during batch goal calculation.")
+        raise HTTPException(status_code=500, detail=f"Unexpected error during batch goal calculation: {str(e)}.")
+
+@app.get(
+    "/cache-stats",
+    summary="Result Cache Statistics",
+    description="""
+        Returns the hit, miss and eviction counters of the persistent result cache
+        (shared by all server processes) and its current number of entries.
+    """
+)
+async def cache_stats() -> dict:
+    return await asyncio.to_thread(result_cache.stats)
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Prometheus Metrics",
+    description="""
+        Exposes per-endpoint request latencies and status counts, per-stage analysis
+        latencies, sampled peak memory, worker pool load and result cache counters
+        in the Prometheus text format. Values are per server process, except the
+        result cache counters, which are shared.
+    """
+)
+async def metrics() -> PlainTextResponse:
+    cache = await asyncio.to_thread(result_cache.stats)
+    extra = [
+        ('worker_pool_in_flight', 'gauge', 'Calls running or queued on the worker pool.', worker_pool.in_flight),
+        ('worker_pool_capacity', 'gauge', 'Maximum calls admitted to the worker pool.', worker_pool.capacity),
+        ('ready', 'gauge', 'Whether startup warm-up has completed (see /ready).', int(ready_after is not None)),
+    ]
+    if ready_after is not None:
+        extra.append(('cold_start_seconds', 'gauge', 'Seconds from import to warm.', ready_after))
+    for name in ('hits', 'misses', 'evictions'):
+        if name in cache:
+            extra.append((f'result_cache_{name}_total', 'counter', f'Result cache {name} (all processes).', cache[name]))
+    if 'entries' in cache:
+        extra.append(('result_cache_entries', 'gauge', 'Results currently cached.', cache['entries']))
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
+def visualization_etag(rolling_returns, dates, asset_url: str) -> str:
+    """
+    ETag of a visualization page: a hash of its data and of the versions of
+    the static assets it links to.
+    """
+    versions = [asset_version(name) for name in ('plotly.min.js', 'returns-chart.js')]
+    encoded = json.dumps([rolling_returns, dates, asset_url, versions], separators=(',', ':'))
+    return f'"{hashlib.sha256(encoded.encode()).hexdigest()[:32]}"'
+
 @app.post(
     "/get-returns-visualization",
     response_class=HTMLResponse,
     summary="Get Interactive Returns Visualization",
     description="""
         Returns an interactive HTML visualization of the rolling returns distribution
-        and trend for the goal-based SIP analysis.
+        and trend for the goal-based SIP analysis. The page loads plotly.js and the
+        chart script from this server's `/static/`. Responses carry an `ETag`; send it
+        back in `If-None-Match` to get `304 Not Modified` when the data is unchanged.
     """
 )
 async def get_returns_visualization(
-    pf_summary: PortfolioSummary
+    pf_summary: PortfolioSummary,
+    request: Request
 ) -> HTMLResponse:
     """
     Generate and return an interactive HTML visualization of rolling returns.
@@ -84,29 +343,41 @@ async def get_returns_visualization(
     logger.info('------- New Visualization Request Received -------')
     try:        
         start = tm.time()
-        tracemalloc.start()
         
-        rolling_returns = pf_summary.rolling_returns
-        dates = pf_summary.dates
+        # Summaries may come back downsampled or packed (compact encoding)
+        rolling_returns = decode_series(pf_summary.rolling_returns)
+        dates = decode_series(pf_summary.dates)
 
         if rolling_returns is None:
             logger.warning('Rolling Returns List is empty.')
         if dates is None:
             logger.warning('Dates List is empty.')
-        
-        html_content = generate_returns_html(rolling_returns, dates)
+
+        asset_url = f"{request.base_url}static/"
+        etag = visualization_etag(rolling_returns, dates, asset_url)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('if-none-match', ''):
+            logger.info('Visualization not modified (304).')
+            return Response(status_code=304, headers=headers)
+
+        html_content = visualization_cache.get(etag)
+        if html_content is not None:
+            logger.info(f"Visualization served from cache in {tm.time() - start : 0.3f} s.")
+            return HTMLResponse(content=html_content, headers=headers)
+
+        # A template fill, well under a millisecond: cheaper here than a trip
+        # to the worker pool, and workers never need to import plotly
+        html_content = generate_returns_html(rolling_returns, dates, asset_url)
+        visualization_cache.put(etag, html_content)
         logger.info('Rolling Returns and Returns Distribution chart generated.')
 
-        _, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
         end = tm.time()
         logger.info(f"Total Request Runtime: {end - start : 0.3f} s.")
-        logger.info(f"Peak memory usage: {peak / 10**6:.3f} MB")
         logger.info('Returns Visualization Completed Successfully.')
         logger.info('------------------------------------------')
 
-        return HTMLResponse(content=html_content)
-    
+        return HTMLResponse(content=html_content, headers=headers)
+
     except DataFileNotFoundError as e:
         logger.error(f"Data file not found: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -114,3 +385,42 @@ async def get_returns_visualization(
     except Exception as e:
         logger.error(f"Error generating visualization: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.get(
+    "/ready",
+    summary="Readiness Probe",
+    description="""
+        Returns 200 once startup warm-up has completed (datasets loaded, static assets
+        built, workers warmed for the built-in risk profiles), with the measured
+        cold-start time; 503 until then.
+    """
+)
+async def ready() -> JSONResponse:
+    if ready_after is None:
+        return JSONResponse({'ready': False}, status_code=503)
+    return JSONResponse({
+        'ready': True,
+        'cold_start_seconds': round(ready_after, 3),
+        'cold_start_budget_seconds': COLD_START_BUDGET_SECONDS,
+    })
+
+@app.get(
+    "/static/{name}",
+    summary="Static Visualization Assets",
+    description="""
+        Serves the self-hosted plotly.js bundle and the returns chart script used by
+        `/get-returns-visualization` pages (gzip-encoded when accepted). Pages link
+        to them under versioned URLs, so they may be cached indefinitely.
+    """
+)
+async def get_static_asset(name: str, request: Request) -> Response:
+    asset = static_asset(name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail=f"Unknown static asset: {name}.")
+
+    headers = {'ETag': asset.etag, 'Cache-Control': 'public, max-age=31536000, immutable', 'Vary': 'Accept-Encoding'}
+    if asset.etag in request.headers.get('if-none-match', ''):
+        return Response(status_code=304, headers=headers)
+    if 'gzip' in request.headers.get('accept-encoding', ''):
+        return Response(asset.gzipped, media_type=asset.media_type, headers={**headers, 'Content-Encoding': 'gzip'})
+    return Response(asset.content, media_type=asset.media_type, headers=headers)
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+from typing import Literal
+
+class EncodedArray(BaseModel):
+    dtype: Literal['float64', 'float32', 'int32', 'date32']   # date32: days since 1970-01-01
+    data: str                                                 # base64 of the little-endian values
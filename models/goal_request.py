@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Literal, Optional
 
 class AssetAllocation(BaseModel):
@@ -13,3 +13,8 @@ class GoalRequest(BaseModel):
     lumpsum_amount: float = None
     risk_profile: Literal['conservative', 'balanced', 'aggressive', 'custom'] = None
     asset_allocation: AssetAllocation
+    simulation_engine: Optional[Literal['gaussian', 'bootstrap']] = None   # None: MC_ENGINE
+    preview: bool = False                                                   # analytic probability, no simulation
+    series_points: Optional[int] = Field(None, ge=2)                         # points per series; None: SERIES_MAX_POINTS
+    series_step: Optional[int] = Field(None, ge=1)                          # keep every Nth point of each series
+    series_encoding: Literal['list', 'compact'] = 'list'                    # compact: base64-packed arrays
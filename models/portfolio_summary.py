@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Union, List
 from .asset_summary import AssetSummary
+from .encoded_array import EncodedArray
 from typing import Optional
 
 class PortfolioSummary(BaseModel):
@@ -14,9 +15,15 @@ class PortfolioSummary(BaseModel):
     rolling_xirr: float
     goal_achievement_probability: float
     suggested_sip: Union[float, str]
+    goal_probability_margin: Optional[float] = None
+    suggested_sip_margin: Optional[float] = None
+    probability_confidence_level: Optional[float] = None
+    simulated_paths: Optional[int] = None
+    simulation_engine: Optional[str] = None
 
-    months: Optional[List[int]] = None
-    cumulative_investment: Optional[List[float]] = None
-    cumulative_returns: Optional[List[float]] = None
-    rolling_returns: Optional[List[float]] = None
-    dates: Optional[List[str]] = None
\ No newline at end of file
+    # Full lists by default; downsampled and/or packed on request (utils.series)
+    months: Optional[Union[List[int], EncodedArray]] = None
+    cumulative_investment: Optional[Union[List[float], EncodedArray]] = None
+    cumulative_returns: Optional[Union[List[float], EncodedArray]] = None
+    rolling_returns: Optional[Union[List[float], EncodedArray]] = None
+    dates: Optional[Union[List[str], EncodedArray]] = None
\ No newline at end of file
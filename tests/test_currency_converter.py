@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import FOREX_ASOF_TOLERANCE_DAYS
+from core.currency_converter import CurrencyConverter, asof_rates
+from core.dataset_store import DatasetStore
+from core.exceptions import DatesNotAlignedError
+
+_TOLERANCE = np.timedelta64(FOREX_ASOF_TOLERANCE_DAYS, 'D')
+
+
+def _dates(*values: str) -> np.ndarray:
+    return np.array(values, dtype='datetime64[ns]')
+
+
+def test_asof_takes_latest_rate_on_or_before_each_date():
+    rate_dates = _dates('2024-01-31', '2024-02-29', '2024-03-29')
+    rates = np.array([83.0, 83.2, 83.4])
+    nav_dates = _dates('2024-01-31', '2024-02-28', '2024-02-29', '2024-03-31')
+
+    matched, valid = asof_rates(nav_dates, rate_dates, rates, _TOLERANCE)
+
+    np.testing.assert_array_equal(matched, [83.0, 83.0, 83.2, 83.4])
+    assert valid.all()
+
+
+def test_asof_tolerance_is_inclusive():
+    rate_dates = _dates('2024-01-01')
+    nav_dates = _dates('2023-12-31', '2024-01-01', '2024-01-31', '2024-02-01', '2024-02-02')
+
+    _, valid = asof_rates(nav_dates, rate_dates, np.array([83.0]), np.timedelta64(31, 'D'))
+
+    # Nothing on or before Dec 31; Feb 1 is exactly 31 days after the rate
+    np.testing.assert_array_equal(valid, [False, True, True, True, False])
+
+
+def test_asof_without_rates_matches_nothing():
+    matched, valid = asof_rates(_dates('2024-01-31'), _dates(), np.array([]), _TOLERANCE)
+
+    assert not valid.any()
+    assert np.isnan(matched).all()
+
+
+@pytest.fixture
+def converter(tmp_path):
+    rates = pd.DataFrame({
+        'Date': pd.to_datetime(['2020-01-31', '2020-02-29', '2020-03-31', '2020-07-31']),
+        'USD_to_INR': [71.0, 72.0, 75.0, 74.0],
+    })
+    rates.to_feather(tmp_path / 'USD_to_INR.feather')
+    store = DatasetStore(nav_paths={}, forex_dir=str(tmp_path), dataset_path=str(tmp_path / 'missing.arrow'))
+    return CurrencyConverter(store)
+
+
+def test_convert_many_joins_each_currency_and_keeps_inr(converter):
+    inr = pd.DataFrame({'Date': pd.to_datetime(['2020-01-31']), 'NAV_INR': [10.0]})
+    usd = pd.DataFrame({'Date': pd.to_datetime(['2020-02-03', '2020-03-31']), 'NAV_USD': [2.0, 3.0]})
+    other_usd = pd.DataFrame({'Date': pd.to_datetime(['2020-01-31']), 'NAV_USD': [1.0]})
+
+    converted = converter.convert_many_to_inr({'inr': inr, 'usd': usd, 'other_usd': other_usd})
+
+    assert converted['inr'] is inr
+    np.testing.assert_array_equal(converted['usd']['NAV_INR'], [2.0 * 71.0, 3.0 * 75.0])
+    assert converted['usd']['Date'].tolist() == usd['Date'].tolist()
+    np.testing.assert_array_equal(converted['other_usd']['NAV_INR'], [71.0])
+
+
+def test_convert_many_drops_rows_without_a_recent_rate(converter):
+    # Jan 15 precedes every rate; May 31 is 61 days after Mar 31's
+    usd = pd.DataFrame({
+        'Date': pd.to_datetime(['2020-01-15', '2020-02-29', '2020-04-30', '2020-05-31', '2020-08-31']),
+        'NAV_USD': [1.0, 2.0, 3.0, 4.0, 5.0],
+    })
+
+    converted = converter.convert_to_inr(nav_data=usd)
+
+    assert converted['Date'].dt.strftime('%Y-%m-%d').tolist() == ['2020-02-29', '2020-04-30', '2020-08-31']
+    np.testing.assert_array_equal(converted['NAV_INR'], [2.0 * 72.0, 3.0 * 75.0, 5.0 * 74.0])
+
+
+def test_convert_many_rejects_series_without_any_rate(converter):
+    usd = pd.DataFrame({'Date': pd.to_datetime(['2019-06-30', '2019-12-31']), 'NAV_USD': [1.0, 2.0]})
+
+    with pytest.raises(DatesNotAlignedError):
+        converter.convert_many_to_inr({'usd': usd})
+
+
+def test_convert_many_requires_the_forex_file(converter):
+    eur = pd.DataFrame({'Date': pd.to_datetime(['2020-01-31']), 'NAV_EUR': [1.0]})
+
+    with pytest.raises(FileNotFoundError):
+        converter.convert_many_to_inr({'eur': eur})
@@ -0,0 +1,174 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.exceptions import RawDataMismatchError, RawDataSchemaError
+from core.ingest import ingest, parse_raw_file
+from core.nav_dataset import read_feather_series
+
+_NAV_SOURCES = {
+    'index': {'currency': 'INR', 'files': [('index.csv', 'Close', '%d %b %Y')]},
+    'us_index': {'currency': 'USD', 'files': [('us_index.csv', 'Price', '%d-%m-%Y')]},
+}
+_FOREX_SOURCES = {'USD': [('usd_inr.csv', 'Price', '%d-%m-%Y')]}
+
+
+def _price(day: pd.Timestamp, base: float) -> float:
+    return base + day.dayofyear + 0.25
+
+
+def _write_raw(path, days: pd.DatetimeIndex, base: float, date_format: str, column: str) -> None:
+    # As downloaded: newest first, thousands separators, a day without a price
+    rows = [(day.strftime(date_format), f"{_price(day, base):,.2f}") for day in days[::-1]]
+    rows.insert(1, (days[-1].strftime(date_format), '-'))
+    pd.DataFrame(rows, columns=['Date', column]).to_csv(path, index=False)
+
+
+def _write_sources(raw_dir, end: str) -> None:
+    days = pd.bdate_range('2023-01-02', end)
+    _write_raw(raw_dir / 'index.csv', days, 20_000.0, '%d %b %Y', 'Close')
+    _write_raw(raw_dir / 'us_index.csv', days, 4_000.0, '%d-%m-%Y', 'Price')
+    _write_raw(raw_dir / 'usd_inr.csv', pd.bdate_range('2023-02-01', end), 80.0, '%d-%m-%Y', 'Price')
+
+
+def _expected_months(start: str, end: str, base: float) -> pd.DataFrame:
+    days = pd.bdate_range(start, end)
+    first = pd.Series(days, index=days).groupby(days.to_period('M')).first()
+    return pd.DataFrame({
+        'Date': [period.to_timestamp(how='end').normalize() for period in first.index],
+        'value': [_price(day, base) for day in first],
+    })
+
+
+@pytest.fixture
+def paths(tmp_path):
+    raw_dir = tmp_path / 'raw'
+    raw_dir.mkdir()
+    nav_dir = tmp_path / 'navs'
+    return {
+        'raw_dir': raw_dir,
+        'nav_paths': {name: str(nav_dir / f"{name}.feather") for name in _NAV_SOURCES},
+        'forex_dir': tmp_path / 'forex',
+    }
+
+
+def _ingest(paths, **kwargs) -> dict[str, str]:
+    return ingest(
+        raw_dir=str(paths['raw_dir']), nav_sources=_NAV_SOURCES, forex_sources=_FOREX_SOURCES,
+        nav_paths=paths['nav_paths'], forex_dir=str(paths['forex_dir']), **kwargs
+    )
+
+
+def _read(paths, name: str) -> pd.DataFrame:
+    if name == 'USD':
+        return read_feather_series(str(paths['forex_dir'] / 'USD_to_INR.feather'))
+    return read_feather_series(paths['nav_paths'][name])
+
+
+def test_parse_raw_file_reads_prices_as_downloaded(tmp_path):
+    _write_raw(tmp_path / 'raw.csv', pd.bdate_range('2024-01-01', '2024-01-05'), 1_000.0, '%d %b %Y', 'Close')
+
+    dates, prices, dropped = parse_raw_file(str(tmp_path / 'raw.csv'), 'Close', '%d %b %Y')
+
+    assert dropped == 1
+    assert dates[0] == np.datetime64('2024-01-05')
+    np.testing.assert_array_equal(prices, [1_005.25, 1_004.25, 1_003.25, 1_002.25, 1_001.25])
+
+
+def test_parse_raw_file_rejects_bad_schema(tmp_path):
+    _write_raw(tmp_path / 'raw.csv', pd.bdate_range('2024-01-01', '2024-01-05'), 1_000.0, '%d %b %Y', 'Close')
+
+    with pytest.raises(RawDataSchemaError):
+        parse_raw_file(str(tmp_path / 'raw.csv'), 'Price', '%d %b %Y')
+    with pytest.raises(RawDataSchemaError):
+        parse_raw_file(str(tmp_path / 'raw.csv'), 'Close', '%d-%m-%Y')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_build_writes_each_months_first_price(paths, workers):
+    _write_sources(paths['raw_dir'], '2023-06-30')
+
+    outcomes = _ingest(paths, workers=workers)
+
+    assert outcomes == {'USD': 'built 5 months', 'index': 'built 6 months', 'us_index': 'built 5 months'}
+    for name, column, start, base in (
+        ('index', 'NAV_INR', '2023-01-02', 20_000.0),
+        ('USD', 'USD_to_INR', '2023-02-01', 80.0),
+        # Only the months the USD rates cover
+        ('us_index', 'NAV_USD', '2023-02-01', 4_000.0),
+    ):
+        df = _read(paths, name)
+        expected = _expected_months(start, '2023-06-30', base)
+        assert list(df.columns) == ['Date', column]
+        assert df['Date'].tolist() == expected['Date'].tolist()
+        np.testing.assert_array_equal(df[column], expected['value'])
+
+
+def test_refresh_appends_only_new_months(paths):
+    _write_sources(paths['raw_dir'], '2023-04-30')
+    _ingest(paths, workers=1)
+    _write_sources(paths['raw_dir'], '2023-06-30')
+
+    outcomes = _ingest(paths, workers=1)
+
+    assert outcomes == {'USD': 'appended 2 months', 'index': 'appended 2 months', 'us_index': 'appended 2 months'}
+    refreshed = _read(paths, 'index')
+    expected = _expected_months('2023-01-02', '2023-06-30', 20_000.0)
+    np.testing.assert_array_equal(refreshed['NAV_INR'], expected['value'])
+    assert _ingest(paths, workers=1) == {'USD': 'unchanged', 'index': 'unchanged', 'us_index': 'unchanged'}
+
+
+def test_missing_months_are_forward_filled(paths):
+    _write_sources(paths['raw_dir'], '2023-06-30')
+    raw = pd.read_csv(paths['raw_dir'] / 'index.csv', dtype=str)
+    months = pd.to_datetime(raw['Date'], format='%d %b %Y').dt.month
+    raw[months != 3].to_csv(paths['raw_dir'] / 'index.csv', index=False)
+
+    _ingest(paths, names=['index'], workers=1)
+
+    df = _read(paths, 'index')
+    assert df['Date'].dt.month.tolist() == [1, 2, 3, 4, 5, 6]
+    assert df['NAV_INR'].iloc[2] == df['NAV_INR'].iloc[1]
+
+
+def test_mismatching_raw_data_is_rejected(paths):
+    _write_sources(paths['raw_dir'], '2023-04-30')
+    _ingest(paths, workers=1)
+    stored = _read(paths, 'index')
+    # Raw files from another vendor: every price differs
+    days = pd.bdate_range('2023-01-02', '2023-06-30')
+    _write_raw(paths['raw_dir'] / 'index.csv', days, 21_000.0, '%d %b %Y', 'Close')
+
+    with pytest.raises(RawDataMismatchError):
+        _ingest(paths, names=['index'], workers=1)
+    pd.testing.assert_frame_equal(_read(paths, 'index'), stored)
+
+    outcomes = _ingest(paths, names=['index'], workers=1, allow_mismatch=True)
+
+    assert outcomes == {'index': 'appended 2 months'}
+    pd.testing.assert_frame_equal(_read(paths, 'index').iloc[:4], stored)
+
+
+def test_full_rebuild_keeps_stored_months_outside_the_raw_data(paths):
+    _write_sources(paths['raw_dir'], '2023-06-30')
+    _ingest(paths, names=['index'], workers=1)
+    stored = _read(paths, 'index')
+    # The raw file now only covers March to May
+    _write_raw(paths['raw_dir'] / 'index.csv', pd.bdate_range('2023-03-01', '2023-05-31'), 20_000.0, '%d %b %Y', 'Close')
+
+    outcomes = _ingest(paths, names=['index'], workers=1, full=True)
+
+    assert outcomes == {'index': 'rebuilt 3 months, kept 3 stored months outside the raw data'}
+    pd.testing.assert_frame_equal(_read(paths, 'index'), stored)
+
+
+def test_output_dir_leaves_configured_files_alone(paths, tmp_path):
+    _write_sources(paths['raw_dir'], '2023-06-30')
+
+    _ingest(paths, workers=1, output_dir=str(tmp_path / 'out'))
+
+    assert not os.path.exists(paths['nav_paths']['index'])
+    assert sorted(os.listdir(tmp_path / 'out' / 'monthly_nav')) == ['index.feather', 'us_index.feather']
+    assert os.listdir(tmp_path / 'out' / 'monthly_forex') == ['USD_to_INR.feather']
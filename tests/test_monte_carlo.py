@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from core.monte_carlo import (
+    _accumulate_path_factors, bootstrap_path_factors_at, expected_path_factors, goal_probability,
+    sip_for_probability, simulate_path_factors, simulate_path_factors_at
+)
+
+_COV = np.array([
+    [0.0025, 0.0010, 0.0002],
+    [0.0010, 0.0036, 0.0004],
+    [0.0002, 0.0004, 0.0009],
+])
+_MU = np.array([0.010, 0.012, 0.006])
+_CHOL = np.linalg.cholesky(_COV)
+
+
+def _per_month_loop(returns: np.ndarray, horizons: list[int]) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """
+    The previous kernel: one month at a time, a SIP installment at the start
+    of every month, then that month's growth applied to everything.
+    """
+    lumpsum_growth = np.ones(returns.shape[1:])
+    sip_growth = np.zeros(returns.shape[1:])
+    results = {}
+    for month in range(max(horizons) + 1):
+        if month in horizons:
+            results[month] = (lumpsum_growth.copy(), sip_growth.copy())
+        if month < len(returns):
+            growth = np.exp(returns[month])
+            sip_growth = (sip_growth + 1.0) * growth
+            lumpsum_growth = lumpsum_growth * growth
+    return results
+
+
+@pytest.mark.parametrize('block_months', [1, 5, 12, 40])
+@pytest.mark.parametrize('horizons', [[12], [1, 7, 30], [0, 24, 24, 25]])
+def test_blocked_accumulation_matches_per_month_loop(block_months, horizons):
+    rng = np.random.default_rng(11)
+    returns = rng.normal(0.008, 0.05, size=(max(horizons), 200, 3))
+
+    def fill_returns(out, scratch, start_month):
+        scratch[...] = np.nan   # free to use, must not leak into the result
+        out[...] = returns[start_month:start_month + len(out)]
+
+    blocked = _accumulate_path_factors(fill_returns, horizons, 200, 3, block_months, np.dtype(np.float64))
+    expected = _per_month_loop(returns, horizons)
+
+    assert sorted(blocked) == sorted(set(horizons))
+    for horizon, (lumpsum_growth, sip_growth) in expected.items():
+        np.testing.assert_allclose(blocked[horizon][0], lumpsum_growth, rtol=1e-12)
+        np.testing.assert_allclose(blocked[horizon][1], sip_growth, rtol=1e-12)
+
+
+@pytest.mark.parametrize('block_months', [1, 12])
+def test_gaussian_paths_match_per_month_loop_for_a_fixed_seed(block_months):
+    months, paths = 30, 500   # small enough for whole blocks to stay in cache
+    lumpsum_growth, sip_growth = simulate_path_factors(
+        _MU, _CHOL, months, paths, rng=np.random.default_rng(5), block_months=block_months
+    )
+
+    # Shocks are drawn month-major, one block at a time, from the same stream
+    rng = np.random.default_rng(5)
+    shocks = np.concatenate([
+        rng.standard_normal((min(block_months, months - start), paths, len(_MU)))
+        for start in range(0, months, block_months)
+    ])
+    expected = _per_month_loop(shocks @ _CHOL.T + _MU, [months])[months]
+
+    np.testing.assert_allclose(lumpsum_growth, expected[0], rtol=1e-12)
+    np.testing.assert_allclose(sip_growth, expected[1], rtol=1e-12)
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_path_means_match_closed_form(dtype):
+    weights = np.array([0.5, 0.3, 0.2])
+    lumpsum_growth, sip_growth = simulate_path_factors(
+        _MU, _CHOL, 120, 20_000, rng=np.random.default_rng(2), dtype=dtype
+    )
+    assert lumpsum_growth.dtype == dtype
+
+    for factors, expected in zip((lumpsum_growth @ weights, sip_growth @ weights),
+                                 expected_path_factors(_MU, _CHOL, weights, 120)):
+        standard_error = factors.std() / np.sqrt(len(factors))
+        assert abs(factors.mean() - expected) < 4 * standard_error
+
+
+def test_horizon_snapshots_share_paths():
+    at = simulate_path_factors_at(_MU, _CHOL, [60, 120], 400, rng=np.random.default_rng(9))
+    shorter = simulate_path_factors(_MU, _CHOL, 60, 400, rng=np.random.default_rng(9))
+    longer = simulate_path_factors(_MU, _CHOL, 120, 400, rng=np.random.default_rng(9))
+
+    for snapshot, run in ((at[60], shorter), (at[120], longer)):
+        np.testing.assert_array_equal(snapshot[0], run[0])
+        np.testing.assert_array_equal(snapshot[1], run[1])
+
+
+def test_sharded_paths_are_reproducible():
+    first = simulate_path_factors(_MU, _CHOL, 36, 1001, rng=np.random.default_rng(4), workers=3)
+    second = simulate_path_factors(_MU, _CHOL, 36, 1001, rng=np.random.default_rng(4), workers=3)
+
+    assert first[0].shape == (1001, 3)
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
+
+
+def test_bootstrap_paths_reuse_historical_months():
+    history = np.random.default_rng(1).normal(0.008, 0.04, size=(60, 3))
+    lumpsum_growth, sip_growth = bootstrap_path_factors_at(
+        history, [1], 300, rng=np.random.default_rng(3)
+    )[1]
+
+    # A one-month path grows by one historical month's return vector
+    months = np.exp(history)
+    assert all(np.any(np.all(np.isclose(row, months), axis=1)) for row in lumpsum_growth)
+    np.testing.assert_allclose(sip_growth, lumpsum_growth)
+
+
+def test_suggested_sip_reaches_target_probability():
+    weights = np.array([0.5, 0.3, 0.2])
+    lumpsum_growth, sip_growth = simulate_path_factors(_MU, _CHOL, 120, 4000, rng=np.random.default_rng(8))
+    lumpsum_factors, sip_factors = lumpsum_growth @ weights, sip_growth @ weights
+
+    sip = sip_for_probability(lumpsum_factors, sip_factors, 100_000, 5_000_000, 0.8)
+
+    assert goal_probability(lumpsum_factors, sip_factors, 100_000, sip, 5_000_000) >= 0.8
+    assert goal_probability(lumpsum_factors, sip_factors, 100_000, sip * 0.999, 5_000_000) < 0.8
@@ -0,0 +1,123 @@
+import pytest
+
+from models.portfolio_summary import PortfolioSummary
+from utils import result_cache
+from utils.result_cache import ResultCache
+
+
+class _Store:
+    """
+    Stands in for the dataset store: only its version is read.
+    """
+
+    def __init__(self):
+        self.current = 'v1'
+
+    def version(self) -> str:
+        return self.current
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _summary(goal_amount: float) -> PortfolioSummary:
+    return PortfolioSummary(
+        goal_amount=goal_amount, time_horizon=10, lumpsum_amount=0.0, total_monthly_sip=1000.0,
+        risk_profile='balanced', portfolio_growth=0.0, asset_summaries=[], rolling_xirr=12.0,
+        goal_achievement_probability=0.9, suggested_sip=1000.0
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(result_cache.tm, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def store():
+    return _Store()
+
+
+@pytest.fixture
+def cache(tmp_path, store, clock):
+    cache = ResultCache(str(tmp_path / 'results.sqlite3'), max_entries=3, ttl_seconds=60, store=store)
+    yield cache
+    cache.close()
+
+
+def test_round_trip_and_counters(cache):
+    cache.put('a', _summary(1.0))
+
+    assert cache.get('a') == _summary(1.0)
+    assert cache.get_many(['b', None, 'a']) == [None, None, _summary(1.0)]
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 1, 1)
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put('a', _summary(1.0))
+    clock.now += 60
+    assert cache.get('a') is not None
+
+    clock.now += 1
+    assert cache.get('a') is None
+
+    # The next store deletes the expired row
+    cache.put('b', _summary(2.0))
+    stats = cache.stats()
+    assert (stats['entries'], stats['evictions']) == (1, 1)
+
+
+def test_least_recently_used_entries_are_evicted(cache, clock):
+    for key in ('a', 'b', 'c'):
+        cache.put(key, _summary(1.0))
+        clock.now += 1
+    assert cache.get('a') is not None   # 'b' is now the least recently used
+    clock.now += 1
+
+    cache.put('d', _summary(2.0))
+
+    assert cache.get_many(['a', 'b', 'c', 'd']) == [_summary(1.0), None, _summary(1.0), _summary(2.0)]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_dataset_version_change_hides_and_purges_entries(cache, store):
+    cache.put_many([('a', _summary(1.0)), ('b', _summary(2.0))])
+
+    store.current = 'v2'
+    assert cache.get('a') is None
+
+    cache.put('c', _summary(3.0))
+    assert cache.stats()['entries'] == 1
+    store.current = 'v1'
+    assert cache.get_many(['a', 'b']) == [None, None]
+
+
+def test_processes_share_entries_and_counters(tmp_path, store, clock):
+    path = str(tmp_path / 'results.sqlite3')
+    writer = ResultCache(path, max_entries=3, ttl_seconds=60, store=store)
+    reader = ResultCache(path, max_entries=3, ttl_seconds=60, store=store)
+    try:
+        writer.put('a', _summary(1.0))
+        assert reader.get('a') == _summary(1.0)
+        reader.close()   # flushes its buffered hit
+        assert writer.stats()['hits'] == 1
+    finally:
+        writer.close()
+        reader.close()
+
+
+def test_unreadable_database_is_a_miss(tmp_path, store):
+    path = tmp_path / 'results.sqlite3'
+    path.write_bytes(b'not a database' * 100)
+    cache = ResultCache(str(path), store=store)
+
+    cache.put('a', _summary(1.0))
+    assert cache.get('a') is None
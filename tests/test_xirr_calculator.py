@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+import pyxirr
+
+from core.exceptions import HistoricalDataTooLowError, InvalidReturnCalculationModeError
+from core.xirr_calculator import XIRR_TOLERANCE_PCT, XirrCalculator
+
+
+def _nav_frame(months: int, seed: int = 7, volatility: float = 0.05) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    navs = 100 * np.exp(np.cumsum(rng.normal(0.008, volatility, months)))
+    dates = pd.date_range('2001-01-31', periods=months, freq='ME')
+    return pd.DataFrame({'Date': dates, 'NAV_INR': navs})
+
+
+def _pyxirr_windows(df: pd.DataFrame, years: int, sip_amount: float = 1000) -> list[float]:
+    months = years * 12
+    return [XirrCalculator._pyxirr_window(df, start, months, sip_amount) for start in range(len(df) - months)]
+
+
+def _cash_flows(df: pd.DataFrame, start: int, months: int) -> tuple[list, list]:
+    window = df.iloc[start:start + months + 1]
+    units = (1000 / window['NAV_INR'].iloc[:months]).sum()
+    return list(window['Date']), [-1000.0] * months + [units * window['NAV_INR'].iloc[months]]
+
+
+@pytest.mark.parametrize('years', [1, 3, 10])
+def test_batched_windows_match_pyxirr(years):
+    df = _nav_frame(180)
+    xirrs, end_dates = XirrCalculator()._compute_rolling_window_xirrs(df, years)
+
+    assert len(xirrs) == len(df) - years * 12
+    assert end_dates == list(df['Date'].iloc[years * 12:])
+    np.testing.assert_allclose(xirrs, _pyxirr_windows(df, years), rtol=0, atol=XIRR_TOLERANCE_PCT)
+
+
+def test_extreme_series_match_pyxirr():
+    # Crashes and rallies of tens of percent a month push rates far from zero
+    df = _nav_frame(72, seed=3, volatility=0.35)
+    xirrs, _ = XirrCalculator()._compute_rolling_window_xirrs(df, 2)
+
+    np.testing.assert_allclose(xirrs, _pyxirr_windows(df, 2), rtol=0, atol=XIRR_TOLERANCE_PCT)
+
+
+def test_real_series_matches_pyxirr():
+    df = pd.read_feather('data/final/navs/largecap.feather')
+    xirrs, _ = XirrCalculator()._compute_rolling_window_xirrs(df, 5)
+
+    np.testing.assert_allclose(xirrs, _pyxirr_windows(df, 5), rtol=0, atol=XIRR_TOLERANCE_PCT)
+
+
+def test_unconverged_windows_fall_back_to_pyxirr(monkeypatch):
+    solve = XirrCalculator._solve_log_rates
+    failed = [0, 5, 17]
+
+    def partly_failing(maturity_ratio, years_to_end, max_iter=100):
+        log_rates = solve(maturity_ratio, years_to_end, max_iter)
+        log_rates[failed] = np.nan
+        return log_rates
+
+    monkeypatch.setattr(XirrCalculator, '_solve_log_rates', staticmethod(partly_failing))
+    fallback = []
+    pyxirr_window = XirrCalculator._pyxirr_window
+
+    def recording(df, start, months, sip_amount):
+        fallback.append(start)
+        return pyxirr_window(df, start, months, sip_amount)
+
+    monkeypatch.setattr(XirrCalculator, '_pyxirr_window', staticmethod(recording))
+    df = _nav_frame(60)
+    xirrs, _ = XirrCalculator()._compute_rolling_window_xirrs(df, 3)
+
+    assert fallback == failed
+    assert np.all(np.isfinite(xirrs))
+    expected = [pyxirr.xirr(*_cash_flows(df, start, 36)) * 100 for start in range(len(df) - 36)]
+    np.testing.assert_allclose(xirrs, expected, rtol=0, atol=XIRR_TOLERANCE_PCT)
+
+
+def test_solver_reports_unconverged_windows_as_nan():
+    df = _nav_frame(40)
+    months = 24
+    days = df['Date'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+    years_to_end = (days[months] - days[:months]) / 365.0
+    navs = df['NAV_INR'].to_numpy()
+    maturity_ratio = np.array([(navs[months] / navs[:months]).sum()])
+
+    assert np.isnan(XirrCalculator._solve_log_rates(maturity_ratio, years_to_end[None, :], max_iter=1)).all()
+    solved = XirrCalculator._solve_log_rates(maturity_ratio, years_to_end[None, :])
+    assert np.expm1(solved[0]) * 100 == pytest.approx(pyxirr.xirr(*_cash_flows(df, 0, months)) * 100, abs=XIRR_TOLERANCE_PCT)
+
+
+def test_rolling_stats_summarize_every_mode():
+    df = _nav_frame(120).sample(frac=1, random_state=0)   # unsorted input
+    calculator = XirrCalculator()
+    stats, xirrs, end_dates = calculator.compute_rolling_xirr_stats(3, df=df)
+
+    assert stats == XirrCalculator.summarize_xirrs(xirrs)
+    assert end_dates == sorted(end_dates)
+    for mode, value in stats.items():
+        assert calculator.compute_rolling_xirr(3, df=df, mode=mode)[0] == value
+    assert stats['pessimistic'] <= stats['median'] <= stats['optimistic']
+
+
+def test_rolling_stats_errors():
+    calculator = XirrCalculator()
+    with pytest.raises(HistoricalDataTooLowError):
+        calculator.compute_rolling_xirr_stats(10, df=_nav_frame(100))
+    with pytest.raises(InvalidReturnCalculationModeError):
+        calculator.compute_rolling_xirr(3, df=_nav_frame(100), mode='average')
@@ -1,8 +1,15 @@
+import atexit
+import contextvars
+import json
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+import random
+import threading
+import zlib
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from colorama import Fore, Style, init as colorama_init
-from config import LOGGING_DIR, LOGGING_LIMIT_DAYS
+from config import LOGGING_DIR, LOGGING_FORMAT, LOGGING_INFO_SAMPLE_RATE, LOGGING_LIMIT_DAYS
 
 """
     Create and configure a colorized, rotating logger instance.
@@ -13,6 +20,14 @@ from config import LOGGING_DIR, LOGGING_LIMIT_DAYS
     - Automatic log file directory creation
     - Retention of log files up to `LOGGING_LIMIT_DAYS` days
     - Rotated files renamed from "app.log.YYYY-MM-DD" to "app.YYYY-MM-DD.log"
+    - Non-blocking emission: the logger only enqueues records (`QueueHandler`);
+      a `QueueListener` thread formats and writes them
+    - Optional JSON-lines records (`LOGGING_FORMAT = 'json'`) carrying the
+      request ID (`request_context`) and any `stages` timings passed as extra
+    - INFO sampling per request (`LOGGING_INFO_SAMPLE_RATE`)
+    - One writer per log file: worker processes started with
+      `forward_to_parent` as initializer send their records to the parent's
+      listener (`worker_log_queue`), so only the parent rotates the file
 
     Parameters
     ----------
@@ -56,10 +71,143 @@ COLOR_FORMATS = {
     "CRITICAL": Fore.RED + Style.BRIGHT + LOG_FORMAT + Style.RESET_ALL,
 }
 
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# ID of the request being served, attached to every record logged for it
+_request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar('request_id', default=None)
+
+# Listener of each logger configured by `get_logger` in this process, by name
+_listeners: dict[str, QueueListener] = {}
+
+# In worker processes, the queue to the parent's listener (`forward_to_parent`)
+_parent_queue = None
+
+# Queues feeding this process's handlers from its worker processes, by start method
+_worker_queues: dict[str, object] = {}
+_worker_queues_lock = threading.Lock()
+
+
 class ColoredFormatter(logging.Formatter):
+    """
+    Console formatter coloring each line by level. The per-level formatters
+    are built once.
+    """
+
+    def __init__(self):
+        super().__init__(LOG_FORMAT, DATE_FORMAT)
+        self._formatters = {
+            level: logging.Formatter(fmt, DATE_FORMAT) for level, fmt in COLOR_FORMATS.items()
+        }
+
     def format(self, record):
-        fmt = COLOR_FORMATS.get(record.levelname, LOG_FORMAT)
-        return logging.Formatter(fmt, "%Y-%m-%d %H:%M:%S").format(record)
+        return self._formatters.get(record.levelname, super()).format(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record: time, level, message, request ID and, when
+    logged with `extra={'stages': {...}}`, the stage timings in ms.
+    """
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, DATE_FORMAT),
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'process': record.process,
+        }
+        stages = getattr(record, 'stages', None)
+        if stages:
+            entry['stages_ms'] = {name: round(seconds * 1e3, 3) for name, seconds in stages.items()}
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _RequestFilter(logging.Filter):
+    """
+    Tags records with the current request ID and drops INFO and lower
+    records outside the sampled fraction of requests.
+    """
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        request_id = _request_id.get()
+        record.request_id = request_id
+        if record.levelno >= logging.WARNING or self.sample_rate >= 1.0:
+            return True
+        if request_id is None:
+            return random.random() < self.sample_rate
+        # The same requests are kept in every process
+        return zlib.crc32(request_id.encode()) / 2**32 < self.sample_rate
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Enqueues records with their message already merged and any traceback
+    rendered to text, without the default copy and re-format per record.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+def set_request_id(request_id: str | None) -> contextvars.Token:
+    """
+    Makes `request_id` the current request ID (in this context) and returns
+    a token for `reset_request_id`.
+    """
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token: contextvars.Token) -> None:
+    _request_id.reset(token)
+
+
+def current_request_id() -> str | None:
+    return _request_id.get()
+
+
+def _file_handler(formatter: logging.Formatter) -> TimedRotatingFileHandler:
+    """
+    File handler with daily rotation, naming backups as app.YYYY-MM-DD.log.
+    """
+    fh = TimedRotatingFileHandler(
+        LOG_FILENAME,
+        when="midnight",
+        interval=1,
+        backupCount=LOGGING_LIMIT_DAYS,
+        encoding="utf-8",
+        utc=False
+    )
+    fh.setFormatter(formatter)
+
+    # 1) Use only date for suffix (no time)
+    fh.suffix = "%Y-%m-%d"
+
+    # 2) Rename rotated files from "app.log.YYYY-MM-DD" to "app.YYYY-MM-DD.log"
+    def namer(default_name: str) -> str:
+        # split off the date
+        base_with_ext, date = default_name.rsplit(".", 1)
+        # base_with_ext is ".../app.log"
+        root, ext = os.path.splitext(base_with_ext)  # yields (".../app", ".log")
+        return f"{root}.{date}{ext}"
+
+    fh.namer = namer
+    return fh
+
 
 def get_logger(name: str = "app", level=logging.INFO) -> logging.Logger:
     logger = logging.getLogger(name)
@@ -67,37 +215,75 @@ def get_logger(name: str = "app", level=logging.INFO) -> logging.Logger:
     logger.propagate = False
 
     if not logger.handlers:
-        # Console handler
-        ch = logging.StreamHandler()
-        ch.setLevel(level)
-        ch.setFormatter(ColoredFormatter())
-        logger.addHandler(ch)
-
-        # File handler with daily rotation, naming backups as app.YYYY-MM-DD.log
-        fh = TimedRotatingFileHandler(
-            LOG_FILENAME,
-            when="midnight",
-            interval=1,
-            backupCount=LOGGING_LIMIT_DAYS,
-            encoding="utf-8",
-            utc=False
-        )
-        fh.setLevel(level)
-        fh.setFormatter(logging.Formatter(LOG_FORMAT, "%Y-%m-%d %H:%M:%S"))
-
-        # 1) Use only date for suffix (no time)
-        fh.suffix = "%Y-%m-%d"
-
-        # 2) Rename rotated files from "app.log.YYYY-MM-DD" to "app.YYYY-MM-DD.log"
-        def namer(default_name: str) -> str:
-            # split off the date
-            base_with_ext, date = default_name.rsplit(".", 1)
-            # base_with_ext is ".../app.log"
-            root, ext = os.path.splitext(base_with_ext)  # yields (".../app", ".log")
-            return f"{root}.{date}{ext}"
-
-        fh.namer = namer
-
-        logger.addHandler(fh)
+        if _parent_queue is not None:
+            # Worker process: the parent's listener writes its records
+            records = _parent_queue
+        else:
+            if LOGGING_FORMAT == 'json':
+                console_formatter = file_formatter = JsonFormatter()
+            else:
+                console_formatter = ColoredFormatter()
+                file_formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+
+            # Console handler
+            ch = logging.StreamHandler()
+            ch.setFormatter(console_formatter)
+
+            # Handlers run on the listener's thread; the logger only enqueues
+            records = queue.SimpleQueue()
+            listener = QueueListener(records, ch, _file_handler(file_formatter))
+            listener.start()
+            atexit.register(listener.stop)
+            _listeners[name] = listener
+
+        qh = _QueueHandler(records)
+        qh.setLevel(level)
+        qh.addFilter(_RequestFilter(LOGGING_INFO_SAMPLE_RATE))
+        logger.addHandler(qh)
 
     return logger
+
+
+def worker_log_queue(context) -> object:
+    """
+    Returns the queue, created in the multiprocessing `context`, whose
+    records this process's "app" handlers write. Pass it to the worker
+    processes' initializer `forward_to_parent`, so that only this process
+    opens and rotates the log file. In a worker process, returns the queue
+    to its own parent, so nested pools forward to the same listener.
+
+    :param context: Multiprocessing context the workers are started with.
+    """
+    if _parent_queue is not None:
+        return _parent_queue
+    get_logger()
+    with _worker_queues_lock:
+        records = _worker_queues.get(context.get_start_method())
+        if records is None:
+            records = context.Queue()
+            listener = QueueListener(records, *_listeners['app'].handlers)
+            listener.start()
+            atexit.register(listener.stop)
+            _worker_queues[context.get_start_method()] = records
+        return records
+
+
+def forward_to_parent(records) -> None:
+    """
+    Worker process initializer: sends this process's log records to the
+    parent's listener through `records` (from `worker_log_queue`) instead of
+    writing them itself. Loggers configured before, e.g. while importing,
+    are switched over and their handlers closed.
+
+    :param records: Queue returned by the parent's `worker_log_queue`.
+    """
+    global _parent_queue
+    _parent_queue = records
+    for name, listener in _listeners.items():
+        for handler in logging.getLogger(name).handlers:
+            if isinstance(handler, _QueueHandler):
+                handler.queue = records
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+    _listeners.clear()
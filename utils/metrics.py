@@ -0,0 +1,166 @@
+import bisect
+import random
+import threading
+import time as tm
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable
+
+from config import MEMORY_TRACE_SAMPLE_RATE
+from utils.logger import reset_request_id, set_request_id
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MEMORY_BUCKETS = tuple(float(2 ** p) * 10 ** 6 for p in range(0, 11))   # 1 MB .. 1 GB
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with one series per label value, rendered in
+    the Prometheus text exposition format.
+    """
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[str, list] = {}   # label value -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        with self._lock:
+            series = self._series.setdefault(label_value, [0] * (len(self.buckets) + 1) + [0.0])
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                labels = f'{self.label}="{label_value}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                cumulative += series[len(self.buckets)]
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+                lines.append(f'{self.name}_sum{{{labels}}} {series[-1]:.6f}')
+                lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+class Counter:
+    """
+    Monotonic counter with one series per label set.
+    """
+
+    def __init__(self, name: str, help_text: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values: dict[tuple[str, ...], int] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: int = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                labels = ','.join(f'{k}="{v}"' for k, v in zip(self.labels, label_values))
+                lines.append(f'{self.name}{{{labels}}} {value}')
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint.', 'endpoint'
+)
+REQUESTS_TOTAL = Counter(
+    'http_requests_total', 'Requests by endpoint and status code.', ('endpoint', 'status')
+)
+STAGE_LATENCY = Histogram(
+    'analysis_stage_duration_seconds', 'Time spent in each stage of the goal analysis.', 'stage'
+)
+PEAK_MEMORY = Histogram(
+    'analysis_peak_memory_bytes', 'Peak traced memory of sampled analysis calls.', 'endpoint', MEMORY_BUCKETS
+)
+
+
+def render_metrics(extra: list[tuple[str, str, str, float]] | None = None) -> str:
+    """
+    Renders every metric of this process in the Prometheus text format.
+
+    :param extra: Additional unlabelled samples read at scrape time, as
+                  (name, type, help text, value) with type 'gauge' or 'counter'.
+    """
+    lines = []
+    for metric in (REQUEST_LATENCY, REQUESTS_TOTAL, STAGE_LATENCY, PEAK_MEMORY):
+        lines.extend(metric.render())
+    for name, kind, help_text, value in extra or []:
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value:g}"])
+    return '\n'.join(lines) + '\n'
+
+
+# ---------------- Stage timing ----------------
+
+_local = threading.local()
+
+
+@contextmanager
+def timed_stage(name: str):
+    """
+    Times the enclosed block as stage `name` of the current `collect_timings`
+    call. Repeated stages (e.g. in a batch) accumulate. Outside of
+    `collect_timings` this is a no-op.
+    """
+    timings = getattr(_local, 'timings', None)
+    if timings is None:
+        yield
+        return
+    start = tm.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + tm.perf_counter() - start
+
+
+def collect_timings(fn: Callable, *args, trace_memory: bool = False, request_id: str | None = None, **kwargs):
+    """
+    Calls `fn(*args, **kwargs)` and collects the durations of its
+    `timed_stage` blocks. Picklable, so it can run on a worker process.
+
+    :param trace_memory: Trace allocations during the call and report the peak.
+    :param request_id: Request ID attached to the records logged by the call.
+    :return: Tuple (result, {stage: seconds}, peak memory in bytes or None).
+    """
+    token = set_request_id(request_id)
+    _local.timings = {}
+    # tracemalloc is process-wide: never nest traces from concurrent threads
+    trace_memory = trace_memory and not tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        result = fn(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        return result, _local.timings, peak
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        _local.timings = None
+        reset_request_id(token)
+
+
+def should_trace_memory() -> bool:
+    """
+    True for the sampled fraction (MEMORY_TRACE_SAMPLE_RATE) of requests.
+    """
+    return MEMORY_TRACE_SAMPLE_RATE > 0 and random.random() < MEMORY_TRACE_SAMPLE_RATE
+
+
+def server_timing(timings: dict[str, float]) -> str:
+    """
+    Formats stage durations as a `Server-Timing` header value (milliseconds).
+    """
+    return ', '.join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable, fixed-size summary of a stream of values for quantile queries.
+
+    Values are kept as at most `size` weighted centroids. Centroids are
+    assigned by rank on an arcsine scale (as in a t-digest), so they are
+    finest near both tails: the rank error at quantile q shrinks roughly
+    with sqrt(q * (1 - q)). Minimum, maximum and count are exact.
+    """
+
+    def __init__(self, size: int = 2048):
+        self.size = max(2, size)
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+
+    @property
+    def nbytes(self) -> int:
+        return self._means.nbytes + self._weights.nbytes
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> None:
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        if len(means) > self.size:
+            total = weights.sum()
+            mid_rank = (np.cumsum(weights) - weights / 2) / total
+            bucket = np.floor(
+                (np.arcsin(np.clip(2 * mid_rank - 1, -1, 1)) / np.pi + 0.5) * self.size
+            ).astype(np.int64)
+            np.clip(bucket, 0, self.size - 1, out=bucket)
+            bucket_weights = np.bincount(bucket, weights=weights, minlength=self.size)
+            bucket_sums = np.bincount(bucket, weights=means * weights, minlength=self.size)
+            keep = bucket_weights > 0
+            means, weights = bucket_sums[keep] / bucket_weights[keep], bucket_weights[keep]
+        self._means, self._weights = means, weights
+
+    def add(self, values: np.ndarray) -> None:
+        """
+        Adds a batch of values (NaNs are ignored).
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(
+            np.concatenate([self._means, values]),
+            np.concatenate([self._weights, np.ones(len(values))])
+        )
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Folds another sketch into this one.
+        """
+        if not other.count:
+            return
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress(
+            np.concatenate([self._means, other._means]),
+            np.concatenate([self._weights, other._weights])
+        )
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimated value at quantile `q` in [0, 1], interpolated between
+        centroids (exact while no more than `size` values were added).
+
+        :raises ValueError: If the sketch is empty.
+        """
+        if not self.count:
+            raise ValueError("Quantile of an empty sketch.")
+        if len(self._means) == self.count:
+            # Uncompressed: same order statistic as the exact SIP quantile
+            k = min(max(math.ceil(q * self.count), 1), self.count)
+            return float(self._means[k - 1])
+        mid_rank = np.cumsum(self._weights) - self._weights / 2
+        return float(np.interp(
+            q * self.count,
+            np.concatenate([[0.0], mid_rank, [self.count]]),
+            np.concatenate([[self.min], self._means, [self.max]])
+        ))
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time as tm
+
+from config import (
+    AGGRESSIVE_PORTFOLIO,
+    ASSET_RETURN_RATES,
+    BALANCED_PORTFOLIO,
+    CONSERVATIVE_PORTFOLIO,
+    MC_ADAPTIVE,
+    MC_BOOTSTRAP_BLOCK_MONTHS,
+    MC_CONFIDENCE_LEVEL,
+    MC_CONTROL_VARIATE,
+    MC_ENGINE,
+    MC_MAX_SIMULATIONS,
+    MC_MIN_SIMULATIONS,
+    MC_PROBABILITY_TOLERANCE,
+    MC_SAMPLER,
+    NUM_SIMULATIONS,
+    PREVIEW_POINTS,
+    RESULT_CACHE_MAX_ENTRIES,
+    RESULT_CACHE_PATH,
+    RESULT_CACHE_TTL_SECONDS,
+    SIMULATION_SEED,
+    TARGET_PROB_OF_SUCCESS,
+)
+from core.dataset_store import DatasetStore, get_dataset_store
+from models.goal_request import GoalRequest
+from models.portfolio_summary import PortfolioSummary
+from utils.logger import get_logger
+
+_PROFILE_WEIGHTS = {
+    'conservative': CONSERVATIVE_PORTFOLIO,
+    'balanced': BALANCED_PORTFOLIO,
+    'aggressive': AGGRESSIVE_PORTFOLIO,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key             TEXT PRIMARY KEY,
+    dataset_version TEXT NOT NULL,
+    created_at      REAL NOT NULL,
+    last_access     REAL NOT NULL,
+    payload         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0), ('evictions', 0);
+"""
+
+
+def request_key(req: GoalRequest) -> str:
+    """
+    Canonical hash of a goal request.
+
+    Requests that produce the same analysis hash identically: the allocation
+    only counts for the 'custom' profile (other profiles use the configured
+    weights), zero weights are dropped, and the simulation settings that
+    affect the result are included.
+    """
+    if req.risk_profile == 'custom':
+        weights = {k: v for k, v in req.asset_allocation.model_dump().items() if v}
+    else:
+        weights = _PROFILE_WEIGHTS.get(req.risk_profile, {})
+
+    canonical = {
+        'goal_amount': req.goal_amount,
+        'time_horizon': req.time_horizon,
+        'lumpsum_amount': req.lumpsum_amount,
+        'risk_profile': req.risk_profile,
+        'weights': {k: float(v) for k, v in sorted(weights.items())},
+        'settings': {
+            'num_simulations': NUM_SIMULATIONS,
+            'engine': req.simulation_engine or MC_ENGINE,
+            'preview': PREVIEW_POINTS if req.preview else None,
+            'bootstrap_block_months': MC_BOOTSTRAP_BLOCK_MONTHS,
+            'sampler': MC_SAMPLER,
+            'control_variate': MC_CONTROL_VARIATE,
+            'adaptive': [MC_PROBABILITY_TOLERANCE, MC_CONFIDENCE_LEVEL, MC_MIN_SIMULATIONS, MC_MAX_SIMULATIONS]
+                        if MC_ADAPTIVE else None,
+            'target_prob': TARGET_PROB_OF_SUCCESS,
+            'seed': SIMULATION_SEED,
+            'return_rates': ASSET_RETURN_RATES,
+        },
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Persistent cache of `/calculate-goal` results, shared by every server
+    process through one SQLite database.
+
+    Entries are keyed by the canonical request hash and tagged with the
+    dataset store's version; lookups only match the current version, and
+    entries of older versions are dropped by the next store. Entries expire
+    after `ttl_seconds`, and the least recently used ones are evicted beyond
+    `max_entries`. Hit, miss and eviction counters live in the database too,
+    so they cover all processes.
+
+    Lookups are read-only: hit/miss counts and access times are buffered in
+    memory and written in one transaction by the next store, or once
+    `FLUSH_ACCESSES` lookups or `FLUSH_SECONDS` have accumulated. All methods
+    block (SQLite locks, dataset version checks): call them off the event loop.
+
+    Cache failures are logged and treated as misses; they never fail a request.
+    """
+
+    FLUSH_ACCESSES = 256
+    FLUSH_SECONDS = 5.0
+
+    def __init__(
+        self,
+        path: str = RESULT_CACHE_PATH,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = RESULT_CACHE_TTL_SECONDS,
+        store: DatasetStore | None = None
+    ):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.store = store if store is not None else get_dataset_store()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._dataset_version: str | None = None
+        # Buffered since the last flush (guarded by _lock)
+        self._pending_counts = {'hits': 0, 'misses': 0}
+        self._pending_access: dict[str, float] = {}
+        self._last_flush = tm.monotonic()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _purge_other_versions(self, conn: sqlite3.Connection, version: str) -> None:
+        """
+        Drops entries computed on other dataset versions, once per version change.
+        """
+        if version != self._dataset_version:
+            conn.execute('DELETE FROM results WHERE dataset_version != ?', (version,))
+            self._dataset_version = version
+
+    def _bump(self, conn: sqlite3.Connection, name: str, amount: int = 1) -> None:
+        conn.execute('UPDATE counters SET value = value + ? WHERE name = ?', (amount, name))
+
+    def _write_pending(self, conn: sqlite3.Connection) -> None:
+        """
+        Writes the buffered counters and access times inside the caller's transaction.
+        """
+        for name, amount in self._pending_counts.items():
+            if amount:
+                self._bump(conn, name, amount)
+        if self._pending_access:
+            conn.executemany(
+                'UPDATE results SET last_access = MAX(last_access, ?) WHERE key = ?',
+                [(when, key) for key, when in self._pending_access.items()]
+            )
+
+    def _clear_pending(self) -> None:
+        self._pending_counts = {'hits': 0, 'misses': 0}
+        self._pending_access = {}
+        self._last_flush = tm.monotonic()
+
+    def _flush(self, conn: sqlite3.Connection) -> None:
+        """
+        Writes the buffered counters and access times in one transaction.
+        """
+        if not (any(self._pending_counts.values()) or self._pending_access):
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._write_pending(conn)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        self._clear_pending()
+
+    def _flush_quietly(self, conn: sqlite3.Connection) -> None:
+        try:
+            self._flush(conn)
+        except sqlite3.Error as e:
+            get_logger().warning(f"Result cache counter flush failed: {e}")
+
+    def get_many(self, keys: list[str | None]) -> list[PortfolioSummary | None]:
+        """
+        Returns the cached summary for every key, None for misses (and for
+        None keys, which are not counted).
+        """
+        results: list[PortfolioSummary | None] = [None] * len(keys)
+        try:
+            version = self.store.version()
+            with self._lock:
+                conn = self._connect()
+                now = tm.time()
+                payloads = {}
+                for i, key in enumerate(keys):
+                    if key is None:
+                        continue
+                    row = conn.execute(
+                        'SELECT payload, created_at FROM results WHERE key = ? AND dataset_version = ?',
+                        (key, version)
+                    ).fetchone()
+                    # Expired rows are left for the next store to delete
+                    if row is None or now - row[1] > self.ttl_seconds:
+                        self._pending_counts['misses'] += 1
+                        continue
+                    self._pending_counts['hits'] += 1
+                    self._pending_access[key] = now
+                    payloads[i] = row[0]
+
+                accesses = self._pending_counts['hits'] + self._pending_counts['misses']
+                if accesses >= self.FLUSH_ACCESSES or tm.monotonic() - self._last_flush >= self.FLUSH_SECONDS:
+                    self._flush_quietly(conn)
+            for i, payload in payloads.items():
+                results[i] = PortfolioSummary.model_validate_json(payload)
+            return results
+        except (sqlite3.Error, ValueError) as e:
+            get_logger().warning(f"Result cache lookup failed: {e}")
+            return [None] * len(keys)
+
+    def get(self, key: str) -> PortfolioSummary | None:
+        """
+        Returns the cached summary for `key`, or None on a miss.
+        """
+        return self.get_many([key])[0]
+
+    def put_many(self, items: list[tuple[str, PortfolioSummary]]) -> None:
+        """
+        Stores each (key, summary) in one transaction, together with the
+        buffered counters, evicting expired and least recently used entries
+        as needed.
+        """
+        if not items:
+            return
+        try:
+            rows = [(key, summary.model_dump_json()) for key, summary in items]
+            version = self.store.version()
+            with self._lock:
+                conn = self._connect()
+                now = tm.time()
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    self._write_pending(conn)
+                    self._purge_other_versions(conn, version)
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO results (key, dataset_version, created_at, last_access, payload) '
+                        'VALUES (?, ?, ?, ?, ?)',
+                        [(key, version, now, now, payload) for key, payload in rows]
+                    )
+                    expired = conn.execute(
+                        'DELETE FROM results WHERE created_at < ?', (now - self.ttl_seconds,)
+                    ).rowcount
+                    overflow = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_entries
+                    if overflow > 0:
+                        conn.execute(
+                            'DELETE FROM results WHERE key IN '
+                            '(SELECT key FROM results ORDER BY last_access LIMIT ?)',
+                            (overflow,)
+                        )
+                    evicted = expired + max(overflow, 0)
+                    if evicted:
+                        self._bump(conn, 'evictions', evicted)
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                self._clear_pending()
+        except sqlite3.Error as e:
+            get_logger().warning(f"Result cache store failed: {e}")
+
+    def put(self, key: str, summary: PortfolioSummary) -> None:
+        """
+        Stores `summary` under `key` (see `put_many`).
+        """
+        self.put_many([(key, summary)])
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the shared counters ('hits', 'misses', 'evictions') and the
+        current number of entries, after flushing this process's buffered
+        counts.
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                self._flush_quietly(conn)
+                stats = dict(conn.execute('SELECT name, value FROM counters').fetchall())
+                stats['entries'] = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            return stats
+        except sqlite3.Error as e:
+            get_logger().warning(f"Result cache stats failed: {e}")
+            return {}
+
+    def clear(self) -> None:
+        """
+        Drops every cached result (counters are kept).
+        """
+        with self._lock:
+            self._connect().execute('DELETE FROM results')
+            self._pending_access = {}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._flush_quietly(self._conn)
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,122 @@
+"""
+Response shaping of the time series in goal summaries.
+
+A summary carries two families of series: the growth curve (`months`,
+`cumulative_investment`, `cumulative_returns`, one point per month of the
+horizon) and the rolling returns (`rolling_returns`, `dates`, one point per
+historical window). Both grow with the horizon and the history, so clients
+can ask for
+
+  - downsampling: every `step`-th point, or as many as fit a point budget
+    (`points`); the first and last points are always kept, and the series
+    of a family stay aligned;
+  - compact encoding: each series as an `EncodedArray`, base64 of packed
+    little-endian values (float64 rupee amounts, float32 returns, int32
+    months, date32 dates) instead of a JSON list of numbers or strings.
+    Amounts stay float64: float32 cannot hold whole rupees above about
+    1.7e7, so compact and list responses would disagree.
+
+`decode_series` turns either form back into a plain list.
+"""
+
+import base64
+import math
+
+import numpy as np
+
+from models.encoded_array import EncodedArray
+from models.portfolio_summary import PortfolioSummary
+
+_GROWTH_SERIES = {'months': 'int32', 'cumulative_investment': 'float64', 'cumulative_returns': 'float64'}
+_ROLLING_SERIES = {'rolling_returns': 'float32', 'dates': 'date32'}
+_NUMPY_DTYPES = {'float64': '<f8', 'float32': '<f4', 'int32': '<i4', 'date32': '<i4'}
+
+
+def series_indices(length: int, points: int | None = None, step: int | None = None) -> np.ndarray | None:
+    """
+    Indices kept when downsampling a series of `length` points to every
+    `step`-th point, coarsened further if needed to fit `points` points.
+    The last point is always kept.
+
+    :return: Sorted index array, or None if every point is kept.
+    """
+    stride = max(step or 1, 1)
+    if points is not None and length > points:
+        stride = max(stride, math.ceil((length - 1) / (max(points, 2) - 1)))
+    if stride == 1 or length <= 1:
+        return None
+    indices = np.arange(0, length, stride)
+    if indices[-1] != length - 1:
+        indices = np.append(indices, length - 1)
+    return indices
+
+
+def encode_array(values, dtype: str) -> EncodedArray:
+    """
+    Packs `values` (numbers, or 'YYYY-MM-DD' strings for 'date32') into an
+    `EncodedArray` of the given dtype.
+    """
+    if dtype == 'date32':
+        array = np.asarray(values, dtype='datetime64[D]').astype(np.int64)
+    else:
+        array = np.asarray(values)
+    packed = array.astype(_NUMPY_DTYPES[dtype])
+    return EncodedArray(dtype=dtype, data=base64.b64encode(packed.tobytes()).decode('ascii'))
+
+
+def decode_series(values: list | EncodedArray | None) -> list | None:
+    """
+    Returns a series as a plain list, unpacking it if it is encoded
+    (date32 values become 'YYYY-MM-DD' strings).
+    """
+    if not isinstance(values, EncodedArray):
+        return values
+    array = np.frombuffer(base64.b64decode(values.data), dtype=_NUMPY_DTYPES[values.dtype])
+    if values.dtype == 'date32':
+        return array.astype('datetime64[D]').astype(str).tolist()
+    return array.tolist()
+
+
+def _shape_family(
+    summary: PortfolioSummary,
+    fields: dict[str, str],
+    points: int | None,
+    step: int | None,
+    compact: bool
+) -> dict:
+    series = {name: decode_series(getattr(summary, name)) for name in fields}
+    lengths = {len(values) for values in series.values() if values is not None}
+    if not lengths:
+        return {}
+    indices = series_indices(min(lengths), points, step)
+
+    update = {}
+    for name, values in series.items():
+        if values is None:
+            continue
+        if indices is not None:
+            values = [values[i] for i in indices]
+        update[name] = encode_array(values, fields[name]) if compact else values
+    return update
+
+
+def shape_series(
+    summary: PortfolioSummary,
+    points: int | None = None,
+    step: int | None = None,
+    encoding: str = 'list'
+) -> PortfolioSummary:
+    """
+    Returns a copy of `summary` with its time series downsampled to every
+    `step`-th point and/or at most `points` points, and packed if
+    `encoding` is 'compact'. The summary is returned unchanged when there
+    is nothing to do.
+    """
+    compact = encoding == 'compact'
+    if points is None and step is None and not compact:
+        return summary
+    update = {
+        **_shape_family(summary, _GROWTH_SERIES, points, step, compact),
+        **_shape_family(summary, _ROLLING_SERIES, points, step, compact),
+    }
+    return summary.model_copy(update=update)
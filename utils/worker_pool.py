@@ -0,0 +1,153 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal
+
+from config import WARMUP_ENABLED, WORKER_POOL_KIND, WORKER_POOL_MAX_QUEUE, WORKER_POOL_SIZE
+from core.exceptions import ServerOverloadedError
+from utils.logger import forward_to_parent, get_logger, worker_log_queue
+
+
+# Barrier shared by the process pool's workers, set by `_init_worker`
+_warm_barrier = None
+
+# Seconds `WorkerPool.warm` waits for every worker to reach the barrier
+_WARM_TIMEOUT_SECONDS = 600.0
+
+
+def _init_worker(warm_barrier=None, log_records=None) -> None:
+    """
+    Warms per-worker state when a worker process starts, so its first
+    request does not pay for loading: the datasets in the in-memory store
+    and, with WARMUP_ENABLED, the built-in profiles' caches
+    (`core.goal_engine.warm_up`).
+
+    :param warm_barrier: Barrier of the pool's size, waited on by `_await_warm`.
+    :param log_records: Queue to the parent's log listener (`worker_log_queue`);
+        the worker then never writes the log file itself.
+    """
+    global _warm_barrier
+    if log_records is not None:
+        forward_to_parent(log_records)
+    _warm_barrier = warm_barrier
+    if WARMUP_ENABLED:
+        from core.goal_engine import warm_up
+        warm_up()
+    else:
+        from core.dataset_store import get_dataset_store
+        get_dataset_store().preload()
+
+
+def _await_warm() -> int:
+    """
+    Blocks until as many workers as the barrier has parties are running this
+    task. A task only starts after its process's initializer has finished,
+    and it holds its process while waiting, so one warmed worker cannot
+    answer for another.
+
+    :return: PID of the worker.
+    :raises threading.BrokenBarrierError: If not every worker gets there in time.
+    """
+    _warm_barrier.wait(_WARM_TIMEOUT_SECONDS)
+    return os.getpid()
+
+
+class WorkerPool:
+    """
+    Runs CPU-bound calls (analysis) off the asyncio event loop on a process
+    or thread pool, with admission control.
+
+    At most `max_workers + max_queue` calls are admitted at a time; beyond
+    that `run` raises ServerOverloadedError immediately instead of letting
+    requests pile up behind a busy pool.
+    """
+
+    def __init__(
+        self,
+        kind: Literal['process', 'thread'] = WORKER_POOL_KIND,
+        max_workers: int = WORKER_POOL_SIZE,
+        max_queue: int = WORKER_POOL_MAX_QUEUE
+    ):
+        if kind not in ('process', 'thread'):
+            raise ValueError(f"Unknown worker pool kind: '{kind}'. Expected 'process' or 'thread'.")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Executor | None = None
+        self._in_flight = 0   # only touched from the event loop thread
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def start(self) -> None:
+        """
+        Creates the executor. Workers start (and warm up) on first use;
+        `warm` starts them all ahead of requests.
+        """
+        if self._executor is not None:
+            return
+        if self.kind == 'process':
+            context = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(context.Barrier(self.max_workers), worker_log_queue(context))
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='analysis'
+            )
+        get_logger().info(
+            f"Worker pool started: {self.max_workers} {self.kind} workers, queue limit {self.max_queue}."
+        )
+
+    async def warm(self) -> None:
+        """
+        Starts and warms every worker (see `_init_worker`), returning once
+        each of them has finished its own warm-up. Requests may run
+        meanwhile; they queue behind the warm-up.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        if self.kind == 'process':
+            # One barrier task per worker: they all return only once every
+            # process has run its initializer and picked one of them up
+            pids = await asyncio.gather(
+                *(loop.run_in_executor(self._executor, _await_warm) for _ in range(self.max_workers))
+            )
+            get_logger().info(f"Warmed {len(set(pids))} worker processes.")
+        else:
+            # Threads share this process's caches: warm them once
+            await loop.run_in_executor(self._executor, _init_worker)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """
+        Runs `fn(*args, **kwargs)` on the pool and awaits its result.
+
+        :raises ServerOverloadedError: If the pool and its queue are full.
+        """
+        if self._in_flight >= self.capacity:
+            raise ServerOverloadedError(self._in_flight, self.capacity)
+        if self._executor is None:
+            self.start()
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            self._in_flight -= 1